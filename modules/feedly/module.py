@@ -36,7 +36,7 @@ class FeedlyModule(Module, CapMessages, CapCollection):
     EMAIL = 'carton_ben@yahoo.fr'
     LICENSE = 'AGPLv3+'
     VERSION = '1.3'
-    STORAGE = {'seen': []}
+    STORAGE = {'seen': {}}
     CONFIG = BackendConfig(Value('username', label='Username', default=''),
                            ValueBackendPassword('password', label='Password', default=''))
 
@@ -77,7 +77,7 @@ class FeedlyModule(Module, CapMessages, CapCollection):
 
             return None
 
-        if thread.id not in self.storage.get('seen', default=[]):
+        if thread.id not in self.storage.seen_index():
             entry.flags = Message.IS_UNREAD
 
         entry.thread = thread
@@ -90,6 +90,7 @@ class FeedlyModule(Module, CapMessages, CapCollection):
             for m in thread.iter_all_messages():
                 if m.flags & m.IS_UNREAD:
                     yield m
+        self.storage.seen_index().commit()
 
     def iter_threads(self):
         for article in self.browser.iter_threads():
@@ -97,8 +98,7 @@ class FeedlyModule(Module, CapMessages, CapCollection):
 
     def set_message_read(self, message):
         self.browser.set_message_read(message.thread.id.split('#')[-1])
-        self.storage.get('seen', default=[]).append(message.thread.id)
-        self.storage.save()
+        self.storage.seen_index().add(message.thread.id)
 
     def fill_thread(self, thread, fields):
         return self.get_thread(thread)
@@ -34,7 +34,7 @@ class HDSModule(Module, CapMessages):
     VERSION = '1.3'
     LICENSE = 'AGPLv3+'
     DESCRIPTION = u"Histoires de Sexe French erotic novels"
-    STORAGE = {'seen': []}
+    STORAGE = {'seen': {}}
     BROWSER = HDSBrowser
 
     #### CapMessages ##############################################
@@ -64,7 +64,7 @@ class HDSModule(Module, CapMessages):
             thread = Thread(story.id)
 
         flags = 0
-        if thread.id not in self.storage.get('seen', default=[]):
+        if thread.id not in self.storage.seen_index():
             flags |= Message.IS_UNREAD
 
         thread.title = story.title
@@ -85,14 +85,14 @@ class HDSModule(Module, CapMessages):
 
     def iter_unread_messages(self):
         for thread in self.iter_threads():
-            if thread.id in self.storage.get('seen', default=[]):
+            if thread.id in self.storage.seen_index():
                 continue
             self.fill_thread(thread, 'root')
             yield thread.root
+        self.storage.seen_index().commit()
 
     def set_message_read(self, message):
-        self.storage.set('seen', self.storage.get('seen', default=[]) + [message.thread.id])
-        self.storage.save()
+        self.storage.seen_index().add(message.thread.id)
 
     def fill_thread(self, thread, fields):
         return self.get_thread(thread)
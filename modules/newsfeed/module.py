@@ -35,7 +35,7 @@ class NewsfeedModule(Module, CapMessages):
     DESCRIPTION = "Loads RSS and Atom feeds from any website"
     LICENSE = "AGPLv3+"
     CONFIG = BackendConfig(Value('url', label="Atom/RSS feed's url", regexp='https?://.*'))
-    STORAGE = {'seen': []}
+    STORAGE = {'seen': {}}
 
     def iter_threads(self):
         for article in Newsfeed(self.config['url'].get()).iter_entries():
@@ -54,7 +54,7 @@ class NewsfeedModule(Module, CapMessages):
             return None
 
         flags = Message.IS_HTML
-        if thread.id not in self.storage.get('seen', default=[]):
+        if thread.id not in self.storage.seen_index():
             flags |= Message.IS_UNREAD
         if len(entry.content) > 0:
             content = u"<p>Link %s</p> %s" % (entry.link, entry.content[0])
@@ -80,10 +80,10 @@ class NewsfeedModule(Module, CapMessages):
             for m in thread.iter_all_messages():
                 if m.flags & m.IS_UNREAD:
                     yield m
+        self.storage.seen_index().commit()
 
     def set_message_read(self, message):
-        self.storage.get('seen', default=[]).append(message.thread.id)
-        self.storage.save()
+        self.storage.seen_index().add(message.thread.id)
 
     def fill_thread(self, thread, fields):
         return self.get_thread(thread)
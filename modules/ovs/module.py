@@ -93,7 +93,7 @@ class OvsModule(Module, CapMessages, CapMessagesPost, CapContact):
 
             messages = [thread.root] + thread.root.children
             for message in messages:
-                if not self.storage.get('seen', message.full_id, default=False):
+                if message.full_id not in self.storage.seen_index():
                     message.flags |= Message.IS_UNREAD
 
             return thread
@@ -107,13 +107,13 @@ class OvsModule(Module, CapMessages, CapMessagesPost, CapContact):
                 for message in messages:
                     if message.flags & Message.IS_UNREAD:
                         yield message
+        self.storage.seen_index().commit()
         # TODO implement more efficiently by having a "last weboob seen" for
         # a thread and query a thread only if "last activity" returned by web
         # is later than "last weboob seen"
 
     def set_message_read(self, message):
-        self.storage.set('seen', message.full_id, True)
-        self.storage.save()
+        self.storage.seen_index().add(message.full_id)
 
     # CapMessagesPost
     def post_message(self, message):
@@ -111,7 +111,7 @@ class TwitterBrowser(LoginBrowser):
         for comment in comments:
             comment.thread = thread
             comment.parent = thread.root
-            if seen and comment.id not in seen.keys():
+            if seen and comment.id not in seen:
                 comment.flags = Message.IS_UNREAD
 
             thread.root.children.append(comment)
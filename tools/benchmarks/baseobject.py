@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure time and memory per BaseObject, with Transaction objects filled
+like a bank module does.
+
+Usage: tools/benchmarks/baseobject.py [COUNT]
+"""
+
+from __future__ import print_function
+
+import datetime
+import gc
+import sys
+import time
+from decimal import Decimal
+
+from weboob.capabilities.bank import Transaction
+
+
+def sizeof(obj, seen):
+    """ Size of an object and of what it references, shared objects aside. """
+    if id(obj) in seen or isinstance(obj, type):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(sizeof(v, seen) for v in obj)
+    elif hasattr(obj, '__dict__'):
+        size += sizeof(obj.__dict__, seen)
+    return size
+
+
+def build(i):
+    tr = Transaction(u'%d' % i)
+    tr.date = datetime.date(2016, 1, 1 + i % 28)
+    tr.rdate = tr.date
+    tr.label = u'CB CARREFOUR %d' % i
+    tr.raw = tr.label
+    tr.amount = Decimal('-12.34')
+    tr.type = Transaction.TYPE_CARD
+    return tr
+
+
+def read(tr):
+    return (tr.date, tr.rdate, tr.label, tr.raw, tr.amount, tr.type, tr.category)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    gc.collect()
+    start = time.time()
+    transactions = [build(i) for i in range(count)]
+    build_time = time.time() - start
+
+    start = time.time()
+    for tr in transactions:
+        read(tr)
+    read_time = time.time() - start
+
+    start = time.time()
+    for tr in transactions:
+        list(tr.iter_fields())
+    iter_time = time.time() - start
+
+    # Values are shared between objects, count the object structure only.
+    seen = set()
+    for tr in transactions[:100]:
+        for name, value in tr.iter_fields():
+            seen.add(id(value))
+    memory = sum(sizeof(tr, seen) for tr in transactions[:100]) / 100.
+
+    print('%d transactions' % count)
+    print('build        %.2f us/object' % (1e6 * build_time / count))
+    print('read         %.2f us/object' % (1e6 * read_time / count))
+    print('iter_fields  %.2f us/object' % (1e6 * iter_time / count))
+    print('memory       %d bytes/object' % memory)
+
+
+if __name__ == '__main__':
+    main()
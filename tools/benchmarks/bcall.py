@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare the legacy one-thread-per-backend strategy of BackendsCall with the
+shared BackendsPool, on fake backends.
+
+Usage: tools/benchmarks/bcall.py [BACKENDS [CALLS]]
+"""
+
+from __future__ import print_function
+
+import sys
+import threading
+import time
+try:
+    import Queue
+except ImportError:
+    import queue as Queue
+
+from weboob.core.bcall import BackendsCall, BackendsPool
+
+
+class FakeBackend(object):
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.RLock()
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, t, v, tb):
+        self.lock.release()
+
+    def iter_things(self, count):
+        for i in range(count):
+            time.sleep(0.0005)
+            yield '%s@%s' % (i, self.name)
+
+
+class LegacyBackendsCall(object):
+    """ What BackendsCall used to do: one thread per backend, and polling. """
+
+    def __init__(self, backends, function, *args):
+        self.responses = Queue.Queue()
+        self.tasks = Queue.Queue()
+        for backend in backends:
+            threading.Thread(target=self.backend_process, args=(function, args)).start()
+            self.tasks.put(backend)
+
+    def backend_process(self, function, args):
+        backend = self.tasks.get()
+        with backend:
+            try:
+                for result in getattr(backend, function)(*args):
+                    self.responses.put(result)
+            finally:
+                self.tasks.task_done()
+
+    def __iter__(self):
+        while self.tasks.unfinished_tasks or not self.responses.empty():
+            try:
+                yield self.responses.get(timeout=0.1)
+            except Queue.Empty:
+                continue
+
+
+class ThreadCounter(object):
+    def __init__(self):
+        self.count = 0
+        self._start = threading.Thread.start
+
+    def __enter__(self):
+        counter = self
+
+        def start(thread):
+            counter.count += 1
+            return counter._start(thread)
+        threading.Thread.start = start
+        return self
+
+    def __exit__(self, t, v, tb):
+        threading.Thread.start = self._start
+
+
+def run(name, factory, backends, calls):
+    latencies = []
+    with ThreadCounter() as counter:
+        for _ in range(calls):
+            start = time.time()
+            results = list(factory(backends))
+            latencies.append(time.time() - start)
+            assert len(results) == len(backends) * 5
+
+    latencies.sort()
+    print('%-8s threads=%-6d mean=%.1fms median=%.1fms max=%.1fms' % (
+        name, counter.count,
+        1000 * sum(latencies) / len(latencies),
+        1000 * latencies[len(latencies) // 2],
+        1000 * latencies[-1]))
+
+
+def main():
+    nb_backends = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    backends = [FakeBackend('backend%d' % i) for i in range(nb_backends)]
+
+    print('%d backends, %d calls' % (nb_backends, calls))
+    run('legacy', lambda b: LegacyBackendsCall(b, 'iter_things', 5), backends, calls)
+    pool = BackendsPool()
+    run('pool', lambda b: BackendsCall(b, 'iter_things', 5, pool=pool), backends, calls)
+
+
+if __name__ == '__main__':
+    main()
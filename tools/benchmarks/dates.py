@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare dateutil with the cached parsers of weboob.tools.date, on the
+dates of a transaction table: a few hundred distinct strings, repeated.
+
+Usage: tools/benchmarks/dates.py [DATES [DISTINCT]]
+"""
+
+from __future__ import print_function
+
+import datetime
+import sys
+import time
+
+import dateutil.parser
+
+from weboob.tools.date import DATE_TRANSLATE_FR, parse_datetime, parse_french_date
+
+
+FRENCH_MONTHS = [u'janvier', u'février', u'mars', u'avril', u'mai', u'juin', u'juillet',
+                 u'août', u'septembre', u'octobre', u'novembre', u'décembre']
+
+
+def legacy_parse_french_date(date, **kwargs):
+    for fr, en in DATE_TRANSLATE_FR:
+        date = fr.sub(en, date)
+    kwargs.setdefault('dayfirst', True)
+    return dateutil.parser.parse(date, **kwargs)
+
+
+def run(name, func, texts, **kwargs):
+    start = time.time()
+    results = [func(text, **kwargs) for text in texts]
+    duration = time.time() - start
+    print('%-30s %.2f us/date' % (name, 1e6 * duration / len(texts)))
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    days = [datetime.date(2016, 1, 1) + datetime.timedelta(days=i) for i in range(distinct)]
+    layouts = (('dd/mm/yyyy', lambda d: d.strftime('%d/%m/%Y'), {'dayfirst': True}),
+               ('yyyy-mm-dd', lambda d: d.isoformat(), {}),
+               ('dd mmm yy', lambda d: d.strftime('%d %b %y'), {'dayfirst': True}))
+
+    print('%d dates, %d distinct' % (count, distinct))
+    for layout, fmt, kwargs in layouts:
+        texts = [fmt(days[i % distinct]) for i in range(count)]
+        parse_datetime.cache.clear()
+        expected = run('dateutil       %s' % layout, dateutil.parser.parse, texts, **kwargs)
+        assert run('parse_datetime %s' % layout, parse_datetime, texts, **kwargs) == expected
+
+    texts = [u'%d %s %d' % (d.day, FRENCH_MONTHS[d.month - 1], d.year) for d in days]
+    texts = [texts[i % distinct] for i in range(count)]
+    parse_french_date.cache.clear()
+    expected = run('legacy parse_french_date', legacy_parse_french_date, texts)
+    assert run('parse_french_date', parse_french_date, texts) == expected
+
+
+if __name__ == '__main__':
+    main()
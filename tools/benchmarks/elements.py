@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the overhead per item of ListElement, TableElement and ItemElement,
+on a bank history table parsed with page parameters and environment like
+bank modules do.
+
+Usage: tools/benchmarks/elements.py [ROWS [ROUNDS]]
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+from decimal import Decimal
+
+import lxml.html
+
+from weboob.browser.elements import ItemElement, ListElement, TableElement
+from weboob.browser.filters.standard import CleanText, CleanDecimal, Env, TableCell
+from weboob.capabilities.bank import Account, Transaction
+
+
+class FakePage(object):
+    def __init__(self, doc, params):
+        self.doc = doc
+        self.params = params
+
+
+class HistoryTable(TableElement):
+    item_xpath = '//table[@id="history"]/tbody/tr'
+    head_xpath = '//table[@id="history"]/thead/tr/th'
+
+    col_label = u'Libellé'
+    col_amount = u'Montant'
+
+    def parse(self, el):
+        self.env['currency'] = u'EUR'
+
+    class item(ItemElement):
+        klass = Transaction
+
+        obj_id = CleanText('./@id')
+        obj_label = CleanText(TableCell('label'))
+        obj_amount = CleanDecimal(TableCell('amount'), replace_dots=True)
+
+        def obj__account_id(self):
+            return self.env['account'].id
+
+
+class RowList(ListElement):
+    item_xpath = '//table[@id="history"]/tbody/tr'
+
+    class item(ItemElement):
+        klass = Transaction
+
+        obj_id = CleanText('./@id')
+        obj__account_id = Env('account_id')
+
+
+def make_doc(rows):
+    html = [u'<html><body><table id="history">',
+            u'<thead><tr><th>Libellé</th><th>Montant</th></tr></thead>',
+            u'<tbody>']
+    for i in range(rows):
+        html.append(u'<tr id="tr%d"><td>CB CARREFOUR %d</td><td>-%d,%02d</td></tr>' % (i, i, i, i % 100))
+    html.append(u'</tbody></table></body></html>')
+    return lxml.html.fromstring(u''.join(html))
+
+
+def make_params():
+    accounts = []
+    for i in range(20):
+        account = Account(u'%08d' % i)
+        account.label = u'Compte %d' % i
+        account.balance = Decimal('1234.56')
+        accounts.append(account)
+    return {'account': accounts[0], 'account_id': accounts[0].id, 'accounts': accounts}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    page = FakePage(make_doc(rows), make_params())
+
+    print('%d rows, %d rounds' % (rows, rounds))
+    for name, klass in (('list', RowList), ('table', HistoryTable)):
+        assert len(list(klass(page))) == rows
+        duration = timeit.timeit(lambda: list(klass(page)), number=rounds)
+        print('%-8s %.1f us/item' % (name, 1e6 * duration / rounds / rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare filters evaluating XPath selectors with element.xpath() and the
+XPath-based has-class() function, with filters using precompiled
+selectors and the native has-class(), on a bank history page.
+
+Usage: tools/benchmarks/filters.py [ROWS [ROUNDS]]
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+
+import lxml.html
+from lxml import etree
+
+from weboob.browser.elements import ItemElement, TableElement
+from weboob.browser.filters.standard import _Filter, CleanText, CleanDecimal, Date, TableCell
+from weboob.browser.pages import HTMLPage
+from weboob.capabilities.bank import Transaction
+
+
+class FakePage(object):
+    params = {}
+
+    def __init__(self, doc):
+        self.doc = doc
+
+
+class HistoryTable(TableElement):
+    item_xpath = '//table[@id="history"]/tbody/tr'
+    head_xpath = '//table[@id="history"]/thead/tr/th'
+
+    col_date = u'Date'
+    col_label = u'Libellé'
+    col_amount = u'Montant'
+
+    class item(ItemElement):
+        klass = Transaction
+
+        obj_id = CleanText('./@id')
+        obj_date = Date(CleanText(TableCell('date')), dayfirst=True)
+        obj_label = CleanText(TableCell('label'))
+        obj_category = CleanText('./td[has-class("category")]')
+        obj_amount = CleanDecimal(TableCell('amount'), replace_dots=True)
+
+        def condition(self):
+            return not self.xpath('./self::*[has-class("total")]')
+
+
+def make_doc(rows):
+    html = [u'<html><body><table id="history">',
+            u'<thead><tr><th>Date</th><th>Libellé</th><th>Catégorie</th><th>Montant</th></tr></thead>',
+            u'<tbody>']
+    for i in range(rows):
+        html.append(u'<tr id="tr%d" class="%s line"><td>%02d/%02d/2016</td><td class="label">  CB  CARREFOUR %d </td>'
+                    u'<td class="text category">Courses</td><td class="amount">-%d,%02d</td></tr>'
+                    % (i, 'odd' if i % 2 else 'even', i % 28 + 1, i % 12 + 1, i, i, i % 100))
+    html.append(u'<tr class="total"><td colspan="4">Total</td></tr>')
+    html.append(u'</tbody></table></body></html>')
+    return lxml.html.fromstring(u''.join(html))
+
+
+def legacy_xpath(self, selector, item):
+    return item.xpath(selector)
+
+
+def legacy_has_class(context, *classes):
+    expressions = ' and '.join(["contains(concat(' ', normalize-space(@class), ' '), ' {0} ')".format(c) for c in classes])
+    xpath = 'self::*[@class and {0}]'.format(expressions)
+    return bool(context.context_node.xpath(xpath))
+
+
+def parse(doc):
+    return list(HistoryTable(FakePage(doc)))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    doc = make_doc(rows)
+
+    ns = etree.FunctionNamespace(None)
+    HTMLPage.define_xpath_functions.__func__(None, ns)
+    native_has_class = ns['has-class']
+    compiled_xpath = _Filter.xpath
+
+    results = {}
+    print('%d rows, %d rounds' % (rows, rounds))
+    for name, xpath, has_class in (('legacy', legacy_xpath, legacy_has_class),
+                                   ('compiled', compiled_xpath, native_has_class)):
+        _Filter.xpath = xpath
+        ns['has-class'] = has_class
+        results[name] = [tr.to_dict() for tr in parse(doc)]
+        duration = timeit.timeit(lambda: parse(doc), number=rounds)
+        print('parse   %-8s %.1f us/row' % (name, 1e6 * duration / rounds / rows))
+
+    _Filter.xpath = compiled_xpath
+    assert len(results['legacy']) == rows
+    assert results['legacy'] == results['compiled']
+
+    for name, has_class in (('legacy', legacy_has_class), ('native', native_has_class)):
+        ns['has-class'] = has_class
+        duration = timeit.timeit(lambda: doc.xpath('//td[has-class("text", "category")]'), number=rounds)
+        print('has-class %-6s %.1f us/node' % (name, 1e6 * duration / rounds / len(doc.xpath('//*'))))
+
+
+if __name__ == '__main__':
+    main()
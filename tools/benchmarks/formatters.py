@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Export transactions with a formatter, like
+``boobank history -f FORMATTER -O FILE`` does.
+
+The peak memory usage should not depend on the number of transactions.
+
+Usage: tools/benchmarks/formatters.py [TRANSACTIONS [FORMATTER]]
+"""
+
+from __future__ import print_function
+
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from weboob.capabilities.bank import Transaction
+from weboob.tools.application.formatters.load import FormattersLoader
+
+
+def iter_transactions(count):
+    for i in range(count):
+        tr = Transaction()
+        tr.id = u'%d' % i
+        tr.backend = 'bank'
+        tr.date = tr.rdate = date(2016, 1, 1) - timedelta(days=i // 10)
+        tr.amount = Decimal('-%d.%02d' % (i % 1000, i % 100))
+        tr.raw = tr.label = u'CARTE %d MAGASIN' % i
+        tr.type = Transaction.TYPE_CARD
+        yield tr
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    name = sys.argv[2] if len(sys.argv) > 2 else 'json'
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        formatter = FormattersLoader().build_formatter(name)
+        formatter.outfile = path
+        start = time.time()
+        for tr in iter_transactions(count):
+            formatter.format(tr, selected_fields=('id', 'date', 'amount', 'label'))
+        formatter.flush()
+        elapsed = time.time() - start
+        print('%s, %d transactions: %.2f s, %.1f MB written, peak memory %.1f MB' % (
+              name, count, elapsed, os.path.getsize(path) / 1e6,
+              resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
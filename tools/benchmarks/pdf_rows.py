@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Parse tables of a bank statement in PDF with get_pdf_rows(), like
+banquepopulaire does.
+
+The statement is generated: each page has a table of transactions
+drawn with lines, with text in each cell.
+
+Usage: tools/benchmarks/pdf_rows.py [PAGES [ROWS [PROCESSES]]]
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from weboob.tools.pdf import get_pdf_rows
+
+
+COLUMNS = (40, 60, 250, 70, 70)
+
+
+def make_page(npage, rows):
+    ops = ['0.5 w']
+    top = 800
+    height = 700. / rows
+    for row in range(rows):
+        y1 = top - row * height
+        y0 = y1 - height
+        x = 20
+        for ncol, width in enumerate(COLUMNS):
+            for line in ((x, y1, x + width, y1), (x, y0, x + width, y0),
+                         (x, y0, x, y1), (x + width, y0, x + width, y1)):
+                ops.append('%.2f %.2f m %.2f %.2f l S' % line)
+            text = 'p%d r%d c%d %s' % (npage, row, ncol, 'x' * (ncol * 3))
+            ops.append('BT /F1 %.1f Tf %.2f %.2f Td (%s) Tj ET' % (height * 0.5, x + 2, y0 + height * 0.3, text))
+            x += width
+    return '\n'.join(ops)
+
+
+def make_pdf(pages, rows):
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None,
+               '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for npage in range(pages):
+        content = make_page(npage, rows)
+        objects.append('<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+        objects.append('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       '/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        kids.append('%d 0 R' % len(objects))
+    objects[1] = '<< /Type /Pages /Kids [%s] /Count %d >>' % (' '.join(kids), pages)
+
+    pdf = '%PDF-1.4\n'
+    offsets = []
+    for n, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += '%d 0 obj\n%s\nendobj\n' % (n + 1, obj)
+    xref = len(pdf)
+    pdf += 'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += ''.join('%010d 00000 n \n' % offset for offset in offsets)
+    pdf += 'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    data = make_pdf(pages, rows)
+
+    start = time.time()
+    result = list(get_pdf_rows(data, processes=processes))
+    elapsed = time.time() - start
+    cells = sum(len(row) for page in result for row in page)
+    print('%d pages of %d rows, %d cells: %.2f s' % (len(result), rows, cells, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Parse a listing whose items need a detail page each, served by a local
+HTTP server with a latency, with and without the prefetcher of ListElement.
+
+Usage: tools/benchmarks/prefetch.py [ITEMS [LATENCY]]
+"""
+
+from __future__ import print_function
+
+import sys
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+from weboob.browser import PagesBrowser, URL
+from weboob.browser.elements import ItemElement, ListElement, method
+from weboob.browser.filters.html import Link
+from weboob.browser.filters.standard import Async, AsyncLoad, CleanText
+from weboob.browser.pages import HTMLPage
+from weboob.capabilities.base import BaseObject, StringField
+
+
+class Housing(BaseObject):
+    title = StringField('Title')
+
+
+class Handler(BaseHTTPRequestHandler):
+    items = 0
+    latency = 0
+
+    def do_GET(self):
+        if self.path == '/list':
+            body = '<ul>%s</ul>' % ''.join('<li><a href="/item/%d">%d</a></li>' % (i, i) for i in range(self.items))
+        else:
+            time.sleep(self.latency)
+            body = '<h1>Housing %s</h1>' % self.path.split('/')[-1]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class DetailsPage(HTMLPage):
+    pass
+
+
+def make_list(streaming, prefetch):
+    class HousingList(ListElement):
+        item_xpath = '//li'
+
+        class item(ItemElement):
+            klass = Housing
+
+            load_details = Link('./a') & AsyncLoad
+
+            obj_id = CleanText('./a')
+            obj_title = Async('details') & CleanText('//h1')
+
+        def get_prefetcher(self):
+            if prefetch:
+                return super(HousingList, self).get_prefetcher()
+
+        def has_loaders(self):
+            return prefetch and super(HousingList, self).has_loaders()
+
+    HousingList.streaming = streaming
+    return HousingList
+
+
+def make_page(streaming, prefetch):
+    return type('ListPage', (HTMLPage,), {'iter_housings': method(make_list(streaming, prefetch))})
+
+
+def main():
+    Handler.items = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    Handler.latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+
+    server = Server(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    print('%d items, %.2fs per detail page' % (Handler.items, Handler.latency))
+    for streaming in (False, True):
+        for prefetch in (False, True):
+            class MyBrowser(PagesBrowser):
+                BASEURL = 'http://127.0.0.1:%d' % server.server_address[1]
+
+                listing = URL('/list', make_page(streaming, prefetch))
+                details = URL('/item/(?P<id>\d+)', DetailsPage)
+
+            browser = MyBrowser()
+            start = time.time()
+            housings = list(browser.listing.go().iter_housings())
+            duration = time.time() - start
+            assert [h.title for h in housings] == [u'Housing %d' % i for i in range(Handler.items)]
+            print('streaming=%-5s prefetch=%-5s %.2fs' % (streaming, prefetch, duration))
+            browser.session.close()
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
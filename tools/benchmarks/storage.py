@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare storages when every backend saves its own state, like
+Module.deinit() does with browser states.
+
+Usage: tools/benchmarks/storage.py [BACKENDS]
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from weboob.tools.storage import SQLiteStorage, StandardStorage
+
+
+def run(storage, count):
+    names = ['backend%d' % i for i in range(count)]
+    for name in names:
+        storage.load('backends', name, {'seen': {}})
+
+    start = time.time()
+    for name in names:
+        state = {'cookies': dict(('cookie%d' % i, 'x' * 40) for i in range(20)),
+                 'url': u'https://example.org/%s/accounts' % name}
+        storage.set('backends', name, 'browser_state', state)
+        storage.get('backends', name, 'seen')[u'msg-%s' % name] = 1
+        storage.save('backends', name)
+    return time.time() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for label, klass, filename in (('StandardStorage', StandardStorage, 'storage.yaml'),
+                                       ('SQLiteStorage', SQLiteStorage, 'storage.sqlite')):
+            path = os.path.join(tmpdir, filename)
+            first = run(klass(path), count)
+            again = run(klass(path), count)
+            print('%-16s %d backends: first run %.1f ms, next run %.1f ms' % (label, count, first * 1000, again * 1000))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Compare the legacy linear URL dispatch of PagesBrowser with the URLIndex,
+on a browser with many URL objects.
+
+Usage: tools/benchmarks/url_dispatch.py [URLS [ROUNDS]]
+"""
+
+from __future__ import print_function
+
+import re
+import sys
+import timeit
+
+from requests import Request, Response
+
+from weboob.browser import PagesBrowser, URL
+from weboob.browser.pages import Page
+from weboob.tools.regex_helper import normalize
+
+
+class MyPage(Page):
+    def build_doc(self, content):
+        return content
+
+
+def make_browser(count):
+    attrs = {'BASEURL': 'https://www.example-bank.com'}
+    for i in range(count):
+        attrs['url%d' % i] = URL(r'/section%d/(?P<id>\d+)/details\.html' % i,
+                                 r'/section%d/list\.html\?page=(?P<page>\d+)' % i,
+                                 MyPage)
+    return type('MyBrowser', (PagesBrowser,), attrs)()
+
+
+def legacy_match(url, regexps, base):
+    for regex in regexps:
+        if not re.match(r'^[\w\?]+://.*', regex):
+            regex = re.escape(base).rstrip('/') + '/' + regex.lstrip('/')
+        m = re.match(regex, url)
+        if m:
+            return m
+
+
+def legacy_route(browser, response):
+    for url in browser._urls.values():
+        if url.klass is None:
+            continue
+        m = legacy_match(response.url, url.urls, browser.BASEURL)
+        if m:
+            return url.klass(browser, response, m.groupdict())
+
+
+def indexed_route(browser, response):
+    for name in browser.get_url_index().candidates(response.url):
+        page = browser._urls[name].handle(response)
+        if page is not None:
+            return page
+
+
+def legacy_build(url):
+    patterns = []
+    for regex in url.urls:
+        patterns += normalize(regex)
+    return patterns
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    browser = make_browser(count)
+
+    responses = []
+    for i in range(0, count, max(1, count // 10)):
+        response = Response()
+        response.request = Request('GET', browser.BASEURL).prepare()
+        response._content = b''
+        response.url = browser._urls['url%d' % i].build(id=42)
+        responses.append(response)
+
+    for response in responses:
+        assert legacy_route(browser, response).params == indexed_route(browser, response).params
+
+    print('%d URL objects, %d responses, %d rounds' % (count, len(responses), rounds))
+    for name, route in (('legacy', legacy_route), ('indexed', indexed_route)):
+        duration = timeit.timeit(lambda: [route(browser, r) for r in responses], number=rounds)
+        print('route   %-8s %.1f us/response' % (name, 1e6 * duration / rounds / len(responses)))
+
+    url = browser._urls['url%d' % (count - 1)]
+    duration = timeit.timeit(lambda: legacy_build(url), number=rounds)
+    print('build   %-8s %.1f us/call' % ('legacy', 1e6 * duration / rounds))
+    duration = timeit.timeit(lambda: url.get_patterns(), number=rounds)
+    print('build   %-8s %.1f us/call' % ('cached', 1e6 * duration / rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Load a grid virtual keyboard and get the code of a password, like bank
+modules do at login, with and without numpy.
+
+Keyboard images are generated: digits are drawn in a grid of keys,
+with some noise around them.
+
+Usage: tools/benchmarks/virtkeyboard.py [LOGINS]
+"""
+
+from __future__ import print_function
+
+import random
+import sys
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from weboob.tools.captcha import virtkeyboard
+from weboob.tools.captcha.virtkeyboard import GridVirtKeyboard
+
+
+SYMBOLS = '0123456789'
+COLS, ROWS = 5, 2
+KEY_SIZE = 80
+
+
+def make_keyboard(order):
+    small = Image.new('RGB', (COLS * KEY_SIZE // 4, ROWS * KEY_SIZE // 4), (255, 255, 255))
+    draw = ImageDraw.Draw(small)
+    for i, symbol in enumerate(order):
+        x, y = i % COLS * KEY_SIZE // 4, i // COLS * KEY_SIZE // 4
+        draw.text((x + 7, y + 5), symbol, fill=(0, 0, 0))
+    image = small.resize((COLS * KEY_SIZE, ROWS * KEY_SIZE), Image.NEAREST)
+    pixels = image.load()
+    for i in range(image.size[0] * image.size[1] // 20):
+        x, y = random.randrange(image.size[0]), random.randrange(image.size[1])
+        if pixels[x, y] != (0, 0, 0):
+            pixels[x, y] = (200, 200, 200)
+    data = BytesIO()
+    image.save(data, 'PNG')
+    return data.getvalue()
+
+
+def run(images, symbols):
+    start = time.time()
+    for order, data in images:
+        vk = GridVirtKeyboard(order, COLS, ROWS, BytesIO(data), (0, 0, 0))
+        vk.symbols = symbols
+        vk.get_string_code('20161231')
+    return time.time() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    random.seed(0)
+    images = []
+    for i in range(count):
+        order = list(SYMBOLS)
+        random.shuffle(order)
+        images.append((order, make_keyboard(order)))
+
+    # Hashes of symbols, as modules have them in their sources.
+    order, data = images[0]
+    vk = GridVirtKeyboard(order, COLS, ROWS, BytesIO(data), (0, 0, 0))
+    symbols = dict((s, vk.md5[s]) for s in SYMBOLS)
+
+    numpy = virtkeyboard.numpy
+    if numpy is not None:
+        print('numpy       %d logins: %.1f ms/login' % (count, run(images, symbols) * 1000 / count))
+    virtkeyboard.numpy = None
+    print('pure python %d logins: %.1f ms/login' % (count, run(images, symbols) * 1000 / count))
+    virtkeyboard.numpy = numpy
+
+
+if __name__ == '__main__':
+    main()
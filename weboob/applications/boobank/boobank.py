@@ -35,6 +35,7 @@ from weboob.capabilities.contact import CapContact, Advisor
 from weboob.capabilities.profile import CapProfile
 from weboob.tools.application.repl import ReplApplication, defaultcount
 from weboob.tools.application.formatters.iformatter import IFormatter, PrettyFormatter
+import weboob.tools.date as date_utils
 
 
 __all__ = ['Boobank']
@@ -455,8 +456,16 @@ class Boobank(ReplApplication):
             old_count = self.options.count
             self.options.count = None
 
+        function = command
+        if command == 'iter_history' and self.condition is not None:
+            # Transactions are given from the newest to the oldest, so the
+            # backend can stop as soon as they are too old for the condition.
+            min_date = self.condition.get_lower_bound('date', date_utils.date.today())
+            if min_date is not None:
+                function = lambda backend, account: self.iter_history_since(backend, account, min_date)
+
         self.start_format(account=account)
-        for transaction in self.do(command, account, backends=account.backend):
+        for transaction in self.do(function, account, backends=account.backend):
             if end_date is not None and transaction.date < end_date:
                 break
             self.format(transaction)
@@ -464,6 +473,16 @@ class Boobank(ReplApplication):
         if end_date is not None:
             self.options.count = old_count
 
+    @staticmethod
+    def iter_history_since(backend, account, min_date):
+        for transaction in backend.iter_history(account):
+            tdate = transaction.date
+            if isinstance(tdate, datetime.datetime):
+                tdate = tdate.date()
+            if isinstance(tdate, datetime.date) and tdate < min_date:
+                break
+            yield transaction
+
     def complete_history(self, text, line, *ignored):
         args = line.split(' ')
         if len(args) == 2:
@@ -26,6 +26,7 @@ from weboob.tools.application.repl import ReplApplication, defaultcount
 from weboob.capabilities.base import empty
 from weboob.capabilities.gallery import CapGallery, BaseGallery, BaseImage
 from weboob.tools.application.formatters.iformatter import PrettyFormatter
+from weboob.tools.downloader import Downloader
 
 
 __all__ = ['Galleroob']
@@ -111,30 +112,53 @@ class Galleroob(ReplApplication):
             pass  # ignore error on existing directory
         os.chdir(dest)  # fail here if dest couldn't be created
 
-        i = 0
-        for img in self.weboob[backend].iter_gallery_images(gallery):
-            i += 1
-            if i < first:
-                continue
-
-            self.weboob[backend].fillobj(img, ('url', 'data'))
-            if img.data is None:
-                self.weboob[backend].fillobj(img, ('url', 'data'))
-                if img.data is None:
-                    print("Couldn't get page %d, exiting" % i, file=self.stderr)
-                    break
-
-            ext = search(r"\.([^\.]{1,5})$", img.url)
-            if ext:
-                ext = ext.group(1)
-            else:
-                ext = "jpg"
-
-            name = '%03d.%s' % (i, ext)
+        module = self.weboob[backend]
+        downloader = Downloader(module.browser, logger=self.logger)
+        # Images are downloaded by the module itself when its browser can't
+        # be shared (deprecated browsers, which need their own requests).
+        shared = downloader.browser is module.browser
+        pages = {}
+        failed = []
+
+        def iter_images():
+            i = 0
+            for img in module.iter_gallery_images(gallery):
+                i += 1
+                if i < first:
+                    continue
+
+                module.fillobj(img, ('url',) if shared else ('url', 'data'))
+                ext = search(r"\.([^\.]{1,5})$", img.url or '')
+                if ext:
+                    ext = ext.group(1)
+                else:
+                    ext = "jpg"
+
+                name = '%03d.%s' % (i, ext)
+                pages[name] = i
+                if shared and img.url:
+                    # Downloaded concurrently with the next images.
+                    yield img.url, name
+                    continue
+
+                if empty(img.data):
+                    module.fillobj(img, ('url', 'data'))
+                if empty(img.data):
+                    failed.append(i)
+                    return
+                print('Writing file %s' % name)
+                with open(name, 'wb') as f:
+                    f.write(img.data)
+
+        for url, name, error in downloader.download_many(iter_images()):
+            if error is not None:
+                self.logger.debug('Unable to download %s: %s', url, error)
+                failed.append(pages[name])
+                break
             print('Writing file %s' % name)
 
-            with open(name, 'wb') as f:
-                f.write(img.data)
+        if failed:
+            print("Couldn't get page %d, exiting" % failed[0], file=self.stderr)
 
         os.chdir(os.path.pardir)
 
@@ -119,7 +119,7 @@ class Result(QFrame):
         self.parent.ui.searchEdit.setEnabled(False)
         QApplication.setOverrideCursor(Qt.WaitCursor)
 
-        self.process = QtDo(self.weboob, self.addPerson, fb=self.processFinished)
+        self.process = QtDo(self.weboob, None, fb=self.processFinished, bcb=self.batch(self.addPerson))
         self.process.do('iter_movie_persons', id, role, backends=backend_name, caps=CapCinema)
         self.parent.ui.stopButton.show()
 
@@ -218,7 +218,7 @@ class Result(QFrame):
         self.parent.ui.searchEdit.setEnabled(False)
         QApplication.setOverrideCursor(Qt.WaitCursor)
 
-        self.process = QtDo(self.weboob, self.addMovie, fb=self.processFinished)
+        self.process = QtDo(self.weboob, None, fb=self.processFinished, bcb=self.batch(self.addMovie))
         self.process.do('iter_person_movies', id, role, backends=backend_name, caps=CapCinema)
         self.parent.ui.stopButton.show()
 
@@ -250,7 +250,7 @@ class Result(QFrame):
 
         backend_name = self.parent.ui.backendEdit.itemData(self.parent.ui.backendEdit.currentIndex())
 
-        self.process = QtDo(self.weboob, self.addMovie, fb=self.processFinished)
+        self.process = QtDo(self.weboob, None, fb=self.processFinished, bcb=self.batch(self.addMovie))
         #self.process.do('iter_movies', pattern, backends=backend_name, caps=CapCinema)
         self.process.do(self.app._do_complete, self.parent.getCount(), ('original_title'), 'iter_movies', pattern, backends=backend_name, caps=CapCinema)
         self.parent.ui.stopButton.show()
@@ -289,7 +289,7 @@ class Result(QFrame):
 
         backend_name = self.parent.ui.backendEdit.itemData(self.parent.ui.backendEdit.currentIndex())
 
-        self.process = QtDo(self.weboob, self.addPerson, fb=self.processFinished)
+        self.process = QtDo(self.weboob, None, fb=self.processFinished, bcb=self.batch(self.addPerson))
         #self.process.do('iter_persons', pattern, backends=backend_name, caps=CapCinema)
         self.process.do(self.app._do_complete, self.parent.getCount(), ('name'), 'iter_persons', pattern, backends=backend_name, caps=CapCinema)
         self.parent.ui.stopButton.show()
@@ -328,7 +328,7 @@ class Result(QFrame):
 
         backend_name = self.parent.ui.backendEdit.itemData(self.parent.ui.backendEdit.currentIndex())
 
-        self.process = QtDo(self.weboob, self.addTorrent, fb=self.processFinished)
+        self.process = QtDo(self.weboob, None, fb=self.processFinished, bcb=self.batch(self.addTorrent))
         #self.process.do('iter_torrents', pattern, backends=backend_name, caps=CapTorrent)
         self.process.do(self.app._do_complete, self.parent.getCount(), ('name'), 'iter_torrents', pattern, backends=backend_name, caps=CapTorrent)
         self.parent.ui.stopButton.show()
@@ -344,6 +344,18 @@ class Result(QFrame):
         if self.process is not None:
             self.process.stop()
 
+    def batch(self, add):
+        """
+        Get a callback adding a batch of results with *add*, and laying
+        out the list once.
+        """
+        def cb(objs):
+            self.ui.list_content.setUpdatesEnabled(False)
+            for obj in objs:
+                add(obj)
+            self.ui.list_content.setUpdatesEnabled(True)
+        return cb
+
     def addTorrent(self, torrent):
         minitorrent = MiniTorrent(self.weboob, self.weboob[torrent.backend], torrent, self)
         positionToInsert = self.ui.list_content.layout().count()-1
@@ -387,7 +399,7 @@ class Result(QFrame):
 
         backend_name = self.parent.ui.backendEdit.itemData(self.parent.ui.backendEdit.currentIndex())
 
-        self.process = QtDo(self.weboob, self.addSubtitle, fb=self.processFinished)
+        self.process = QtDo(self.weboob, None, fb=self.processFinished, bcb=self.batch(self.addSubtitle))
         #self.process.do('iter_subtitles', lang, pattern, backends=backend_name, caps=CapSubtitle)
         self.process.do(self.app._do_complete, self.parent.getCount(), ('name'), 'iter_subtitles', lang, pattern, backends=backend_name, caps=CapSubtitle)
         self.parent.ui.stopButton.show()
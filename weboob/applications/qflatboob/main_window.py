@@ -216,7 +216,7 @@ class MainWindow(QtMainWindow):
         query.cost_max = int(q['cost_max']) or None
         query.nb_rooms = int(q['nb_rooms']) or None
 
-        self.process = QtDo(self.weboob, self.addHousing, fb=self.addHousingEnd)
+        self.process = QtDo(self.weboob, None, fb=self.addHousingEnd, bcb=self.addHousings)
         self.process.do(self.app._do_complete, 20, None, 'search_housings', query)
 
     @Slot()
@@ -237,6 +237,13 @@ class MainWindow(QtMainWindow):
         self.ui.bookmarksButton.setEnabled(True)
         self.process = None
 
+    def addHousings(self, housings):
+        # Redraw the list once per batch.
+        self.ui.housingsList.setUpdatesEnabled(False)
+        for housing in housings:
+            self.addHousing(housing)
+        self.ui.housingsList.setUpdatesEnabled(True)
+
     def addHousing(self, housing):
         if not housing:
             return
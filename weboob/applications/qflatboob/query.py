@@ -64,18 +64,17 @@ class QueryDialog(QDialog):
         self.ui.cityEdit.clear()
         self.ui.cityEdit.setEnabled(False)
 
-        self.search_process = QtDo(self.weboob, self.addResult, fb=self.addResultEnd)
+        self.search_process = QtDo(self.weboob, None, fb=self.addResultEnd, bcb=self.addResults)
         self.search_process.do('search_city', pattern)
 
     def addResultEnd(self):
         self.search_process = None
         self.ui.cityEdit.setEnabled(True)
 
-    def addResult(self, city):
-        if not city:
-            return
-        item = self.buildCityItem(city)
-        self.ui.resultsList.addItem(item)
+    def addResults(self, cities):
+        for city in cities:
+            if city:
+                self.ui.resultsList.addItem(self.buildCityItem(city))
         self.ui.resultsList.sortItems()
 
     def buildCityItem(self, city):
@@ -119,9 +119,16 @@ class MainWindow(QtMainWindow):
             self.ui.searchEdit.setEnabled(True)
             self.process = None
 
-        self.process = QtDo(self.weboob, self.addVideo, fb=finished)
+        self.process = QtDo(self.weboob, None, fb=finished, bcb=self.addVideos)
         self.process.do(self.app._do_complete, 20, (), 'search_videos', pattern, self.ui.sortbyEdit.currentIndex(), nsfw=True, backends=backend_name)
 
+    def addVideos(self, videos):
+        # Lay out the whole batch at once.
+        self.ui.scrollAreaContent.setUpdatesEnabled(False)
+        for video in videos:
+            self.addVideo(video)
+        self.ui.scrollAreaContent.setUpdatesEnabled(True)
+
     def addVideo(self, video):
         minivideo = MiniVideo(self.weboob, self.weboob[video.backend], video)
         self.ui.scrollAreaContent.layout().addWidget(minivideo)
@@ -19,14 +19,16 @@
 
 from __future__ import print_function
 from io import BytesIO
-from urlparse import urlparse
 
-import requests
 import subprocess
 import os
 
+from requests.exceptions import RequestException
+
 from weboob.capabilities.video import CapVideo, BaseVideo
 from weboob.capabilities.base import empty
+from weboob.exceptions import BrowserHTTPError
+from weboob.tools.downloader import Downloader, PrintDownloadProgress
 from weboob.tools.application.repl import ReplApplication, defaultcount
 from weboob.tools.application.media_player import InvalidMediaPlayer, MediaPlayer, MediaPlayerNotFound
 from weboob.tools.application.formatters.iformatter import PrettyFormatter
@@ -106,33 +108,26 @@ class Videoob(ReplApplication):
             if not check_exec('mimms'):
                 return 1
             args = ('mimms', '-r', video.url, dest)
-        elif u'm3u8' == video.ext:
-            _dest, _ = os.path.splitext(dest)
-            dest = u'%s.%s' % (_dest, 'mp4')
-            content = tuple()
-            parsed_uri = urlparse(video.url)
-            baseurl = '{uri.scheme}://{uri.netloc}'.format(uri=parsed_uri)
-            for line in self.read_url(video.url):
-                if not line.startswith('#'):
-                    if not line.startswith('http'):
-                        line = u'%s%s' % (baseurl, line)
-                    content += (line,)
-
-            args = ('wget', '-nv',) + content + ('-O', dest)
         else:
-            if check_exec('wget'):
-                args = ('wget', '-c', video.url, '-O', dest)
-            elif check_exec('curl'):
-                args = ('curl', '-C', '-', video.url, '-o', dest)
-            else:
-                return 1
+            return self.download_http(video, dest)
 
         self.logger.debug(' '.join(args))
         os.spawnlp(os.P_WAIT, args[0], *args)
 
-    def read_url(self, url):
-        r = requests.get(url, stream=True)
-        return r.iter_lines()
+    def download_http(self, video, dest):
+        downloader = Downloader(self.weboob[video.backend].browser,
+                                PrintDownloadProgress(self.stderr),
+                                logger=self.logger)
+        try:
+            if u'm3u8' == video.ext:
+                _dest, _ = os.path.splitext(dest)
+                dest = u'%s.%s' % (_dest, 'mp4')
+                downloader.download_hls(video.url, dest)
+            else:
+                downloader.download(video.url, dest)
+        except (BrowserHTTPError, RequestException, IOError) as e:
+            print('Unable to download "%s": %s' % (video.url, e), file=self.stderr)
+            return 1
 
     def complete_download(self, text, line, *ignored):
         args = line.split(' ')
@@ -57,7 +57,7 @@ from .exceptions import HTTPNotFound, ClientError, ServerError
 from .sessions import FuturesSession
 from .profiles import Firefox
 from .pages import NextPage
-from .url import URL
+from .url import URL, URLIndex
 
 
 class Browser(object):
@@ -96,6 +96,18 @@ class Browser(object):
     Maximum of threads for asynchronous requests.
     """
 
+    PREFETCH_MAX_PER_HOST = None
+    """
+    Maximum of requests sent at the same time to a host, when pages of the
+    items of a :class:`weboob.browser.elements.ListElement` are loaded.
+    """
+
+    PREFETCH_DELAY = 0
+    """
+    Minimum of seconds between two requests to a host, when pages of the
+    items of a :class:`weboob.browser.elements.ListElement` are loaded.
+    """
+
     ALLOW_REFERRER = True
     """
     Controls the behavior of get_referrer.
@@ -594,6 +606,7 @@ class _PagesBrowserMeta(type):
         else:
             new_class._urls = deepcopy(new_class._urls)
         new_class._urls.update(urls)
+        new_class._url_index = URLIndex(new_class._urls, getattr(new_class, 'BASEURL', None))
         return new_class
 
 
@@ -626,6 +639,7 @@ class PagesBrowser(DomainBrowser):
 
 
     _urls = None
+    _url_index = None
     __metaclass__ = _PagesBrowserMeta
 
     def __getattr__(self, name):
@@ -644,6 +658,17 @@ class PagesBrowser(DomainBrowser):
         for url in self._urls.itervalues():
             url.browser = self
 
+    def get_url_index(self):
+        """
+        Get the :class:`weboob.browser.url.URLIndex` of URL objects.
+
+        The one built with the class is used, unless :attr:`BASEURL` or URL
+        objects have been changed on this instance.
+        """
+        if not self._url_index.is_valid(self._urls, self.BASEURL):
+            self._url_index = URLIndex(self._urls, self.BASEURL)
+        return self._url_index
+
     def open(self, *args, **kwargs):
         """
         Same method than
@@ -660,7 +685,8 @@ class PagesBrowser(DomainBrowser):
         def internal_callback(response):
             # Try to handle the response page with an URL instance.
             response.page = None
-            for url in self._urls.itervalues():
+            for name in self.get_url_index().candidates(response.url):
+                url = self._urls[name]
                 page = url.handle(response)
                 if page is not None:
                     self.logger.debug('Handle %s with %s' % (response.url, page.__class__.__name__))
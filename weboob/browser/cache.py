@@ -17,14 +17,140 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['CacheMixin']
+from email.utils import parsedate_tz, mktime_tz
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from threading import Lock
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from weboob.tools.compat import unicode
+from weboob.tools.json import json
+
+
+__all__ = ['CacheMixin', 'CacheEntry', 'CachePolicy', 'SQLiteCacheStore']
+
+
+def _encode(value):
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value.encode('utf-8') if isinstance(value, unicode) else value
+
+
+def parse_http_date(value):
+    """
+    Parse a HTTP date to a timestamp, or return None if it is invalid.
+    """
+    if not value:
+        return None
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    try:
+        return mktime_tz(parsed)
+    except (OverflowError, ValueError):
+        return None
 
 
 class CacheEntry(object):
-    def __init__(self, response):
-        self.response = response
-        self.etag = response.headers.get('ETag')
-        self.last_modified = response.headers.get('Last-Modified')
+    """
+    Cached response.
+
+    It can be built from a live :class:`requests.Response`, or from stored
+    fields (see :meth:`from_row`), in which case the response is rebuilt
+    when :attr:`response` is accessed.
+
+    :param response: response to store
+    :type response: :class:`requests.Response`
+    :param request: request which got this response, used to store values
+                    of headers listed in `Vary`
+    :type request: :class:`requests.Request`
+    """
+
+    def __init__(self, response, request=None, stored_at=None):
+        self._response = response
+        self.url = response.url
+        self.status_code = response.status_code
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.stored_at = stored_at or time.time()
+        self.vary = {}
+        if request is not None:
+            request_headers = CaseInsensitiveDict(request.headers)
+            for name in self.vary_names:
+                self.vary[name] = request_headers.get(name)
+
+    @classmethod
+    def from_row(cls, url, status_code, headers, content, stored_at, vary):
+        entry = cls.__new__(cls)
+        entry._response = None
+        entry._content = content
+        entry.url = url
+        entry.status_code = status_code
+        entry.headers = CaseInsensitiveDict(headers)
+        entry.stored_at = stored_at
+        entry.vary = vary
+        return entry
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    @property
+    def vary_names(self):
+        return [name.strip().lower() for name in self.headers.get('Vary', '').split(',') if name.strip()]
+
+    @property
+    def content(self):
+        if self._response is not None:
+            return self._response.content
+        return self._content
+
+    @property
+    def response(self):
+        if self._response is None:
+            response = Response()
+            response.url = self.url
+            response.status_code = self.status_code
+            response.headers = CaseInsensitiveDict(self.headers)
+            response._content = self._content
+            response.encoding = get_encoding_from_headers(response.headers)
+            self._response = response
+        return self._response
+
+    def matches(self, request):
+        """
+        Whether the entry can answer this request, according to the `Vary`
+        header of the stored response.
+        """
+        if '*' in self.vary_names:
+            return False
+
+        request_headers = CaseInsensitiveDict(request.headers)
+        return all(request_headers.get(name) == value for name, value in self.vary.items())
+
+    def refresh(self, response):
+        """
+        Update the entry with a `304 Not Modified` response.
+        """
+        headers = dict((name, value) for name, value in response.headers.items()
+                       if name.lower() not in ('content-length', 'content-encoding', 'transfer-encoding'))
+        self.headers.update(headers)
+        self.stored_at = time.time()
+        if self._response is not None:
+            self._response.headers.update(headers)
 
     def has_cache_key(self):
         return (self.etag or self.last_modified)
@@ -36,9 +162,250 @@ class CacheEntry(object):
             request.headers['If-None-Match'] = self.etag
 
 
+class CachePolicy(object):
+    """
+    Decide whether responses can be stored, and how long they stay fresh,
+    following RFC 7234.
+
+    A browser is a private cache, so `s-maxage` is only considered when
+    :attr:`shared` is True.
+    """
+
+    shared = False
+
+    HEURISTIC_FRACTION = 0.1
+    """
+    Fraction of the time since Last-Modified used as lifetime of responses
+    without explicit expiration.
+    """
+
+    HEURISTIC_MAX = 24 * 3600
+    """
+    Maximum heuristic lifetime, in seconds.
+    """
+
+    CACHE_CONTROL_RE = re.compile(r'\s*([\w-]+)\s*(?:=\s*"?([^",]*)"?)?\s*(?:,|$)')
+
+    def cache_control(self, headers):
+        """
+        Parse the Cache-Control header.
+
+        :rtype: dict
+        """
+        return dict((name.lower(), value) for name, value in self.CACHE_CONTROL_RE.findall(headers.get('Cache-Control', '')))
+
+    def _seconds(self, cache_control, directive):
+        try:
+            return int(cache_control[directive])
+        except (KeyError, ValueError):
+            return None
+
+    def is_storable(self, entry, ttl=None, shared=None):
+        """
+        Whether the entry can be stored at all.
+
+        :param ttl: lifetime forced by the browser
+        :param shared: whether the store is shared, default is :attr:`shared`
+        """
+        if shared is None:
+            shared = self.shared
+        cache_control = self.cache_control(entry.headers)
+        if 'no-store' in cache_control or 'private' in cache_control and shared:
+            return False
+        if '*' in entry.vary_names:
+            return False
+        return bool(ttl or entry.has_cache_key() or self.freshness_lifetime(entry))
+
+    def freshness_lifetime(self, entry, ttl=None):
+        """
+        Duration in seconds during which the entry can be used without
+        asking the server.
+
+        :param ttl: lifetime forced by the browser, overrides headers
+        """
+        if ttl is not None:
+            return ttl
+
+        cache_control = self.cache_control(entry.headers)
+        if 'no-cache' in cache_control:
+            return 0
+
+        if self.shared:
+            lifetime = self._seconds(cache_control, 's-maxage')
+            if lifetime is not None:
+                return lifetime
+
+        lifetime = self._seconds(cache_control, 'max-age')
+        if lifetime is not None:
+            return lifetime
+
+        date = parse_http_date(entry.headers.get('Date')) or entry.stored_at
+        if 'Expires' in entry.headers:
+            expires = parse_http_date(entry.headers['Expires'])
+            # An invalid date means "already expired".
+            return max(0, expires - date) if expires else 0
+
+        last_modified = parse_http_date(entry.last_modified)
+        if last_modified is not None and last_modified < date:
+            return min(self.HEURISTIC_MAX, (date - last_modified) * self.HEURISTIC_FRACTION)
+
+        return 0
+
+    def current_age(self, entry, now=None):
+        """
+        Age of the entry in seconds, including the Age sent by the server.
+        """
+        try:
+            age = int(entry.headers.get('Age', 0))
+        except ValueError:
+            age = 0
+        return age + (now or time.time()) - entry.stored_at
+
+    def is_fresh(self, entry, ttl=None, now=None):
+        return self.current_age(entry, now) < self.freshness_lifetime(entry, ttl)
+
+    def can_serve_stale(self, entry, ttl=None, now=None):
+        """
+        Whether the stale entry can be returned while it is revalidated in
+        background (`stale-while-revalidate`).
+        """
+        cache_control = self.cache_control(entry.headers)
+        window = self._seconds(cache_control, 'stale-while-revalidate')
+        if not window or 'must-revalidate' in cache_control or 'no-cache' in cache_control:
+            return False
+        return self.current_age(entry, now) < self.freshness_lifetime(entry, ttl) + window
+
+
+class SQLiteCacheStore(object):
+    """
+    Cache store kept in a sqlite database, to share the cache between
+    runs and processes.
+
+    It can be used as :attr:`CacheMixin.cache`:
+
+    >>> browser.cache = SQLiteCacheStore(os.path.join(weboob.workdir, 'cache.sqlite'))  # doctest: +SKIP
+
+    :param path: path of the database file
+    :type path: :class:`str`
+    :param max_size: when the sum of bodies sizes exceeds this value (in
+                     bytes), least recently used entries are evicted
+    :type max_size: :class:`int`
+    :param max_age: entries older than this (in seconds) are evicted
+    :type max_age: :class:`int`
+    """
+
+    MAX_SIZE = 100 * 1024 * 1024
+    MAX_AGE = 7 * 24 * 3600
+
+    # Several processes, maybe for several users, use the same database,
+    # so `private` responses are not stored.
+    shared = True
+
+    def __init__(self, path, max_size=None, max_age=None):
+        self.path = path
+        self.max_size = max_size or self.MAX_SIZE
+        self.max_age = max_age or self.MAX_AGE
+
+        dirname = os.path.dirname(path)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        self.lock = Lock()
+        # Other processes may hold the lock for a while, so wait for them.
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                            'key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, vary TEXT, content BLOB, '
+                            'size INTEGER, stored_at REAL, accessed_at REAL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+    def __contains__(self, key):
+        with self.lock:
+            cur = self.db.execute('SELECT 1 FROM entries WHERE key = ? AND stored_at >= ?',
+                                  (self.hash_key(key), time.time() - self.max_age))
+            return cur.fetchone() is not None
+
+    def get(self, key, default=None):
+        hkey = self.hash_key(key)
+        with self.lock, self.db:
+            cur = self.db.execute('SELECT url, status, headers, content, stored_at, vary FROM entries '
+                                  'WHERE key = ? AND stored_at >= ?', (hkey, time.time() - self.max_age))
+            row = cur.fetchone()
+            if row is None:
+                return default
+            self.db.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (time.time(), hkey))
+
+        url, status, headers, content, stored_at, vary = row
+        return CacheEntry.from_row(url, status, json.loads(headers), bytes(content), stored_at, json.loads(vary))
+
+    def __getitem__(self, key):
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key, entry):
+        content = entry.content
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                            (self.hash_key(key), entry.url, entry.status_code, json.dumps(dict(entry.headers)),
+                             json.dumps(entry.vary), sqlite3.Binary(content), len(content), entry.stored_at, now))
+            self.evict()
+
+    def __delitem__(self, key):
+        with self.lock, self.db:
+            self.db.execute('DELETE FROM entries WHERE key = ?', (self.hash_key(key),))
+
+    def evict(self):
+        """
+        Remove expired entries, then least recently used ones while the
+        cache is too large.
+
+        Must be called with the lock held, in a transaction.
+        """
+        self.db.execute('DELETE FROM entries WHERE stored_at < ?', (time.time() - self.max_age,))
+
+        size, = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()
+        if size <= self.max_size:
+            return
+
+        to_delete = []
+        for key, entry_size in self.db.execute('SELECT key, size FROM entries ORDER BY accessed_at'):
+            if size <= self.max_size:
+                break
+            to_delete.append((key,))
+            size -= entry_size
+        self.db.executemany('DELETE FROM entries WHERE key = ?', to_delete)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
 class CacheMixin(object):
     """Mixin to inherit in a Browser"""
 
+    CACHE_TTL = {}
+    """
+    Lifetimes in seconds forced for responses of some pages, regardless of
+    what headers say. Keys are names of :class:`weboob.browser.url.URL`
+    attributes of the :class:`weboob.browser.browsers.PagesBrowser`::
+
+        class MyBrowser(CacheMixin, PagesBrowser):
+            search = URL(r'/search\?q=(?P<pattern>.*)', SearchPage)
+            CACHE_TTL = {'search': 300}
+    """
+
+    CACHE_KEY_HEADERS = ('Authorization', 'Cookie')
+    """
+    Request headers which identify the user, and are part of cache keys.
+    """
+
     def __init__(self, *args, **kwargs):
         super(CacheMixin, self).__init__(*args, **kwargs)
 
@@ -47,7 +414,8 @@ class CacheMixin(object):
         """Cache store object
 
         To limit the size of the cache, a :class:`weboob.tools.lrudict.LimitedLRUDict`
-        instance can be used.
+        instance can be used. To keep it across runs, use a
+        :class:`SQLiteCacheStore`.
         """
 
         self.is_updatable = True
@@ -63,36 +431,121 @@ class CacheMixin(object):
         check if a newer version of the page exists.
         If a newer page exists, it is returned instead and overwrites the
         obsolete page in the cache.
+
+        In both cases, responses which are still fresh according to the
+        :attr:`cache_policy` are returned without any request.
         """
 
+        self.cache_policy = CachePolicy()
+
+        """Cache policy object
+
+        See :class:`CachePolicy`.
+        """
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._revalidating = set()
+
     def make_cache_key(self, request):
-        """Make a key for the cache corresponding to the request."""
+        """
+        Make a key for the cache corresponding to the request.
 
-        body = getattr(request, 'body', None)
-        headers = tuple(request.headers.values())
-        return (request.method, request.url, body, headers)
+        The key is made from the request as it would be sent, with the
+        query string of `params`, and the cookies and credentials of the
+        session. Only headers of :attr:`CACHE_KEY_HEADERS`, which identify
+        the user, are part of the key: the `Vary` header of the stored
+        response tells which other ones have to match.
+        """
+
+        prepared = self.prepare_request(request)
+
+        body = getattr(request, 'data', None)
+        if isinstance(body, dict):
+            body = sorted(body.items())
+        if isinstance(body, (list, tuple)):
+            body = urlencode([(_encode(name), _encode(value)) for name, value in body], doseq=True)
+        else:
+            body = prepared.body or None
+
+        headers = prepared.headers
+        identity = tuple((name, headers[name]) for name in self.CACHE_KEY_HEADERS if headers.get(name))
+        return (prepared.method, prepared.url, body, identity)
+
+    def get_cache_ttl(self, url):
+        """
+        Get the lifetime forced by :attr:`CACHE_TTL` for this url, if any.
+        """
+        urls = getattr(self, '_urls', None)
+        if not self.CACHE_TTL or not urls:
+            return None
+
+        for name, ttl in self.CACHE_TTL.items():
+            if name in urls and urls[name].match(url):
+                return ttl
+
+    def _cache_hit(self, request, entry):
+        self.cache_hits += 1
+        self.logger.debug('cache HIT for %r (%d hits, %d misses)', request.url, self.cache_hits, self.cache_misses)
+        return entry.response
+
+    def _store(self, key, request, response, entry, ttl):
+        if response.status_code == 304 and entry is not None:
+            entry.refresh(response)
+            self.cache[key] = entry
+            return True
+        elif response.status_code == 200:
+            new_entry = CacheEntry(response, request)
+            shared = self.cache_policy.shared or getattr(self.cache, 'shared', False)
+            if self.cache_policy.is_storable(new_entry, ttl, shared):
+                self.logger.debug('storing %r response in cache', request.url)
+                self.cache[key] = new_entry
+        return False
+
+    def _revalidate(self, key, request, entry, ttl, **kwargs):
+        if key in self._revalidating:
+            return
+        self._revalidating.add(key)
+
+        entry.update_request(request)
+
+        def callback(response):
+            try:
+                self._store(key, request, response, entry, ttl)
+            finally:
+                self._revalidating.discard(key)
+            return response
+
+        self.logger.debug('revalidating stale %r in background', request.url)
+        super(CacheMixin, self).open(request, is_async=True, callback=callback, **kwargs)
 
     def open_with_cache(self, url, **kwargs):
         """Perform a request using the cache if possible."""
         request = self.build_request(url, **kwargs)
 
         key = self.make_cache_key(request)
-        if key in self.cache:
-            if not self.is_updatable:
-                self.logger.debug('cache HIT for %r', request.url)
-                return self.cache[key].response
+        try:
+            entry = self.cache[key]
+        except KeyError:
+            entry = None
+
+        if entry is not None and not entry.matches(request):
+            entry = None
+
+        ttl = self.get_cache_ttl(request.url)
+        if entry is not None:
+            if not self.is_updatable or self.cache_policy.is_fresh(entry, ttl):
+                return self._cache_hit(request, entry)
+            elif self.cache_policy.can_serve_stale(entry, ttl):
+                self._revalidate(key, request, entry, ttl, **kwargs)
+                return self._cache_hit(request, entry)
             else:
-                self.cache[key].update_request(request)
+                entry.update_request(request)
 
         response = super(CacheMixin, self).open(request, **kwargs)
-        if response.status_code == 304:
-            self.logger.debug('cache HIT for %r', request.url)
-            return self.cache[key].response
-        elif response.status_code == 200:
-            entry = CacheEntry(response)
-            if entry.has_cache_key():
-                self.logger.debug('storing %r response in cache', request.url)
-                self.cache[key] = entry
+        if self._store(key, request, response, entry, ttl):
+            return self._cache_hit(request, entry)
 
-        self.logger.debug('cache MISS for %r', request.url)
+        self.cache_misses += 1
+        self.logger.debug('cache MISS for %r (%d hits, %d misses)', request.url, self.cache_hits, self.cache_misses)
         return response
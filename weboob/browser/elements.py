@@ -17,16 +17,19 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
+import datetime
 import os
 import re
 import sys
-from collections import OrderedDict
+from collections import OrderedDict, MutableMapping
 from copy import deepcopy
+from decimal import Decimal
 
 import lxml.html
 
 from weboob.tools.log import getLogger, DEBUG_FILTERS
 from weboob.browser.pages import NextPage
+from weboob.browser.prefetch import Prefetcher
 
 from .filters.standard import _Filter, CleanText
 from .filters.html import AttributeNotFound, XPathNotFound
@@ -41,6 +44,99 @@ class DataError(Exception):
     """
 
 
+# Values which are not copied when they are read from the environment of a
+# parent element.
+_IMMUTABLE_TYPES = (basestring, int, long, float, bool, type(None), Decimal,
+                    datetime.date, datetime.time, datetime.timedelta)
+
+_DELETED = object()
+
+_loggers = {}
+
+
+def _get_logger(name):
+    """
+    Same as :func:`getLogger`, but cached, as it is called for every element.
+    """
+    try:
+        return _loggers[name]
+    except KeyError:
+        logger = _loggers[name] = getLogger(name)
+        return logger
+
+
+class _ElementEnv(MutableMapping):
+    """
+    Environment of an element.
+
+    It behaves like a deep copy of the environment of its parent, but
+    values are only copied when they are read, and only if they are
+    mutable. Changes are kept in a dict of the element, and when a child is
+    created, this dict is frozen and shared with the child.
+    """
+
+    def __init__(self, maps=()):
+        self._data = {}
+        # Dicts of the parents, never modified anymore
+        self._maps = maps
+
+    def fork(self):
+        """
+        Get a new environment for a child element.
+        """
+        if self._data:
+            self._maps = (self._data,) + self._maps
+            self._data = {}
+        return _ElementEnv(self._maps)
+
+    def __getitem__(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            for data in self._maps:
+                if key in data:
+                    value = data[key]
+                    break
+            else:
+                raise KeyError(key)
+
+            if value is not _DELETED and not isinstance(value, _IMMUTABLE_TYPES):
+                value = self._data[key] = deepcopy(value)
+
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        self[key]
+        self._data[key] = _DELETED
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        seen = set()
+        for data in (self._data,) + self._maps:
+            for key, value in data.iteritems():
+                if key not in seen:
+                    seen.add(key)
+                    if value is not _DELETED:
+                        yield key
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, dict(self))
+
+
 def method(klass):
     """
     Class-decorator to call it as a method.
@@ -51,7 +147,20 @@ def method(klass):
     return inner
 
 
+class _ElementMeta(type):
+    """
+    Private meta-class used to forget the cached names of loaders of an
+    :class:`AbstractElement` class when one is set on it.
+    """
+    def __setattr__(cls, name, value):
+        super(_ElementMeta, cls).__setattr__(name, value)
+        if name.startswith('load_') and '_loader_names' in cls.__dict__:
+            delattr(cls, '_loader_names')
+
+
 class AbstractElement(object):
+    __metaclass__ = _ElementMeta
+
     _creation_counter = 0
     condition = None
 
@@ -66,9 +175,9 @@ class AbstractElement(object):
             self.el = page.doc
 
         if parent is not None:
-            self.env = deepcopy(parent.env)
+            self.env = parent.env.fork()
         else:
-            self.env = deepcopy(page.params)
+            self.env = _ElementEnv((dict(page.params or {}),))
 
         # Used by debug
         self._random_id = AbstractElement._creation_counter
@@ -99,27 +208,87 @@ class AbstractElement(object):
     def xpath(self, *args, **kwargs):
         return self.el.xpath(*args, **kwargs)
 
+    @classmethod
+    def _get_loader_names(cls):
+        # Cached in the class itself, not inherited from a parent class.
+        try:
+            return cls.__dict__['_loader_names']
+        except KeyError:
+            names = []
+            for attrname in dir(cls):
+                m = re.match('load_(.*)', attrname)
+                if m:
+                    names.append((attrname, m.group(1)))
+            cls._loader_names = names
+            return names
+
+    def get_prefetcher(self):
+        """
+        Get the :class:`Prefetcher` used to load pages of the ``load_*``
+        attributes, the one of the closest :class:`ListElement`.
+        """
+        if self.parent is None:
+            return None
+        return self.parent.get_prefetcher()
+
     def handle_loaders(self):
-        for attrname in dir(self):
-            m = re.match('load_(.*)', attrname)
-            if not m:
-                continue
-            name = m.group(1)
+        for attrname, name in self._get_loader_names():
             if name in self.loaders:
                 continue
             loader = getattr(self, attrname)
             self.loaders[name] = self.use_selector(loader, key=attrname)
 
 
+class _ListElementMeta(_ElementMeta):
+    """
+    Private meta-class used to find once the nested :class:`AbstractElement`
+    classes of :class:`ListElement`.
+    """
+    def __new__(mcs, name, bases, attrs):
+        new_class = super(_ListElementMeta, mcs).__new__(mcs, name, bases, attrs)
+        new_class._item_classes = mcs.find_item_classes(new_class)
+        return new_class
+
+    def __setattr__(cls, name, value):
+        super(_ListElementMeta, cls).__setattr__(name, value)
+        if not name.startswith('__') and name not in ('_item_classes', '_loader_names'):
+            super(_ListElementMeta, cls).__setattr__('_item_classes', type(cls).find_item_classes(cls))
+
+    @staticmethod
+    def find_item_classes(cls):
+        # Keep the order of dir(), which is the one used to be processed.
+        item_classes = []
+        for attrname in dir(cls):
+            attr = getattr(cls, attrname)
+            if isinstance(attr, type) and issubclass(attr, AbstractElement) and attr is not cls:
+                item_classes.append(attr)
+        return tuple(item_classes)
+
+
 class ListElement(AbstractElement):
+    __metaclass__ = _ListElementMeta
+
     item_xpath = None
     flush_at_end = False
     ignore_duplicate = False
 
+    streaming = False
+    """
+    If True, each item is parsed and yielded before the next nodes are
+    processed, instead of building every items first (and starting their
+    loaders) and then yielding them.
+
+    Items with ``load_*`` attributes are always built first, so their pages
+    are loaded in parallel.
+    """
+
+    _item_classes = ()
+
     def __init__(self, *args, **kwargs):
         super(ListElement, self).__init__(*args, **kwargs)
-        self.logger = getLogger(self.__class__.__name__.lower())
+        self.logger = _get_logger(self.__class__.__name__.lower())
         self.objects = OrderedDict()
+        self._prefetcher = None
 
     def __call__(self, *args, **kwargs):
         for key, value in kwargs.iteritems():
@@ -145,30 +314,55 @@ class ListElement(AbstractElement):
 
         self.parse(self.el)
 
-        items = []
-        for el in self.find_elements():
-            for attrname in dir(self):
-                attr = getattr(self, attrname)
-                if isinstance(attr, type) and issubclass(attr, AbstractElement) and attr != type(self):
-                    item = attr(self.page, self, el)
-                    if item.condition is not None and not item.condition():
-                        continue
-
-                    item.handle_loaders()
-                    items.append(item)
-
-        for item in items:
-            for obj in item:
-                obj = self.store(obj)
-                if obj and not self.flush_at_end:
+        try:
+            items = self.iter_items()
+            if not self.streaming or self.has_loaders():
+                # Items are built first, so their pages are all asked to the
+                # prefetcher before being used.
+                items = list(items)
+
+            for item in items:
+                for obj in item:
+                    obj = self.store(obj)
+                    if obj and not self.flush_at_end:
+                        yield obj
+
+            if self.flush_at_end:
+                for obj in self.flush():
                     yield obj
-
-        if self.flush_at_end:
-            for obj in self.flush():
-                yield obj
+        finally:
+            if self._prefetcher is not None:
+                self._prefetcher.cancel()
 
         self.check_next_page()
 
+    def get_prefetcher(self):
+        if self._prefetcher is None:
+            browser = getattr(self.page, 'browser', None)
+            if browser is None:
+                return None
+            self._prefetcher = Prefetcher(browser)
+        return self._prefetcher
+
+    def has_loaders(self):
+        """
+        Return True if items have ``load_*`` attributes.
+        """
+        return any(klass._get_loader_names() for klass in self._item_classes)
+
+    def iter_items(self):
+        """
+        Build the elements of nested classes for each node.
+        """
+        for el in self.find_elements():
+            for klass in self._item_classes:
+                item = klass(self.page, self, el)
+                if item.condition is not None and not item.condition():
+                    continue
+
+                item.handle_loaders()
+                yield item
+
     def flush(self):
         for obj in self.objects.itervalues():
             yield obj
@@ -207,7 +401,7 @@ class SkipItem(Exception):
     """
 
 
-class _ItemElementMeta(type):
+class _ItemElementMeta(_ElementMeta):
     """
     Private meta-class used to keep order of obj_* attributes in :class:`ItemElement`.
     """
@@ -239,7 +433,7 @@ class ItemElement(AbstractElement):
 
     def __init__(self, *args, **kwargs):
         super(ItemElement, self).__init__(*args, **kwargs)
-        self.logger = getLogger(self.__class__.__name__.lower())
+        self.logger = _get_logger(self.__class__.__name__.lower())
         self.obj = None
         self.saved_attrib = {}  # safer way would be to clone lxml tree
 
@@ -323,8 +517,8 @@ class ItemElement(AbstractElement):
             # Help debugging as tracebacks do not give us the key
             self.logger.warning('Attribute %s raises %s' % (key, repr(e)))
             raise
-        logger = getLogger('b2filters')
-        logger.log(DEBUG_FILTERS, "%s.%s = %r" % (self._random_id, key, value))
+        logger = _get_logger('b2filters')
+        logger.log(DEBUG_FILTERS, "%s.%s = %r", self._random_id, key, value)
         setattr(self.obj, key, value)
 
 
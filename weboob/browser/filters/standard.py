@@ -27,12 +27,13 @@ from decimal import Decimal, InvalidOperation
 from itertools import islice
 from collections import Iterator
 
-from dateutil.parser import parse as parse_date
 import lxml.html
+from lxml import etree
 
 from weboob.capabilities.base import empty
 from weboob.capabilities.base import Currency as BaseCurrency
 from weboob.tools.compat import basestring
+from weboob.tools.date import parse_datetime
 from weboob.exceptions import ParseError
 from weboob.browser.url import URL
 from weboob.tools.log import getLogger, DEBUG_FILTERS
@@ -98,6 +99,27 @@ class _Filter(object):
     def __str__(self):
         return self.__class__.__name__
 
+    def xpath(self, selector, item):
+        """
+        Evaluate a XPath selector on an element, or on the element of an
+        :class:`ItemElement`.
+
+        Selectors are compiled the first time they are used by this filter.
+        """
+        el = getattr(item, 'el', item)
+        if not isinstance(el, (etree._Element, etree._ElementTree)):
+            return item.xpath(selector)
+
+        try:
+            xpaths = self._xpaths
+        except AttributeError:
+            xpaths = self._xpaths = {}
+        try:
+            compiled = xpaths[selector]
+        except KeyError:
+            compiled = xpaths[selector] = etree.XPath(selector)
+        return compiled(el)
+
     def highlight_el(self, el, item=None):
         obj = self._obj or item
         try:
@@ -116,6 +138,41 @@ class _Filter(object):
             el.attrib['title'] = 'weboob field: %s' % self._key
 
 
+def _log_filter(logger, filter_, value):
+    """
+    Log the name, input value and arguments of a filter.
+    """
+    result = ''
+    outputvalue = value
+    if isinstance(value, list):
+        from lxml import etree
+        outputvalue = ''
+        first = True
+        for element in value:
+            if first:
+                first = False
+            else:
+                outputvalue += ', '
+            if isinstance(element, etree.ElementBase):
+                outputvalue += "%s" % etree.tostring(element, encoding=unicode)
+            else:
+                outputvalue += "%r" % element
+    if filter_._obj is not None:
+        result += "%s" % filter_._obj._random_id
+    if filter_._key is not None:
+        result += ".%s" % filter_._key
+    name = str(filter_)
+    result += " %s(%r" % (name, outputvalue)
+    for arg in filter_.__dict__:
+        if arg.startswith('_') or arg == u"selector":
+            continue
+        if arg == u'default' and getattr(filter_, arg) == _NO_DEFAULT:
+            continue
+        result += ", %s=%r" % (arg, getattr(filter_, arg))
+    result += u')'
+    logger.log(DEBUG_FILTERS, result)
+
+
 def debug(*args):
     """
     A decorator function to provide some debug information
@@ -123,40 +180,15 @@ def debug(*args):
     It prints by default the name of the Filter and the input value.
     """
     def wraper(function):
+        logger = getLogger('b2filters')
+
         @wraps(function)
         def print_debug(self, value):
-            logger = getLogger('b2filters')
-            result = ''
-            outputvalue = value
-            if isinstance(value, list):
-                from lxml import etree
-                outputvalue = ''
-                first = True
-                for element in value:
-                    if first:
-                        first = False
-                    else:
-                        outputvalue += ', '
-                    if isinstance(element, etree.ElementBase):
-                        outputvalue += "%s" % etree.tostring(element, encoding=unicode)
-                    else:
-                        outputvalue += "%r" % element
-            if self._obj is not None:
-                result += "%s" % self._obj._random_id
-            if self._key is not None:
-                result += ".%s" % self._key
-            name = str(self)
-            result += " %s(%r" % (name, outputvalue)
-            for arg in self.__dict__:
-                if arg.startswith('_') or arg == u"selector":
-                    continue
-                if arg == u'default' and getattr(self, arg) == _NO_DEFAULT:
-                    continue
-                result += ", %s=%r" % (arg, getattr(self, arg))
-            result += u')'
-            logger.log(DEBUG_FILTERS, result)
-            res = function(self, value)
-            return res
+            # Do not build the message when it would not be logged anyway,
+            # as filters are called for every field of every item.
+            if logger.isEnabledFor(DEBUG_FILTERS):
+                _log_filter(logger, self, value)
+            return function(self, value)
         return print_debug
     return wraper
 
@@ -181,7 +213,7 @@ class Filter(_Filter):
 
     def select(self, selector, item):
         if isinstance(selector, basestring):
-            ret = item.xpath(selector)
+            ret = self.xpath(selector, item)
         elif isinstance(selector, _Filter):
             selector._key = self._key
             selector._obj = self._obj
@@ -222,7 +254,14 @@ class _Selector(Filter):
 class AsyncLoad(Filter):
     def __call__(self, item):
         link = self.select(self.selector, item)
-        return item.page.browser.async_open(link) if link else None
+        if not link:
+            return None
+
+        # Pages of items of a list are loaded by its prefetcher.
+        prefetcher = item.get_prefetcher() if hasattr(item, 'get_prefetcher') else None
+        if prefetcher is not None:
+            return prefetcher.open(link)
+        return item.page.browser.async_open(link)
 
 
 class Async(Filter):
@@ -347,7 +386,7 @@ class TableCell(_Filter):
         for name in self.names:
             idx = item.parent.get_colnum(name)
             if idx is not None:
-                ret = item.xpath(self.td % (idx + 1))
+                ret = self.xpath(self.td % (idx + 1), item)
                 for el in ret:
                     self.highlight_el(el, item)
                 return ret
@@ -670,7 +709,7 @@ class Map(Filter):
 
 class DateTime(Filter):
     def __init__(self, selector=None, default=_NO_DEFAULT, dayfirst=False, translations=None,
-                 parse_func=parse_date, fuzzy=False):
+                 parse_func=parse_datetime, fuzzy=False):
         super(DateTime, self).__init__(selector, default=default)
         self.dayfirst = dayfirst
         self.translations = translations
@@ -692,7 +731,7 @@ class DateTime(Filter):
 
 class Date(DateTime):
     def __init__(self, selector=None, default=_NO_DEFAULT, dayfirst=False, translations=None,
-                 parse_func=parse_date, fuzzy=False):
+                 parse_func=parse_datetime, fuzzy=False):
         super(Date, self).__init__(selector, default=default, dayfirst=dayfirst, translations=translations,
                                    parse_func=parse_func, fuzzy=fuzzy)
 
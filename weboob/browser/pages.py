@@ -21,6 +21,7 @@ from __future__ import absolute_import
 
 from collections import OrderedDict
 from functools import wraps
+import re
 import warnings
 from io import BytesIO
 import codecs
@@ -31,6 +32,7 @@ except ImportError:
     import urllib.parse as urlparse
 
 import requests
+from requests.utils import iter_slices
 
 from weboob.exceptions import ParseError, ModuleInstallError
 from weboob.tools.compat import basestring
@@ -38,6 +40,10 @@ from weboob.tools.log import getLogger
 from weboob.tools.pdf import decompress_pdf
 
 
+# Whitespace characters of XML, as stripped by normalize-space()
+XML_SPACES = re.compile(u'[ \t\r\n]+')
+
+
 def pagination(func):
     r"""
     This helper decorator can be used to handle pagination pages easily.
@@ -330,6 +336,56 @@ class Form(OrderedDict):
         return self.page.browser.location(self.request, **kwargs)
 
 
+def _recode(chunks, from_encoding, to_encoding):
+    decoder = codecs.getincrementaldecoder(from_encoding)()
+    bom = True
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if bom and text:
+            if text.startswith(u'\ufeff'):
+                text = text[1:]
+            bom = False
+        yield text.encode(to_encoding)
+    yield decoder.decode(b'', True).encode(to_encoding)
+
+
+def _iter_lines(chunks, newlines_hack=False):
+    r"""
+    Split blocks of data in lines, which keep their trailing newline.
+
+    If *newlines_hack* is True, \r\n and \r are converted to \n.
+
+    >>> list(_iter_lines([b'a;b\r', b'\nc;', b'd\re;f'], True))
+    ['a;b\n', 'c;d\n', 'e;f']
+    """
+    buf = b''
+    for chunk in chunks:
+        buf += chunk
+        if newlines_hack:
+            # a trailing \r may be the first half of \r\n
+            cr = buf.endswith(b'\r')
+            if cr:
+                buf = buf[:-1]
+            buf = buf.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+        lines = buf.split(b'\n')
+        buf = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+
+        if newlines_hack and cr:
+            buf += b'\r'
+
+    if newlines_hack:
+        buf = buf.replace(b'\r', b'\n')
+    lines = buf.split(b'\n')
+    buf = lines.pop()
+    for line in lines:
+        yield line + b'\n'
+    if buf:
+        yield buf
+
+
 class CsvPage(Page):
     """
     Page which parses CSV files.
@@ -361,46 +417,75 @@ class CsvPage(Page):
     This means the rows will be also available as dictionaries.
     """
 
+    STREAM = False
+    """
+    If True, rows are parsed while the response is read, and :attr:`doc` is
+    an iterator which can be consumed only once (for example by a
+    :class:`weboob.browser.elements.ListElement` with ``streaming = True``).
+    The request has to be opened with ``stream=True``, otherwise the body is
+    read before the page is built.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    """
+    Size of data blocks read from the response.
+    """
+
+    @property
+    def data(self):
+        if self.STREAM:
+            return self.response.iter_content(self.CHUNK_SIZE)
+        return self.content
+
     def build_doc(self, content):
+        if isinstance(content, bytes):
+            content = iter_slices(content, self.CHUNK_SIZE)
+
         # We may need to temporarily convert content to utf-8 because csv
         # does not support Unicode.
         encoding = self.encoding
         if encoding == 'utf-16le':
-            # If there is a BOM, decode('utf-16') will get rid of it
-            content = content.decode('utf-16').encode('utf-8')
+            # If there is a BOM, get rid of it
+            content = _recode(content, 'utf-16le', 'utf-8')
             encoding = 'utf-8'
-        if self.NEWLINES_HACK:
-            content = content.replace('\r\n', '\n').replace('\r', '\n')
-        return self.parse(BytesIO(content), encoding)
+        return self.parse(_iter_lines(content, self.NEWLINES_HACK), encoding)
 
     def parse(self, data, encoding=None):
         """
         Method called by the constructor of :class:`CsvPage` to parse the document.
 
-        :param data: file stream
+        :param data: file stream or iterator of lines
         :type data: :class:`BytesIO`
         :param encoding: if given, use it to decode cell strings
         :type encoding: :class:`str`
+        :returns: rows, as dicts if :attr:`HEADER` is set; an iterator if
+                  :attr:`STREAM` is True, a list otherwise
+        """
+        rows = self.iter_rows(data, encoding)
+        if self.STREAM:
+            return rows
+        return list(rows)
+
+    def iter_rows(self, data, encoding=None):
+        """
+        Iterate on rows of the document, see :meth:`CsvPage.parse`.
         """
         import csv
         reader = csv.reader(data, dialect=self.DIALECT, **self.FMTPARAMS)
         header = None
-        drows = []
-        rows = []
         for i, row in enumerate(reader):
             if self.HEADER and i+1 < self.HEADER:
                 continue
             row = map(unicode.strip, self.decode_row(row, encoding))
             if header is None and self.HEADER:
                 header = row
-            else:
-                rows.append(row)
-                if header:
-                    drow = {}
-                    for i, cell in enumerate(row):
-                        drow[header[i]] = cell
-                    drows.append(drow)
-        return drows if header is not None else rows
+            elif header:
+                drow = {}
+                for i, cell in enumerate(row):
+                    drow[header[i]] = cell
+                yield drow
+            elif not self.HEADER:
+                yield row
 
     def decode_row(self, row, encoding):
         """
@@ -600,10 +685,16 @@ class HTMLPage(Page):
             2
             >>> len(root.xpath('//b[has-class("not-exists")]'))
             0
+            >>> len(root.xpath('//b[has-class("two text")]'))
+            1
             """
-            expressions = ' and '.join(["contains(concat(' ', normalize-space(@class), ' '), ' {0} ')".format(c) for c in classes])
-            xpath = 'self::*[@class and {0}]'.format(expressions)
-            return bool(context.context_node.xpath(xpath))
+            value = context.context_node.get('class')
+            if value is None:
+                return False
+            # same as contains(concat(' ', normalize-space(@class), ' '), ' c '),
+            # without compiling and running a XPath query on each node
+            value = u' %s ' % u' '.join(XML_SPACES.split(value.strip(u' \t\r\n')))
+            return all(u' %s ' % c in value for c in classes)
 
         def starts_with(context, text, prefix):
             if not isinstance(text, list):
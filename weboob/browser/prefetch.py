@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+from bisect import insort
+from itertools import count
+from threading import Lock, Timer
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+try:
+    from concurrent.futures import Future
+except ImportError:
+    Future = None
+
+import requests
+
+from weboob.tools.compat import basestring
+
+
+__all__ = ['Prefetcher']
+
+
+class Prefetcher(object):
+    """
+    Schedule asynchronous requests of pages, before they are needed.
+
+    It is used by :class:`weboob.browser.elements.ListElement` to load the
+    pages of the ``load_*`` attributes of its items:
+
+    * a URL is only requested once, every item asking for it gets the same
+      future;
+    * at most *max_workers* requests are sent at the same time, the other
+      ones are queued here instead of in the executor of the browser, so
+      other requests of the browser do not wait behind them;
+    * at most *max_per_host* requests are sent at the same time to a host,
+      with at least *delay* seconds between two of them;
+    * requests are sent by *priority*, then in the order they were asked.
+
+    :param browser: browser used to send requests
+    :type browser: :class:`weboob.browser.browsers.Browser`
+    :param max_workers: default is :attr:`Browser.MAX_WORKERS`
+    :param max_per_host: default is :attr:`Browser.PREFETCH_MAX_PER_HOST`
+    :param delay: default is :attr:`Browser.PREFETCH_DELAY`
+    """
+
+    def __init__(self, browser, max_workers=None, max_per_host=None, delay=None):
+        self.browser = browser
+        self.max_workers = max_workers or browser.MAX_WORKERS
+        self.max_per_host = max_per_host or getattr(browser, 'PREFETCH_MAX_PER_HOST', None)
+        self.delay = delay if delay is not None else getattr(browser, 'PREFETCH_DELAY', 0)
+
+        self.lock = Lock()
+        # Sorted list of (priority, number, host, url, future) not sent yet
+        self.queue = []
+        self.counter = count()
+        # Futures of URLs already asked
+        self.futures = {}
+        self.running = 0
+        # Number of running requests and time of the last one, by host
+        self.hosts_running = {}
+        self.hosts_last = {}
+        self.timer = None
+
+    def open(self, url, priority=0):
+        """
+        Ask to load a page.
+
+        :param url: URL or :class:`requests.Request` object
+        :param priority: requests with a lower priority are sent first
+        :type priority: int
+        :returns: a future of the response, as returned by
+                  :meth:`Browser.async_open`
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        if Future is None:
+            raise ImportError('Please install python-concurrent.futures')
+
+        if isinstance(url, basestring):
+            if hasattr(self.browser, 'absurl'):
+                url = self.browser.absurl(url)
+            key = url
+            host = urlparse(url).netloc
+        else:
+            # Requests can have data, do not merge them.
+            key = None
+            host = urlparse(url.url if isinstance(url, requests.Request) else '').netloc
+
+        with self.lock:
+            if key is not None and key in self.futures:
+                return self.futures[key]
+
+            future = Future()
+            if key is not None:
+                self.futures[key] = future
+            insort(self.queue, (priority, next(self.counter), host, url, future))
+
+        self.dispatch()
+        return future
+
+    def dispatch(self):
+        """
+        Send queued requests which are allowed to be sent now.
+        """
+        to_send = []
+        with self.lock:
+            now = time.time()
+            wait = None
+            busy = set()
+            for entry in list(self.queue):
+                if self.running >= self.max_workers:
+                    break
+
+                host = entry[2]
+                if host in busy:
+                    continue
+                if self.max_per_host and self.hosts_running.get(host, 0) >= self.max_per_host:
+                    busy.add(host)
+                    continue
+                next_time = self.hosts_last.get(host, 0) + self.delay
+                if self.delay and next_time > now:
+                    busy.add(host)
+                    wait = min(wait, next_time - now) if wait is not None else next_time - now
+                    continue
+
+                self.queue.remove(entry)
+                if not entry[4].set_running_or_notify_cancel():
+                    continue
+                self.running += 1
+                self.hosts_running[host] = self.hosts_running.get(host, 0) + 1
+                self.hosts_last[host] = now
+                to_send.append(entry)
+
+            if wait is not None and self.timer is None:
+                self.timer = Timer(wait, self._on_timer)
+                self.timer.daemon = True
+                self.timer.start()
+
+        for priority, number, host, url, future in to_send:
+            try:
+                response = self.browser.async_open(url)
+            except Exception as e:
+                future.set_exception(e)
+                self._release(host)
+            else:
+                response.add_done_callback(lambda response, host=host, future=future: self._on_done(response, host, future))
+
+    def cancel(self):
+        """
+        Cancel requests which have not been sent yet.
+        """
+        with self.lock:
+            queue, self.queue = self.queue, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+        for entry in queue:
+            entry[4].cancel()
+
+    def _on_timer(self):
+        with self.lock:
+            self.timer = None
+        self.dispatch()
+
+    def _on_done(self, response, host, future):
+        try:
+            result = response.result()
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        self._release(host)
+
+    def _release(self, host):
+        with self.lock:
+            self.running -= 1
+            self.hosts_running[host] -= 1
+        self.dispatch()
@@ -125,6 +125,7 @@ class FuturesSession(WeboobSession):
                 self.mount('http://', HTTPAdapter(**adapter_kwargs))
 
         self.executor = executor
+        self.pending = set()
 
     def send(self, *args, **kwargs):
         """Maintains the existing api for :meth:`Session.send`
@@ -154,10 +155,22 @@ class FuturesSession(WeboobSession):
         if is_async:
             if not self.executor:
                 raise ImportError('Please install python-concurrent.futures')
-            return self.executor.submit(func, *args, **kwargs)
+            future = self.executor.submit(func, *args, **kwargs)
+            self.pending.add(future)
+            future.add_done_callback(self.pending.discard)
+            return future
 
         return func(*args, **kwargs)
 
+    def cancel_pending(self):
+        """
+        Cancel asynchronous requests which have not been sent yet.
+
+        Requests which are already being processed can't be interrupted.
+        """
+        for future in list(self.pending):
+            future.cancel()
+
     def close(self):
         super(FuturesSession, self).close()
         if self.executor:
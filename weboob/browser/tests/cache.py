@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from weboob.browser import PagesBrowser, URL
+from weboob.browser.browsers import Browser
+from weboob.browser.cache import CacheMixin, SQLiteCacheStore
+
+
+# Mixin which does not go on the network: it answers every request with
+# the headers of self.next_headers, and 304 to conditional requests.
+class MyMockMixin(object):
+    def __init__(self, *args, **kwargs):
+        super(MyMockMixin, self).__init__(*args, **kwargs)
+        self.requests = []
+        self.next_headers = {}
+
+    def open(self, request, is_async=False, callback=lambda response: response, **kwargs):
+        self.requests.append(request)
+
+        response = Response()
+        response.url = request.url
+        response.headers = CaseInsensitiveDict(self.next_headers)
+        if 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = b'content of ' + request.url.encode('ascii')
+        return callback(response)
+
+
+class MyCacheBrowser(CacheMixin, MyMockMixin, Browser):
+    pass
+
+
+class MyCachePagesBrowser(CacheMixin, MyMockMixin, PagesBrowser):
+    BASEURL = 'http://weboob.org'
+
+    static = URL(r'/static/.*')
+    dynamic = URL(r'/.*')
+
+    CACHE_TTL = {'static': 60}
+
+
+class CacheTest(TestCase):
+    def setUp(self):
+        self.browser = MyCacheBrowser()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    # Check that responses without validators nor lifetime are not cached
+    def test_not_cached(self):
+        self.browser.open_with_cache('http://weboob.org/')
+        self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 2)
+        self.assertEqual(self.browser.cache_misses, 2)
+
+    # Check that a conditional request is sent when the entry has an ETag
+    def test_etag_revalidated(self):
+        self.browser.next_headers = {'ETag': '"abc"'}
+        self.browser.open_with_cache('http://weboob.org/')
+        response = self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 2)
+        self.assertEqual(self.browser.requests[1].headers['If-None-Match'], '"abc"')
+        self.assertEqual(response.content, b'content of http://weboob.org/')
+        self.assertEqual(self.browser.cache_hits, 1)
+
+    # Check that fresh entries are served without any request
+    def test_max_age(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=60'}
+        self.browser.open_with_cache('http://weboob.org/')
+        self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 1)
+        self.assertEqual(self.browser.cache_hits, 1)
+
+    # Check that the sqlite store is shared between browser instances
+    def test_sqlite_store(self):
+        self.browser.cache = SQLiteCacheStore(self.path)
+        self.browser.next_headers = {'Cache-Control': 'max-age=60', 'Content-Type': 'text/plain; charset=utf-8'}
+        self.browser.open_with_cache('http://weboob.org/')
+
+        browser = MyCacheBrowser()
+        browser.cache = SQLiteCacheStore(self.path)
+        response = browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(browser.requests), 0)
+        self.assertEqual(response.text, u'content of http://weboob.org/')
+        self.assertEqual(response.headers['Cache-Control'], 'max-age=60')
+
+    # Check that least recently used entries are evicted
+    def test_sqlite_store_max_size(self):
+        self.browser.cache = SQLiteCacheStore(self.path, max_size=60)
+        self.browser.next_headers = {'Cache-Control': 'max-age=60'}
+        for i in range(4):
+            self.browser.open_with_cache('http://weboob.org/%d' % i)
+
+        self.browser.open_with_cache('http://weboob.org/3')
+        self.browser.open_with_cache('http://weboob.org/0')
+        self.assertEqual(len(self.browser.requests), 5)
+
+    # Check that Expires is used when there is no max-age
+    def test_expires(self):
+        self.browser.next_headers = {'Date': 'Sun, 06 Nov 2016 08:49:37 GMT',
+                                     'Expires': 'Sun, 06 Nov 2016 08:50:37 GMT'}
+        self.browser.open_with_cache('http://weboob.org/')
+        entry = list(self.browser.cache.values())[0]
+        self.assertEqual(self.browser.cache_policy.freshness_lifetime(entry), 60)
+
+        self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 1)
+
+    # Check the heuristic lifetime of responses with only Last-Modified
+    def test_heuristic_freshness(self):
+        self.browser.next_headers = {'Date': 'Sun, 06 Nov 2016 10:00:00 GMT',
+                                     'Last-Modified': 'Sun, 06 Nov 2016 09:00:00 GMT'}
+        self.browser.open_with_cache('http://weboob.org/')
+        entry = list(self.browser.cache.values())[0]
+        self.assertEqual(self.browser.cache_policy.freshness_lifetime(entry), 360)
+
+    # Check that an entry is not used if a header listed in Vary differs
+    def test_vary(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language'}
+        self.browser.open_with_cache('http://weboob.org/', headers={'Accept-Language': 'fr'})
+        self.browser.open_with_cache('http://weboob.org/', headers={'Accept-Language': 'fr', 'Referer': 'http://weboob.org/'})
+        self.assertEqual(len(self.browser.requests), 1)
+        self.browser.open_with_cache('http://weboob.org/', headers={'Accept-Language': 'en'})
+        self.assertEqual(len(self.browser.requests), 2)
+
+    # Check that stale entries are returned and revalidated in background
+    def test_stale_while_revalidate(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=0, stale-while-revalidate=60', 'ETag': '"abc"'}
+        self.browser.open_with_cache('http://weboob.org/')
+        response = self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(response.content, b'content of http://weboob.org/')
+        self.assertEqual(self.browser.cache_hits, 1)
+        self.assertEqual(len(self.browser.requests), 2)
+        self.assertEqual(self.browser.requests[1].headers['If-None-Match'], '"abc"')
+
+    # Check that CACHE_TTL overrides headers
+    def test_ttl_override(self):
+        browser = MyCachePagesBrowser()
+        browser.open_with_cache('http://weboob.org/static/logo.png')
+        browser.open_with_cache('http://weboob.org/static/logo.png')
+        browser.open_with_cache('http://weboob.org/index.html')
+        browser.open_with_cache('http://weboob.org/index.html')
+        self.assertEqual(len(browser.requests), 3)
+
+    # Check that bodies with several values for a name give a valid key
+    def test_key_body(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=60'}
+        self.browser.open_with_cache('http://weboob.org/', data={'a': ['1', '2'], 'b': u'\xe9'})
+        self.browser.open_with_cache('http://weboob.org/', data={'b': u'\xe9', 'a': ['1', '2']})
+        self.assertEqual(len(self.browser.requests), 1)
+        self.browser.open_with_cache('http://weboob.org/', data={'a': ['1', '3'], 'b': u'\xe9'})
+        self.assertEqual(len(self.browser.requests), 2)
+
+    # Check that responses are not shared between users
+    def test_key_identity(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=60'}
+        self.browser.open_with_cache('http://weboob.org/', headers={'Authorization': 'Basic Zm9vOmJhcg=='})
+        self.browser.open_with_cache('http://weboob.org/', headers={'Authorization': 'Basic Zm9vOmJhcg=='})
+        self.assertEqual(len(self.browser.requests), 1)
+        self.browser.open_with_cache('http://weboob.org/', headers={'Authorization': 'Basic YmFyOmZvbw=='})
+        self.browser.session.headers['Cookie'] = 'session=1'
+        self.browser.open_with_cache('http://weboob.org/', headers={'Authorization': 'Basic Zm9vOmJhcg=='})
+        self.assertEqual(len(self.browser.requests), 3)
+
+    # Check that the query string of params is part of the key
+    def test_key_params(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=60'}
+        self.browser.open_with_cache('http://weboob.org/', params={'page': 1})
+        self.browser.open_with_cache('http://weboob.org/', params={'page': 2})
+        self.assertEqual(len(self.browser.requests), 2)
+        self.browser.open_with_cache('http://weboob.org/?page=2')
+        self.assertEqual(len(self.browser.requests), 2)
+
+    # Check that cookies of the session and credentials are part of the key
+    def test_key_session(self):
+        self.browser.next_headers = {'Cache-Control': 'max-age=60'}
+        self.browser.session.cookies.set('session', '1', domain='weboob.org')
+        self.browser.open_with_cache('http://weboob.org/')
+        self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 1)
+        self.browser.session.cookies.set('session', '2', domain='weboob.org')
+        self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 2)
+        self.browser.open_with_cache('http://weboob.org/', auth=('foo', 'bar'))
+        self.browser.open_with_cache('http://weboob.org/', auth=('bar', 'foo'))
+        self.assertEqual(len(self.browser.requests), 4)
+
+    # Check that private responses are not stored in the shared sqlite store
+    def test_sqlite_store_private(self):
+        self.browser.next_headers = {'Cache-Control': 'private, max-age=60'}
+        self.browser.open_with_cache('http://weboob.org/')
+        self.browser.open_with_cache('http://weboob.org/')
+        self.assertEqual(len(self.browser.requests), 1)
+
+        self.browser.cache = SQLiteCacheStore(self.path)
+        self.browser.open_with_cache('http://weboob.org/private')
+        self.browser.open_with_cache('http://weboob.org/private')
+        self.assertEqual(len(self.browser.requests), 3)
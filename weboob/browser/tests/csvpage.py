@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+from io import BytesIO
+from unittest import TestCase
+
+from requests import Response
+
+from weboob.browser.elements import DictElement, ItemElement
+from weboob.browser.filters.json import Dict
+from weboob.browser.pages import CsvPage
+from weboob.capabilities.base import BaseObject, StringField
+from weboob.tools.log import getLogger
+
+
+class MyObject(BaseObject):
+    label = StringField('Label')
+
+
+# Mock that allows to represent a Browser
+class MyMockBrowser(object):
+    logger = getLogger('test')
+
+
+# Mock of a raw stream which records how much was read
+class MyMockRaw(BytesIO):
+    def read(self, *args, **kwargs):
+        data = BytesIO.read(self, *args, **kwargs)
+        self.count = getattr(self, 'count', 0) + len(data)
+        return data
+
+    def stream(self, chunk_size, decode_content=None):
+        while True:
+            data = self.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+
+class MyCsvPage(CsvPage):
+    HEADER = 1
+    FMTPARAMS = {'delimiter': ';'}
+    CHUNK_SIZE = 16
+
+
+class MyStreamCsvPage(MyCsvPage):
+    STREAM = True
+
+
+class MyDictElement(DictElement):
+    streaming = True
+
+    class item(ItemElement):
+        klass = MyObject
+
+        obj_id = Dict('id')
+        obj_label = Dict('label')
+
+
+def make_response(content, stream=False):
+    response = Response()
+    response.url = 'https://weboob.org/export.csv'
+    response.raw = MyMockRaw(content)
+    if not stream:
+        response._content = response.raw.read()
+    return response
+
+
+class CsvPageTest(TestCase):
+    CONTENT = b'id;label\r\n' + b''.join(b'%d;line %d\r\n' % (i, i) for i in range(100))
+
+    # Check that a CsvPage builds dicts from the header
+    def test_header(self):
+        page = MyCsvPage(MyMockBrowser(), make_response(self.CONTENT))
+        self.assertEqual(len(page.doc), 100)
+        self.assertEqual(page.doc[1], {u'id': u'1', u'label': u'line 1'})
+
+    # Check that utf-16 documents with a BOM are decoded
+    def test_utf16(self):
+        class MyUtf16CsvPage(MyCsvPage):
+            ENCODING = 'utf-16le'
+
+        content = u'\ufeffid;label\r\n1;\xe9t\xe9\r\n'.encode('utf-16le')
+        page = MyUtf16CsvPage(MyMockBrowser(), make_response(content))
+        self.assertEqual(page.doc, [{u'id': u'1', u'label': u'\xe9t\xe9'}])
+
+    # Check that a streamed CsvPage reads the response while rows are consumed
+    def test_stream(self):
+        response = make_response(self.CONTENT, stream=True)
+        page = MyStreamCsvPage(MyMockBrowser(), response)
+        self.assertEqual(getattr(response.raw, 'count', 0), 0)
+
+        objects = iter(MyDictElement(page)())
+        obj = next(objects)
+        self.assertEqual((obj.id, obj.label), (u'0', u'line 0'))
+        self.assertLess(response.raw.count, len(self.CONTENT))
+
+        self.assertEqual(len(list(objects)), 99)
+        self.assertEqual(response.raw.count, len(self.CONTENT))
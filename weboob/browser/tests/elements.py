@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+from unittest import TestCase
+from lxml.html import fromstring
+
+from weboob.browser.elements import ListElement, ItemElement
+from weboob.browser.filters.standard import CleanText, Format
+from weboob.capabilities.base import BaseObject, StringField
+
+
+class MyObject(BaseObject):
+    label = StringField('Label')
+
+
+# Mock that allows to represent a Page
+class MyMockPage(object):
+    def __init__(self, html, params=None):
+        self.doc = fromstring(html)
+        self.params = params or {}
+        self.browser = None
+
+
+class MyListElement(ListElement):
+    item_xpath = '//li'
+
+    class item(ItemElement):
+        klass = MyObject
+
+        obj_id = CleanText('./@id')
+        obj_label = CleanText('.')
+
+    class another_item(ItemElement):
+        klass = MyObject
+
+        def condition(self):
+            return self.el.attrib.get('class') == 'twice'
+
+        obj_id = Format('%s-bis', CleanText('./@id'))
+        obj_label = CleanText('.')
+
+
+class ListElementTest(TestCase):
+    def setUp(self):
+        self.page = MyMockPage('<ul><li id="1">one</li><li id="2" class="twice">two</li></ul>')
+
+    # Check that nested item classes are found once, in the order of dir()
+    def test_item_classes(self):
+        self.assertEqual(MyListElement._item_classes,
+                         (MyListElement.another_item, MyListElement.item))
+
+    # Check that classes set after the class creation are found too
+    def test_item_classes_setattr(self):
+        class MyOtherListElement(ListElement):
+            pass
+
+        self.assertEqual(MyOtherListElement._item_classes, ())
+        MyOtherListElement.item = MyListElement.item
+        self.assertEqual(MyOtherListElement._item_classes, (MyListElement.item,))
+
+    # Check that items are yielded for each node and each nested class
+    def test_iter(self):
+        objects = [obj.id for obj in MyListElement(self.page)()]
+        self.assertEqual(objects, [u'1', u'2-bis', u'2'])
+
+    # Check that the streaming mode gives the same objects, lazily
+    def test_iter_streaming(self):
+        class MyStreamingListElement(MyListElement):
+            streaming = True
+
+        it = iter(MyStreamingListElement(self.page)())
+        self.assertEqual(next(it).id, u'1')
+        self.assertEqual([obj.id for obj in it], [u'2-bis', u'2'])
+
+
+class ElementEnvTest(TestCase):
+    def setUp(self):
+        self.page = MyMockPage('<ul><li id="1">one</li><li id="2">two</li></ul>',
+                               params={'name': u'foo', 'values': [1]})
+
+    # Check that items do not see changes of each other, nor change the page
+    def test_env_isolation(self):
+        class MyEnvListElement(ListElement):
+            item_xpath = '//li'
+
+            class item(ItemElement):
+                klass = MyObject
+
+                obj_id = CleanText('./@id')
+
+                def obj_label(self):
+                    self.env['values'].append(self.obj.id)
+                    self.env['name'] += self.obj.id
+                    return u'%s %s' % (self.env['name'], self.env['values'])
+
+        labels = [obj.label for obj in MyEnvListElement(self.page)()]
+        self.assertEqual(labels, [u"foo1 [1, u'1']", u"foo2 [1, u'2']"])
+        self.assertEqual(self.page.params, {'name': u'foo', 'values': [1]})
+
+    # Check that the environment of a child is a snapshot of its parent's
+    def test_env_snapshot(self):
+        parent = MyListElement(self.page)
+        parent.env['name'] = u'bar'
+        child = MyListElement.item(self.page, parent)
+        parent.env['name'] = u'baz'
+        del parent.env['values']
+        child.env['other'] = 1
+
+        self.assertEqual(dict(child.env), {'name': u'bar', 'values': [1], 'other': 1})
+        self.assertEqual(dict(parent.env), {'name': u'baz'})
+        self.assertNotIn('values', parent.env)
+        self.assertIsNot(child.env['values'], self.page.params['values'])
+
+    # Check that loaders set after the class creation are found too
+    def test_loaders_setattr(self):
+        class MyLoaderItem(ItemElement):
+            load_first = lambda self: 1
+
+        item = MyLoaderItem(self.page)
+        item.handle_loaders()
+        self.assertEqual(item.loaders, {'first': 1})
+
+        MyLoaderItem.load_second = lambda self: 2
+        item = MyLoaderItem(self.page)
+        item.handle_loaders()
+        self.assertEqual(item.loaders, {'first': 1, 'second': 2})
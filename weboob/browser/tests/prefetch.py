@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Event, Lock
+import time
+from unittest import TestCase
+
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from lxml.html import fromstring
+
+from weboob.browser.elements import ListElement, ItemElement
+from weboob.browser.filters.standard import Async, AsyncLoad, CleanText
+from weboob.browser.filters.html import Link
+from weboob.browser.prefetch import Prefetcher
+from weboob.capabilities.base import BaseObject, StringField
+
+
+class MyObject(BaseObject):
+    label = StringField('Label')
+
+
+class MyMockResponse(object):
+    def __init__(self, url):
+        self.url = url
+        self.page = MyMockPage('<p>details of %s</p>' % url)
+
+
+# Mock that allows to represent a Page
+class MyMockPage(object):
+    def __init__(self, html, browser=None):
+        self.doc = fromstring(html)
+        self.params = {}
+        self.browser = browser
+
+
+# Mock of a Browser which records the requests it sends
+class MyMockBrowser(object):
+    MAX_WORKERS = 10
+    PREFETCH_MAX_PER_HOST = None
+    PREFETCH_DELAY = 0
+
+    def __init__(self, duration=0.05):
+        self.duration = duration
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        self.lock = Lock()
+        self.requests = []
+        self.running = 0
+        self.max_running = 0
+        self.started = {}
+        self.release = None
+
+    def absurl(self, url):
+        return url if '://' in url else 'http://example.com' + url
+
+    def async_open(self, url):
+        with self.lock:
+            self.requests.append(url)
+        return self.executor.submit(self.load, url)
+
+    def load(self, url):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.started[url] = time.time()
+        if self.release is not None:
+            self.release.wait()
+        time.sleep(self.duration)
+        with self.lock:
+            self.running -= 1
+        return MyMockResponse(url)
+
+
+class MyListElement(ListElement):
+    item_xpath = '//li'
+    streaming = True
+
+    class item(ItemElement):
+        klass = MyObject
+
+        load_details = Link('./a') & AsyncLoad
+
+        obj_id = CleanText('./a')
+        obj_label = Async('details') & CleanText('//p')
+
+
+class PrefetcherTest(TestCase):
+    def setUp(self):
+        self.browser = MyMockBrowser()
+
+    def tearDown(self):
+        if self.browser.release is not None:
+            self.browser.release.set()
+        self.browser.executor.shutdown()
+
+    # Check that a URL is only requested once
+    def test_dedupe(self):
+        prefetcher = Prefetcher(self.browser)
+        future = prefetcher.open('/a')
+        self.assertIs(prefetcher.open('http://example.com/a'), future)
+        self.assertEqual(future.result().url, 'http://example.com/a')
+        self.assertEqual(self.browser.requests, ['http://example.com/a'])
+
+    # Check the bounds of running requests, and the order they are sent
+    def test_bounds(self):
+        self.browser.release = Event()
+        prefetcher = Prefetcher(self.browser, max_workers=2, max_per_host=1)
+        futures = [prefetcher.open('http://a.com/0'),
+                   prefetcher.open('http://b.com/0'),
+                   prefetcher.open('http://a.com/1'),
+                   prefetcher.open('http://c.com/0', priority=-1)]
+        self.assertEqual(self.browser.requests, ['http://a.com/0', 'http://b.com/0'])
+
+        self.browser.release.set()
+        self.assertEqual([f.result().url for f in futures],
+                         ['http://a.com/0', 'http://b.com/0', 'http://a.com/1', 'http://c.com/0'])
+        self.assertEqual(self.browser.requests,
+                         ['http://a.com/0', 'http://b.com/0', 'http://c.com/0', 'http://a.com/1'])
+        self.assertEqual(self.browser.max_running, 2)
+
+    # Check the minimum delay between two requests to a host
+    def test_delay(self):
+        self.browser.duration = 0
+        prefetcher = Prefetcher(self.browser, delay=0.1)
+        futures = [prefetcher.open('/%d' % i) for i in range(3)]
+        for future in futures:
+            future.result()
+        started = sorted(self.browser.started.values())
+        self.assertGreaterEqual(started[1] - started[0], 0.09)
+        self.assertGreaterEqual(started[2] - started[1], 0.09)
+
+    # Check that requests not sent yet can be cancelled
+    def test_cancel(self):
+        self.browser.release = Event()
+        prefetcher = Prefetcher(self.browser, max_workers=1)
+        first = prefetcher.open('/1')
+        second = prefetcher.open('/2')
+        prefetcher.cancel()
+        self.browser.release.set()
+
+        self.assertEqual(first.result().url, 'http://example.com/1')
+        self.assertRaises(CancelledError, second.result)
+        self.assertEqual(self.browser.requests, ['http://example.com/1'])
+
+    # Check that pages of the items of a list are loaded in parallel, even
+    # when items are streamed
+    def test_list(self):
+        links = ''.join('<li><a href="/%d">%d</a></li>' % (i % 5, i) for i in range(10))
+        page = MyMockPage('<ul>%s</ul>' % links, self.browser)
+
+        start = time.time()
+        objects = list(MyListElement(page)())
+        duration = time.time() - start
+
+        self.assertEqual([obj.label for obj in objects],
+                         ['details of http://example.com/%d' % (i % 5) for i in range(10)])
+        self.assertEqual(len(self.browser.requests), 5)
+        self.assertLess(duration, 4 * self.browser.duration)
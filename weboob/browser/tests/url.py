@@ -19,7 +19,7 @@ from unittest import TestCase
 
 from weboob.browser import PagesBrowser, URL
 from weboob.browser.pages import Page
-from weboob.browser.url import UrlNotResolvable
+from weboob.browser.url import UrlNotResolvable, literal_prefix
 
 
 class MyMockBrowserWithoutBrowser():
@@ -135,3 +135,30 @@ class URLTest(TestCase):
         self.assertRaisesRegexp(AssertionError, "You can use this method" +
                                 " only if there is a Page class handler.",
                                 self.myBrowser.urlRegex.is_here, id=2)
+
+    # Check that the index only gives URL objects which may match, in order
+    def test_index_candidates(self):
+        index = self.myBrowser.get_url_index()
+        self.assertEquals(index.candidates("http://weboob.org/news"),
+                          ["urlIsHere"])
+        self.assertEquals(index.candidates("http://free.fr"),
+                          ["urlIsHereDifKlass"])
+        self.assertEquals(index.candidates("http://linuxfr.org"), [])
+
+    # Check that the index is rebuilt when BASEURL or regexps are changed
+    def test_index_invalidated(self):
+        index = self.myBrowser.get_url_index()
+        self.myBrowser.BASEURL = "http://weboob2.org"
+        self.assertIsNot(self.myBrowser.get_url_index(), index)
+        self.myBrowser.urlIsHereDifKlass.urls.insert(0, "http://weboob.org/news")
+        self.assertEquals(self.myBrowser.get_url_index().candidates("http://weboob.org/news"),
+                          ["urlIsHere", "urlIsHereDifKlass"])
+        self.assertTrue(self.myBrowser.urlIsHereDifKlass.match("http://weboob.org/news"))
+
+    # Check the literal prefix extracted from regexps
+    def test_literal_prefix(self):
+        self.assertEquals(literal_prefix(r"https?://weboob\.org/"), "http")
+        self.assertEquals(literal_prefix(r"http://weboob\.org/(?P<id>\d+)"), "http://weboob.org/")
+        self.assertEquals(literal_prefix(r"http://weboob\.org/news\.html?"), "http://weboob.org/news.htm")
+        self.assertEquals(literal_prefix(r"http://weboob\.org|http://test\.org"), "")
+        self.assertEquals(literal_prefix(r"(?i)http://weboob\.org"), "")
@@ -17,6 +17,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
+from copy import copy
 from functools import wraps
 try:
     from urllib.parse import unquote
@@ -25,6 +26,7 @@ except ImportError:
 import re
 import requests
 
+from weboob.tools.compat import basestring, unicode
 from weboob.tools.regex_helper import normalize
 
 
@@ -34,6 +36,62 @@ class UrlNotResolvable(Exception):
     """
 
 
+ABSOLUTE_URL_RE = re.compile(r'^[\w\?]+://.*')
+INLINE_FLAGS_RE = re.compile(r'\(\?[aiLmsux]*i')
+
+
+def literal_prefix(regex):
+    r"""
+    Get the literal string any url matched by this regex starts with.
+
+    >>> literal_prefix(r'https?://example\.org/list\.html')
+    'http'
+    >>> literal_prefix(r'http://example\.org/(?P<id>\d+)')
+    'http://example.org/'
+    >>> literal_prefix(r'http://a\.org/x|http://b\.org/y')
+    ''
+    """
+    if INLINE_FLAGS_RE.search(regex):
+        return ''
+
+    # Look for a top-level alternation, which may match anything.
+    depth = 0
+    escaped = False
+    in_class = False
+    for c in regex:
+        if escaped:
+            escaped = False
+        elif c == '\\':
+            escaped = True
+        elif in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return ''
+
+    prefix = []
+    i = 0
+    while i < len(regex):
+        c = regex[i]
+        if c == '\\' and i + 1 < len(regex) and not regex[i + 1].isalnum():
+            prefix.append(regex[i + 1])
+            i += 2
+        elif c in '.^$*+?{}[]\\|()':
+            if c in '*?{' and prefix:
+                # Last character is optional.
+                prefix.pop()
+            break
+        else:
+            prefix.append(c)
+            i += 1
+    return ''.join(prefix)
+
+
 class URL(object):
     """
     A description of an URL on the PagesBrowser website.
@@ -56,6 +114,19 @@ class URL(object):
         self._creation_counter = URL._creation_counter
         URL._creation_counter += 1
 
+        # Caches of compiled regexps and build() patterns. They are keyed on
+        # the list of regexps, which may be changed by modules.
+        self._regexps = (None, None)
+        self._patterns = (None, None)
+
+    def __deepcopy__(self, memo):
+        url = copy(self)
+        url.urls = list(self.urls)
+        url._regexps = (None, None)
+        url._patterns = (None, None)
+        memo[id(self)] = url
+        return url
+
     def is_here(self, **kwargs):
         """
         Returns True if the current page of browser matches this URL.
@@ -126,9 +197,7 @@ class URL(object):
         """
         browser = kwargs.pop('browser', self.browser)
         params = kwargs.pop('params', None)
-        patterns = []
-        for url in self.urls:
-            patterns += normalize(url)
+        patterns = self.get_patterns()
 
         for pattern, _ in patterns:
             url = pattern
@@ -154,6 +223,38 @@ class URL(object):
 
         raise UrlNotResolvable('Unable to resolve URL with %r. Available are %s' % (kwargs, ', '.join([pattern for pattern, _ in patterns])))
 
+    def get_patterns(self):
+        """
+        Get the forms of regexps usable to build urls (see
+        :func:`weboob.tools.regex_helper.normalize`).
+        """
+        key = tuple(self.urls)
+        if self._patterns[0] != key:
+            patterns = []
+            for url in self.urls:
+                patterns += normalize(url)
+            self._patterns = (key, patterns)
+        return self._patterns[1]
+
+    @staticmethod
+    def make_regexp(regex, base):
+        """
+        Get the regexp to match absolute urls, by prepending base to
+        relative ones.
+        """
+        if not ABSOLUTE_URL_RE.match(regex):
+            regex = re.escape(base).rstrip('/') + '/' + regex.lstrip('/')
+        return regex
+
+    def get_regexps(self, base):
+        """
+        Get compiled regexps to match urls, relatively to base.
+        """
+        key = (base, tuple(self.urls))
+        if self._regexps[0] != key:
+            self._regexps = (key, [re.compile(self.make_regexp(regex, base)) for regex in self.urls])
+        return self._regexps[1]
+
     def match(self, url, base=None):
         """
         Check if the given url match this object.
@@ -162,10 +263,8 @@ class URL(object):
             assert self.browser is not None
             base = self.browser.BASEURL
 
-        for regex in self.urls:
-            if not re.match(r'^[\w\?]+://.*', regex):
-                regex = re.escape(base).rstrip('/') + '/' + regex.lstrip('/')
-            m = re.match(regex, url)
+        for regex in self.get_regexps(base):
+            m = regex.match(url)
             if m:
                 return m
 
@@ -207,3 +306,69 @@ class URL(object):
 
             return func(browser, id_or_url, *args, **kwargs)
         return inner
+
+
+class URLIndex(object):
+    """
+    Routing table of the :class:`URL` objects of a PagesBrowser.
+
+    It keeps a trie of the literal prefixes of URL regexps, to only try the
+    URL objects which may match a given url, in their declaration order.
+
+    :param urls: URL objects by name, in order
+    :type urls: :class:`collections.OrderedDict`
+    :param base: base url of relative regexps
+    :type base: :class:`str`
+    """
+
+    def __init__(self, urls, base):
+        self.base = base
+        self.signature = [(name, list(url.urls)) for name, url in urls.items()]
+        self.names = []
+        self.trie = {}
+
+        for name, url in urls.items():
+            if url.klass is None:
+                # This URL never handles responses.
+                continue
+
+            position = len(self.names)
+            self.names.append(name)
+            for regex in url.urls:
+                if base is None and not ABSOLUTE_URL_RE.match(regex):
+                    prefix = ''
+                else:
+                    prefix = literal_prefix(URL.make_regexp(regex, base))
+
+                node = self.trie
+                for c in prefix:
+                    node = node.setdefault(c, {})
+                node.setdefault(None, set()).add(position)
+
+    def is_valid(self, urls, base):
+        """
+        Whether the index is still right for these URL objects and base.
+        """
+        if base != self.base or len(urls) != len(self.signature):
+            return False
+
+        for (name, regexps), (url_name, url) in zip(self.signature, urls.items()):
+            if name != url_name or regexps != url.urls:
+                return False
+        return True
+
+    def candidates(self, url):
+        """
+        Get names of URL objects which may match the url, in order.
+        """
+        positions = set()
+        node = self.trie
+        for c in url:
+            positions.update(node.get(None, ()))
+            node = node.get(c)
+            if node is None:
+                break
+        else:
+            positions.update(node.get(None, ()))
+
+        return [self.names[position] for position in sorted(positions)]
@@ -19,7 +19,8 @@
 
 from __future__ import unicode_literals
 
-from collections import OrderedDict
+from collections import OrderedDict, deque
+import datetime
 import warnings
 import re
 from decimal import Decimal
@@ -183,6 +184,34 @@ class Capability(object):
     """
 
 
+def find_types(name):
+    """
+    Find classes with this name.
+
+    :rtype: tuple
+    """
+    # the following is a (almost) copy/paste from
+    # https://stackoverflow.com/questions/11775460/lexical-cast-from-string-to-type
+    found = ()
+    q = deque([object])
+    while q:
+        t = q.popleft()
+        if t.__name__ == name:
+            found += (t,)
+        else:
+            try:
+                # keep looking!
+                q.extend(t.__subclasses__())
+            except TypeError:
+                # type.__subclasses__ needs an argument for
+                # whatever reason.
+                if t is type:
+                    continue
+                else:
+                    raise
+    return found
+
+
 class Field(object):
     """
     Field of a :class:`BaseObject` class.
@@ -196,8 +225,9 @@ class Field(object):
 
     def __init__(self, doc, *args, **kwargs):
         self.types = ()
-        self.value = kwargs.get('default', NotLoaded)
+        self.value = self.normalize(kwargs.get('default', NotLoaded))
         self.doc = doc
+        self._actual_types = None
 
         for arg in args:
             if isinstance(arg, type) or isinstance(arg, str):
@@ -214,6 +244,37 @@ class Field(object):
         """
         return value
 
+    def normalize(self, value):
+        """
+        Called on a valid value before it is stored.
+        """
+        return value
+
+    def get_actual_types(self):
+        """
+        Get the types accepted by this field, with names of types resolved
+        to the classes.
+
+        :rtype: tuple
+        """
+        if self._actual_types is not None:
+            return self._actual_types
+
+        actual_types = ()
+        resolved = True
+        for v in self.types:
+            if isinstance(v, str):
+                found = find_types(v)
+                resolved = resolved and bool(found)
+                actual_types += found
+            else:
+                actual_types += (v,)
+
+        # Types given by name may not be declared yet.
+        if resolved:
+            self._actual_types = actual_types
+        return actual_types
+
 
 class IntField(Field):
     """
@@ -291,6 +352,74 @@ class BytesField(Field):
         return str(value)
 
 
+IMMUTABLE_TYPES = (NotLoadedType, NotAvailableType, type(None), bool, int, long, float, Decimal,
+                   unicode, bytes, datetime.date, datetime.time, datetime.timedelta)
+
+_DELETED = object()
+
+
+class _FieldDescriptor(object):
+    """
+    Private descriptor to get and set the value of a field on a
+    :class:`BaseObject` instance.
+    """
+
+    def __init__(self, name, field, index):
+        self.name = name
+        self.field = field
+        self.index = index
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            raise AttributeError("type object '%s' has no attribute '%s'" % (objtype.__name__, self.name))
+
+        try:
+            value = obj._values[self.index]
+        except AttributeError:
+            value = obj._init_values()[self.index]
+        if value is _DELETED:
+            raise AttributeError("'%s' object has no attribute '%s'" % (obj.__class__.__name__, self.name))
+        return value
+
+    def __set__(self, obj, value):
+        field = self.field
+        if not empty(value):
+            try:
+                # Try to convert value to the wanted one.
+                nvalue = field.convert(value)
+                # If the value was converted
+                if nvalue is not value:
+                    warnings.warn('Value %s was converted from %s to %s' %
+                                  (self.name, type(value), type(nvalue)),
+                                  ConversionWarning, stacklevel=3)
+                value = nvalue
+            except Exception:
+                # error during conversion, it will probably not
+                # match the wanted following types, so we'll
+                # raise ValueError.
+                pass
+
+            actual_types = field.get_actual_types()
+            if not isinstance(value, actual_types):
+                raise ValueError(
+                    'Value for "%s" needs to be of type %r, not %r' % (
+                        self.name, actual_types, type(value)))
+        value = field.normalize(value)
+        try:
+            obj._values[self.index] = value
+        except AttributeError:
+            obj._init_values()[self.index] = value
+
+    def __delete__(self, obj):
+        try:
+            values = obj._values
+        except AttributeError:
+            values = obj._init_values()
+        if values[self.index] is _DELETED:
+            raise AttributeError(self.name)
+        values[self.index] = _DELETED
+
+
 class _BaseObjectMeta(type):
     def __new__(cls, name, bases, attrs):
         fields = [(field_name, attrs.pop(field_name)) for field_name, obj in attrs.items() if isinstance(obj, Field)]
@@ -303,6 +432,16 @@ class _BaseObjectMeta(type):
             new_class._fields = deepcopy(new_class._fields)
         new_class._fields.update(fields)
 
+        # Values of fields are stored in the _values list of instances, at
+        # the position of the field in _fields.
+        new_class._defaults = []
+        new_class._mutable_defaults = []
+        for index, (field_name, field) in enumerate(new_class._fields.items()):
+            type.__setattr__(new_class, field_name, _FieldDescriptor(field_name, field, index))
+            new_class._defaults.append(field.value)
+            if not isinstance(field.value, IMMUTABLE_TYPES):
+                new_class._mutable_defaults.append(index)
+
         if new_class.__doc__ is None:
             new_class.__doc__ = ''
         for name, field in fields:
@@ -343,12 +482,22 @@ class BaseObject(object):
     backend = None
     url = StringField('url')
     _fields = None
+    _defaults = ()
+    _mutable_defaults = ()
 
     def __init__(self, id=u'', url=NotLoaded, backend=None):
+        # Subclasses may have set fields before calling this constructor.
+        if '_values' not in self.__dict__:
+            self._init_values()
         self.id = to_unicode(id)
         self.backend = backend
-        self._fields = deepcopy(self._fields)
-        self.__setattr__('url', url)
+        self.url = url
+
+    def _init_values(self):
+        self._values = list(self._defaults)
+        for index in self._mutable_defaults:
+            self._values[index] = deepcopy(self._values[index])
+        return self._values
 
     @property
     def fullid(self):
@@ -374,7 +523,7 @@ class BaseObject(object):
 
     def copy(self):
         obj = copy(self)
-        obj._fields = copy(self._fields)
+        obj._values = list(self._values)
         return obj
 
     def __deepcopy__(self, memo):
@@ -402,8 +551,9 @@ class BaseObject(object):
 
         if hasattr(self, 'id') and self.id is not None:
             yield 'id', self.id
-        for name, field in self._fields.iteritems():
-            yield name, field.value
+        for name, value in zip(self._fields, self._values):
+            if value is not _DELETED:
+                yield name, value
 
     def __eq__(self, obj):
         if isinstance(obj, BaseObject):
@@ -411,73 +561,12 @@ class BaseObject(object):
         else:
             return False
 
-    def __getattr__(self, name):
-        if self._fields is not None and name in self._fields:
-            return self._fields[name].value
-        else:
-            raise AttributeError("'%s' object has no attribute '%s'" % (
-                self.__class__.__name__, name))
-
     def __setattr__(self, name, value):
-        try:
-            attr = (self._fields or {})[name]
-        except KeyError:
-            if name not in dir(self) and not name.startswith('_'):
-                warnings.warn('Creating a non-field attribute %s. Please prefix it with _' % name,
-                              AttributeCreationWarning, stacklevel=2)
-            object.__setattr__(self, name, value)
-        else:
-            if not empty(value):
-                try:
-                    # Try to convert value to the wanted one.
-                    nvalue = attr.convert(value)
-                    # If the value was converted
-                    if nvalue is not value:
-                        warnings.warn('Value %s was converted from %s to %s' %
-                                      (name, type(value), type(nvalue)),
-                                      ConversionWarning, stacklevel=2)
-                    value = nvalue
-                except Exception:
-                    # error during conversion, it will probably not
-                    # match the wanted following types, so we'll
-                    # raise ValueError.
-                    pass
-            from collections import deque
-            actual_types = ()
-            for v in attr.types:
-                if isinstance(v, str):
-                    # the following is a (almost) copy/paste from
-                    # https://stackoverflow.com/questions/11775460/lexical-cast-from-string-to-type
-                    q = deque([object])
-                    while q:
-                        t = q.popleft()
-                        if t.__name__ == v:
-                            actual_types += (t,)
-                        else:
-                            try:
-                                # keep looking!
-                                q.extend(t.__subclasses__())
-                            except TypeError:
-                                # type.__subclasses__ needs an argument for
-                                # whatever reason.
-                                if t is type:
-                                    continue
-                                else:
-                                    raise
-                else:
-                    actual_types += (v,)
-
-            if not isinstance(value, actual_types) and not empty(value):
-                raise ValueError(
-                    'Value for "%s" needs to be of type %r, not %r' % (
-                        name, actual_types, type(value)))
-            attr.value = value
-
-    def __delattr__(self, name):
-        try:
-            self._fields.pop(name)
-        except KeyError:
-            object.__delattr__(self, name)
+        if name not in self._fields and not name.startswith('_') and \
+           name not in self.__dict__ and not hasattr(type(self), name):
+            warnings.warn('Creating a non-field attribute %s. Please prefix it with _' % name,
+                          AttributeCreationWarning, stacklevel=2)
+        object.__setattr__(self, name, value)
 
     def to_dict(self):
         def iter_decorate(d):
@@ -573,3 +662,4 @@ class Currency(object):
     def currency2txt(klass, currency):
         _currency = klass.CURRENCIES.get(currency, (u'',))
         return _currency[0]
+
@@ -33,15 +33,14 @@ class DateField(Field):
     def __init__(self, doc, **kwargs):
         Field.__init__(self, doc, datetime.date, datetime.datetime, **kwargs)
 
-    def __setattr__(self, name, value):
-        if name == 'value':
-            # Force use of our date and datetime types, to fix bugs in python2
-            # with strftime on year<1900.
-            if type(value) is datetime.datetime:
-                value = new_datetime(value)
-            if type(value) is datetime.date:
-                value = new_date(value)
-        return object.__setattr__(self, name, value)
+    def normalize(self, value):
+        # Force use of our date and datetime types, to fix bugs in python2
+        # with strftime on year<1900.
+        if type(value) is datetime.datetime:
+            value = new_datetime(value)
+        if type(value) is datetime.date:
+            value = new_date(value)
+        return value
 
 
 class TimeField(Field):
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+from itertools import count
+from unittest import TestCase
+
+from weboob.capabilities.base import BaseObject, Field, NotLoaded, StringField
+
+
+# Numbers of classes declared by tests
+_counter = count()
+
+
+class FieldTest(TestCase):
+    # Check that a field can be set before BaseObject.__init__ is called
+    def test_set_before_init(self):
+        class MyObject(BaseObject):
+            title = StringField('Title')
+
+            def __init__(self, title):
+                self.title = title
+                BaseObject.__init__(self, 'id')
+
+        self.assertEqual(MyObject('foo').title, 'foo')
+        # The default value of the class field is not changed.
+        self.assertIs(MyObject.__dict__['title'].field.value, NotLoaded)
+
+    # Check that values, even mutable defaults, belong to each instance
+    def test_values_per_instance(self):
+        class MyObject(BaseObject):
+            label = StringField('Label')
+            tags = Field('Tags', list, default=[])
+
+        a = MyObject('a')
+        b = MyObject('b')
+        a.label = 'foo'
+        a.tags.append('bar')
+        self.assertIs(b.label, NotLoaded)
+        self.assertEqual(b.tags, [])
+
+        c = a.copy()
+        c.label = 'baz'
+        self.assertEqual(a.label, 'foo')
+        self.assertEqual(dict(c.iter_fields())['label'], 'baz')
+
+        del c.label
+        self.assertFalse(hasattr(c, 'label'))
+        self.assertEqual(a.label, 'foo')
+
+    # Check that types given by name are resolved once they exist, and cached
+    def test_actual_types(self):
+        # Tests may run several times in a process, and types are found
+        # among every declared class.
+        name = str('MyLaterObject%d' % next(_counter))
+        field = Field('Object', name)
+        self.assertEqual(field.get_actual_types(), ())
+        # Names of types not declared yet are not cached.
+        self.assertIsNone(field._actual_types)
+
+        MyLaterObject = type(name, (object,), {})
+
+        self.assertEqual(field.get_actual_types(), (MyLaterObject,))
+        self.assertEqual(field._actual_types, (MyLaterObject,))
+        self.assertIs(field.get_actual_types(), field.get_actual_types())
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2010-2014 Romain Bignon, Christophe Benz
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from collections import deque
+
+import asyncio
+
+from weboob.capabilities.base import BaseObject
+from weboob.core.bcall import BackendsCall, CallErrors
+
+
+__all__ = ['AsyncBackendsCall', 'BackendTimeout']
+
+
+class BackendTimeout(Exception):
+    """
+    Raised (in the errors of a call) when a backend did not finish in time.
+    """
+
+
+class _Finished(object):
+    def __init__(self, backend):
+        self.backend = backend
+
+
+class AsyncBackendsCall(BackendsCall):
+    """
+    asyncio front-end of :class:`weboob.core.bcall.BackendsCall`.
+
+    Backends are still called on the workers of a
+    :class:`weboob.core.bcall.BackendsPool`, but results are delivered to the
+    event loop, and the object is consumed with ``async for``::
+
+        async for account in await weboob.ado('iter_accounts'):
+            print(account)
+
+    When iteration is over, :class:`weboob.core.bcall.CallErrors` is raised if
+    any backend failed, exactly like with the synchronous call. Errors are also
+    available in :attr:`errors` as (backend, error, backtrace) tuples.
+
+    Cancelling the task which iterates, or calling :meth:`cancel`, stops the
+    backends at their next result and cancels the pending asynchronous
+    requests of their browsers (see :meth:`Browser.open` with *is_async*).
+
+    A backend which times out is stopped the same way, and its results are
+    ignored from then on. Python threads cannot be interrupted, so a backend
+    blocked in a call (a synchronous request, a slow page) keeps its worker
+    until the call returns; only requests which have not been sent yet are
+    cancelled.
+
+    :param loop: event loop to deliver results to
+    :param timeout: maximum duration in seconds of each backend task
+    :type timeout: :class:`float`
+    """
+
+    def __init__(self, backends, function, *args, **kwargs):
+        self.loop = kwargs.pop('loop', None) or asyncio.get_event_loop()
+        self.timeout = kwargs.pop('timeout', None)
+
+        self.cancelled = set()
+        self._pending = set(backends)
+        self._buffer = deque()
+        self._waiter = None
+        self._timers = {}
+
+        super(AsyncBackendsCall, self).__init__(backends, function, *args, **kwargs)
+
+    def _call_in_loop(self, function, *args):
+        try:
+            self.loop.call_soon_threadsafe(function, *args)
+        except RuntimeError:
+            # Loop is closed, nobody listens anymore.
+            self.stop_event.set()
+
+    # Called in workers
+
+    def backend_process(self, backend, function, args, kwargs):
+        self._call_in_loop(self._backend_started, backend)
+        super(AsyncBackendsCall, self).backend_process(backend, function, args, kwargs)
+
+    def is_stopped(self, backend):
+        return self.stop_event.is_set() or backend in self.cancelled
+
+    def store_result(self, backend, result):
+        if result is None:
+            return
+
+        if isinstance(result, BaseObject):
+            result.backend = backend.name
+        self._call_in_loop(self._deliver, backend, result)
+
+    def task_done(self, backend):
+        super(AsyncBackendsCall, self).task_done(backend)
+        self._call_in_loop(self._deliver, backend, _Finished(backend))
+
+    # Called in the event loop
+
+    def _backend_started(self, backend):
+        if self.timeout is not None and backend in self._pending:
+            self._timers[backend] = self.loop.call_later(self.timeout, self._backend_timeout, backend)
+
+    def _backend_timeout(self, backend):
+        if backend not in self._pending:
+            return
+
+        self.errors.append((backend, BackendTimeout('Timeout after %ss' % self.timeout), None))
+        self._cancel_backend(backend)
+        self._deliver(backend, _Finished(backend))
+
+    def _cancel_backend(self, backend):
+        self.cancelled.add(backend)
+
+        browser = getattr(backend, '_browser', None)
+        cancel = getattr(getattr(browser, 'session', None), 'cancel_pending', None)
+        if cancel is not None:
+            cancel()
+
+    def _deliver(self, backend, item):
+        if backend not in self._pending:
+            # Backend timed out or has been cancelled.
+            return
+
+        if isinstance(item, _Finished):
+            self._pending.discard(backend)
+            timer = self._timers.pop(backend, None)
+            if timer is not None:
+                timer.cancel()
+        else:
+            self._buffer.append(item)
+
+        self._wakeup()
+
+    def _wakeup(self):
+        if self._waiter is None or self._waiter.done():
+            return
+
+        if self._buffer:
+            self._waiter.set_result(self._buffer.popleft())
+        elif not self._pending:
+            if self.errors:
+                self._waiter.set_exception(CallErrors(self.errors))
+            else:
+                self._waiter.set_exception(StopAsyncIteration())
+        else:
+            return
+        self._waiter = None
+
+    def _waiter_done(self, future):
+        if future.cancelled():
+            self.cancel()
+
+    def cancel(self):
+        """
+        Stop every backend task, and cancel pending requests of their browsers.
+        """
+        self.stop()
+        for backend in list(self._pending):
+            self._cancel_backend(backend)
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._pending.clear()
+        self._buffer.clear()
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = self.loop.create_future()
+        future.add_done_callback(self._waiter_done)
+        self._waiter = future
+        self._wakeup()
+        return future
+
+
+class _TestBackend(object):
+    def __init__(self, name, results, delay=0, error=None):
+        self.name = name
+        self.results = results
+        self.delay = delay
+        self.error = error
+        self.yielded = []
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, t, v, tb):
+        pass
+
+    def iter_results(self):
+        import time
+
+        for result in self.results:
+            time.sleep(self.delay)
+            self.yielded.append(result)
+            yield result
+        if self.error is not None:
+            raise self.error
+
+
+# Tests do not use the async syntax, so the module still compiles with
+# Python 2.
+
+def _test_consume(call):
+    """
+    Consume a call like ``async for`` does, and return its results and
+    errors.
+    """
+    results = []
+    try:
+        while True:
+            results.append(call.loop.run_until_complete(call.__anext__()))
+    except StopAsyncIteration:
+        return results, []
+    except CallErrors as errors:
+        return results, list(errors)
+
+
+def test_ado():
+    from weboob.core.ouiboube import WebNip
+
+    weboob = WebNip(modules_path=False)
+    weboob.backend_instances = {'a': _TestBackend('a', [1, 2]), 'b': _TestBackend('b', [3])}
+    loop = asyncio.new_event_loop()
+
+    try:
+        call = loop.run_until_complete(weboob.ado('iter_results', loop=loop))
+        assert isinstance(call, AsyncBackendsCall)
+        assert sorted(_test_consume(call)[0]) == [1, 2, 3]
+        call = loop.run_until_complete(weboob.ado('iter_results', backends=['b'], loop=loop))
+        assert _test_consume(call) == ([3], [])
+    finally:
+        loop.close()
+        weboob.backend_instances.clear()
+        weboob.deinit()
+
+
+def test_errors():
+    from weboob.core.bcall import BackendsPool
+
+    pool = BackendsPool()
+    loop = asyncio.new_event_loop()
+    backends = [_TestBackend('a', [1], error=ValueError('foo')), _TestBackend('b', [2])]
+
+    try:
+        results, errors = _test_consume(AsyncBackendsCall(backends, 'iter_results', pool=pool, loop=loop))
+    finally:
+        loop.close()
+        pool.shutdown()
+    assert sorted(results) == [1, 2]
+    assert [(backend.name, type(error)) for backend, error, backtrace in errors] == [('a', ValueError)]
+
+
+def test_timeout():
+    from weboob.core.bcall import BackendsPool
+
+    pool = BackendsPool()
+    loop = asyncio.new_event_loop()
+    slow = _TestBackend('slow', range(100), delay=0.05)
+    backends = [slow, _TestBackend('fast', [1])]
+
+    try:
+        results, errors = _test_consume(AsyncBackendsCall(backends, 'iter_results', pool=pool, loop=loop,
+                                                          timeout=0.2))
+        # The slow backend stops at its next result.
+        pool.shutdown(wait=True)
+    finally:
+        loop.close()
+        pool.shutdown()
+    assert 1 in results
+    assert [(backend.name, type(error)) for backend, error, backtrace in errors] == [('slow', BackendTimeout)]
+    assert len(slow.yielded) < 10
+
+
+def test_cancel():
+    import time
+    from weboob.core.bcall import BackendsPool
+
+    pool = BackendsPool()
+    loop = asyncio.new_event_loop()
+    slow = _TestBackend('slow', range(100), delay=0.05)
+
+    try:
+        call = AsyncBackendsCall([slow], 'iter_results', pool=pool, loop=loop)
+        start = time.time()
+        while True:
+            future = call.__anext__()
+            if time.time() - start > 0.2 and not future.done():
+                break
+            loop.run_until_complete(future)
+        # What happens when the task awaiting the result is cancelled.
+        future.cancel()
+        loop.run_until_complete(asyncio.sleep(0))
+        pool.shutdown(wait=True)
+    finally:
+        loop.close()
+        pool.shutdown()
+    assert len(slow.yielded) < 10
@@ -18,19 +18,21 @@
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
 
+from collections import deque
 from copy import copy
-from threading import Thread, Event
+from threading import Thread, Event, Condition, Lock, Semaphore
 try:
     import Queue
 except ImportError:
     import queue as Queue
 
 from weboob.capabilities.base import BaseObject
+from weboob.tools.compat import basestring
 from weboob.tools.misc import get_backtrace
 from weboob.tools.log import getLogger
 
 
-__all__ = ['BackendsCall', 'CallErrors']
+__all__ = ['BackendsCall', 'BackendsPool', 'CallErrors']
 
 
 class CallErrors(Exception):
@@ -46,46 +48,179 @@ class CallErrors(Exception):
         return self.errors.__iter__()
 
 
+class BackendsPool(object):
+    """
+    Persistent pool of worker threads shared by every :class:`BackendsCall`.
+
+    Tasks are queued per backend, and a backend is never given to two workers
+    at once (it is locked anyway). Backends with pending tasks are served in
+    a round-robin fashion, so concurrent calls share workers fairly instead
+    of piling up threads waiting on the same backend lock.
+
+    Worker threads are created on demand, up to *max_workers*.
+
+    :param max_workers: maximum number of worker threads
+    :type max_workers: :class:`int`
+    """
+
+    MAX_WORKERS = 20
+
+    def __init__(self, max_workers=None):
+        self.logger = getLogger('bcall.pool')
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.threads_created = 0
+
+        self._cond = Condition(Lock())
+        self._tasks = {}
+        self._ready = deque()
+        self._busy = set()
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+
+    def submit(self, backend, function, *args):
+        """
+        Queue a task to run on a backend.
+
+        :param backend: backend the task is bound to
+        :type backend: :class:`weboob.tools.backend.Module`
+        :param function: callable, called with \\*args in a worker thread
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit a task on a stopped pool')
+
+            self._tasks.setdefault(backend, deque()).append((function, args))
+            if backend not in self._busy and backend not in self._ready:
+                self._ready.append(backend)
+
+            if len(self._ready) > self._idle and len(self._threads) < self.max_workers:
+                self._start_worker()
+            self._cond.notify()
+
+    def _start_worker(self):
+        thread = Thread(target=self._worker_run, name='weboob-worker-%d' % len(self._threads))
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+        self.threads_created += 1
+
+    def _worker_run(self):
+        while True:
+            with self._cond:
+                while not self._ready and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+
+                if not self._ready:
+                    # Shutdown, and nothing left to do.
+                    return
+
+                backend = self._ready.popleft()
+                function, args = self._tasks[backend].popleft()
+                self._busy.add(backend)
+
+            try:
+                function(*args)
+            except Exception as e:
+                # Tasks are expected to handle their own errors.
+                self.logger.error('Unexpected error in worker: %s', get_backtrace(e))
+            finally:
+                with self._cond:
+                    self._busy.discard(backend)
+                    if self._tasks[backend]:
+                        # Go back at the end of the line.
+                        self._ready.append(backend)
+                        self._cond.notify()
+                    else:
+                        del self._tasks[backend]
+
+    def shutdown(self, wait=False):
+        """
+        Stop worker threads once every queued task is done.
+
+        :param wait: if True, wait for the tasks to finish
+        :type wait: bool
+        """
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = self._threads
+            self._threads = []
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
 class BackendsCall(object):
+    #: Put in the responses queue when a backend has finished its task.
+    FINISHED = object()
+
     def __init__(self, backends, function, *args, **kwargs):
         """
         :param backends: List of backends to call
         :type backends: list[:class:`Module`]
         :param function: backends' method name, or callable object.
         :type function: :class:`str` or :class:`callable`
+        :param pool: pool of workers to run the tasks on; if not given, a
+                     private one is used, and stopped once every backend
+                     has finished
+        :type pool: :class:`BackendsPool`
+        :param max_pending: if given, backends wait when this number of
+                            results are waiting for the consumer
+        :type max_pending: :class:`int`
         """
         self.logger = getLogger('bcall')
 
+        # Python 2 has no keyword-only arguments: options of the call itself
+        # are taken out of kwargs, everything else is given to backends.
+        pool = kwargs.pop('pool', None)
+        max_pending = kwargs.pop('max_pending', None)
+        self._private_pool = None
+        if pool is None and backends:
+            pool = self._private_pool = BackendsPool(len(backends))
+        # Free places for results in the responses queue
+        self._slots = Semaphore(max_pending) if max_pending else None
+        self._max_pending = max_pending
+
+        self.backends = list(backends)
         self.responses = Queue.Queue()
         self.errors = []
-        self.tasks = Queue.Queue()
         self.stop_event = Event()
-        self.threads = []
+        self.finished_event = Event()
+        self.remaining = len(backends)
+        self._remaining_lock = Lock()
+
+        if not backends:
+            self.finished_event.set()
 
         for backend in backends:
-            t = Thread(target=self.backend_process, args=(function, args, kwargs))
-            t.start()
-            self.threads.append(t)
-            self.tasks.put(backend)
+            pool.submit(backend, self.backend_process, backend, function, args, kwargs)
 
     def store_result(self, backend, result):
         """Store the result when a backend task finished."""
-        if result is None:
+        if result is None or self.is_stopped(backend):
             return
 
         if isinstance(result, BaseObject):
             result.backend = backend.name
-        self.responses.put(result)
+        if self._slots is not None:
+            self._slots.acquire()
+        self.responses.put((backend, result))
 
-    def backend_process(self, function, args, kwargs):
+    def backend_process(self, backend, function, args, kwargs):
         """
         Internal method to run a method of a backend.
 
-        As this method may be blocking, it should be run on its own thread.
+        It is run by a worker of the :class:`BackendsPool`.
         """
-        backend = self.tasks.get()
-        with backend:
-            try:
+        try:
+            if self.is_stopped(backend):
+                return
+
+            with backend:
                 # Call method on backend
                 try:
                     self.logger.debug('%s: Calling function %s', backend, function)
@@ -104,23 +239,90 @@ class BackendsCall(object):
                         try:
                             for subresult in result:
                                 self.store_result(backend, subresult)
-                                if self.stop_event.is_set():
+                                if self.is_stopped(backend):
+                                    # Let the generator clean up now rather
+                                    # than when it is collected.
+                                    if hasattr(result, 'close'):
+                                        result.close()
                                     break
                         except Exception as error:
                             self.errors.append((backend, error, get_backtrace(error)))
                     else:
                         self.store_result(backend, result)
-            finally:
-                self.tasks.task_done()
-
-    def _callback_thread_run(self, callback, errback, finishback):
-        while not self.stop_event.is_set() and (self.tasks.unfinished_tasks or not self.responses.empty()):
-            try:
-                response = self.responses.get(timeout=0.1)
-            except Queue.Empty:
+        finally:
+            self.task_done(backend)
+
+    def is_stopped(self, backend):
+        """Return True if the task running on this backend has to stop."""
+        return self.stop_event.is_set()
+
+    def task_done(self, backend):
+        """Called by the worker once the backend task is over."""
+        with self._remaining_lock:
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.finished_event.set()
+                if self._private_pool is not None:
+                    # Workers exit once this last task is done.
+                    self._private_pool.shutdown()
+        self.responses.put((backend, self.FINISHED))
+
+    def _get_response(self, block=True):
+        item = self.responses.get(block)
+        if self._slots is not None and item is not self.stop_event and item[1] is not self.FINISHED:
+            self._slots.release()
+        return item
+
+    def _iter_responses(self):
+        """
+        Yield (backend, response) pairs as they come, until every backend has
+        finished or the call is stopped. When a backend has finished, the
+        response is :attr:`FINISHED`.
+        """
+        finished = 0
+        while finished < len(self.backends) and not self.stop_event.is_set():
+            item = self._get_response()
+            if item is self.stop_event:
                 continue
-            else:
+            if item[1] is self.FINISHED:
+                finished += 1
+            yield item
+
+    def _iter_batches(self):
+        """
+        Yield lists of responses, until every backend has finished or the
+        call is stopped. Each list has every response received since the
+        previous one was yielded, so a slow consumer gets bigger lists, up to
+        *max_pending* responses.
+        """
+        finished = 0
+        while finished < len(self.backends) and not self.stop_event.is_set():
+            batch = []
+            item = self._get_response()
+            while True:
+                if item is not self.stop_event:
+                    if item[1] is self.FINISHED:
+                        finished += 1
+                    else:
+                        batch.append(item[1])
+                if self._max_pending and len(batch) >= self._max_pending:
+                    # Backends refill the queue while it is drained.
+                    break
+                try:
+                    item = self._get_response(block=False)
+                except Queue.Empty:
+                    break
+            if batch and not self.stop_event.is_set():
+                yield batch
+
+    def _callback_thread_run(self, callback, errback, finishback, batch):
+        if batch:
+            for responses in self._iter_batches():
                 if callback:
+                    callback(responses)
+        else:
+            for backend, response in self._iter_responses():
+                if callback and response is not self.FINISHED:
                     callback(response)
 
         # Raise errors
@@ -130,7 +332,7 @@ class BackendsCall(object):
         if finishback:
             finishback()
 
-    def callback_thread(self, callback, errback=None, finishback=None):
+    def callback_thread(self, callback, errback=None, finishback=None, batch=False):
         """
         Call this method to create a thread which will callback a
         specified function everytimes a new result comes.
@@ -143,15 +345,16 @@ class BackendsCall(object):
             def errback(backend, error, backtrace)
             def finishback()
 
+        If *batch* is True, callback is called with the list of results
+        received while it was busy, instead of once per result.
         """
-        thread = Thread(target=self._callback_thread_run, args=(callback, errback, finishback))
+        thread = Thread(target=self._callback_thread_run, args=(callback, errback, finishback, batch))
         thread.start()
         return thread
 
     def wait(self):
         """Wait until all tasks are finished."""
-        for thread in self.threads:
-            thread.join()
+        self.finished_event.wait()
 
         if self.errors:
             raise CallErrors(self.errors)
@@ -165,20 +368,88 @@ class BackendsCall(object):
         """
 
         self.stop_event.set()
+        # Wake up consumers blocked on the responses queue, and backends
+        # waiting for a free place in it.
+        self.responses.put(self.stop_event)
+        if self._slots is not None:
+            for backend in self.backends:
+                self._slots.release()
 
         if wait:
             self.wait()
 
     def __iter__(self):
+        for backend, response in self.iter_by_backend():
+            if response is not self.FINISHED:
+                yield response
+
+    def iter_by_backend(self):
+        """
+        Iterate on (backend, result) pairs as results come.
+
+        Once a backend has finished, (backend, :attr:`FINISHED`) is given,
+        so the caller knows that it will not get more results from it.
+        """
         try:
-            while not self.stop_event.is_set() and (self.tasks.unfinished_tasks or not self.responses.empty()):
-                try:
-                    yield self.responses.get(timeout=0.1)
-                except Queue.Empty:
-                    continue
+            for item in self._iter_responses():
+                yield item
         except:
             self.stop()
             raise
 
         if self.errors:
             raise CallErrors(self.errors)
+
+
+class _TestBackend(object):
+    def __init__(self, name, results):
+        self.name = name
+        self.results = results
+        self.lock = Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, t, v, tb):
+        self.lock.release()
+
+    def iter_results(self):
+        return iter(self.results)
+
+
+def test_consume_after_finished():
+    backends = [_TestBackend('a', [1, 2]), _TestBackend('b', [3])]
+    call = BackendsCall(backends, 'iter_results')
+    call.wait()
+    # Every backend has finished before the consumer starts.
+    assert sorted(call) == [1, 2, 3]
+
+
+def test_private_pool_stopped():
+    backends = [_TestBackend('a', [1]), _TestBackend('b', [2])]
+    call = BackendsCall(backends, 'iter_results')
+    threads = list(call._private_pool._threads)
+    assert sorted(call) == [1, 2]
+    for thread in threads:
+        thread.join(1)
+        assert not thread.is_alive()
+
+
+def test_callback_thread_batch():
+    backends = [_TestBackend('a', range(0, 50)), _TestBackend('b', range(50, 100))]
+    call = BackendsCall(backends, 'iter_results', max_pending=5)
+    batches = []
+    finished = Event()
+    thread = call.callback_thread(batches.append, finishback=finished.set, batch=True)
+    thread.join(5)
+    assert finished.is_set()
+    assert sorted(sum(batches, [])) == list(range(100))
+    # Backends waited for the consumer.
+    assert all(len(batch) <= 5 for batch in batches)
+
+    # Every backend has finished before the consumer starts.
+    call = BackendsCall(backends, 'iter_results', max_pending=100)
+    call.wait()
+    batches = []
+    call.callback_thread(batches.append, batch=True).join(5)
+    assert sorted(sum(batches, [])) == list(range(100))
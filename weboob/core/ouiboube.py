@@ -19,14 +19,18 @@
 
 
 import os
+from collections import OrderedDict
+from contextlib import contextmanager
+from time import time
 
-from weboob.core.bcall import BackendsCall
+from weboob.core.bcall import BackendsCall, BackendsPool
 from weboob.core.modules import ModulesLoader, RepositoryModulesLoader
 from weboob.core.backendscfg import BackendsConfig
 from weboob.core.requests import RequestsManager
 from weboob.core.repositories import Repositories, PrintProgress
 from weboob.core.scheduler import Scheduler
 from weboob.tools.backend import Module
+from weboob.tools.compat import basestring, unicode
 from weboob.tools.config.iconfig import ConfigError
 from weboob.tools.log import getLogger
 from weboob.exceptions import ModuleLoadError
@@ -39,6 +43,51 @@ class VersionsMismatchError(ConfigError):
     pass
 
 
+class StartupTimings(object):
+    """
+    Time spent in each phase of the startup.
+
+    Durations of a phase run several times are summed.
+
+    >>> timings = StartupTimings()
+    >>> with timings.phase('config'):
+    ...     pass
+    >>> [name for name, duration in timings]
+    ['config']
+    """
+
+    def __init__(self):
+        self.phases = OrderedDict()
+
+    @contextmanager
+    def phase(self, name):
+        start = time()
+        try:
+            yield
+        finally:
+            self.add(name, time() - start)
+
+    def add(self, name, duration):
+        self.phases[name] = self.phases.get(name, 0) + duration
+
+    def __iter__(self):
+        return iter(self.phases.items())
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+    def format(self):
+        """
+        Get a human readable breakdown of timings.
+
+        :rtype: list[:class:`str`]
+        """
+        lines = ['%-16s %8.1f ms' % (name, duration * 1000) for name, duration in self]
+        lines.append('%-16s %8.1f ms' % ('total', self.total * 1000))
+        return lines
+
+
 class WebNip(object):
     """
     Weboob in Non Integrated Programs
@@ -52,13 +101,17 @@ class WebNip(object):
     :type storage: :class:`weboob.tools.storage.IStorage`
     :param scheduler: what scheduler to use; default is :class:`weboob.core.scheduler.Scheduler`
     :type scheduler: :class:`weboob.core.scheduler.IScheduler`
+    :param max_workers: maximum number of threads used to call backends;
+                        default is :attr:`weboob.core.bcall.BackendsPool.MAX_WORKERS`
+    :type max_workers: :class:`int`
     """
     VERSION = '1.3'
 
-    def __init__(self, modules_path=None, storage=None, scheduler=None):
+    def __init__(self, modules_path=None, storage=None, scheduler=None, max_workers=None):
         self.logger = getLogger('weboob')
         self.backend_instances = {}
         self.requests = RequestsManager()
+        self.pool = BackendsPool(max_workers)
 
         if modules_path is None:
             import pkg_resources
@@ -87,6 +140,7 @@ class WebNip(object):
         properly unload all correctly.
         """
         self.unload_backends()
+        self.pool.shutdown()
 
     def build_backend(self, module_name, params=None, storage=None, name=None, nofail=False):
         """
@@ -221,26 +275,10 @@ class WebNip(object):
             return self.do(name, *args, **kwargs)
         return caller
 
-    def do(self, function, *args, **kwargs):
-        r"""
-        Do calls on loaded backends with specified arguments, in separated
-        threads.
-
-        This function has two modes:
-
-        - If *function* is a string, it calls the method with this name on
-          each backends with the specified arguments;
-        - If *function* is a callable, it calls it in a separated thread with
-          the locked backend instance at first arguments, and \*args and
-          \*\*kwargs.
-
-        :param function: backend's method name, or a callable object
-        :type function: :class:`str`
-        :param backends: list of backends to iterate on
-        :type backends: list[:class:`str`]
-        :param caps: iterate on backends which implement this caps
-        :type caps: list[:class:`weboob.capabilities.base.Capability`]
-        :rtype: A :class:`weboob.core.bcall.BackendsCall` object (iterable)
+    def _pop_backends(self, kwargs):
+        """
+        Select backends according to the *backends* and *caps* arguments of
+        :meth:`do`, and remove them from *kwargs*.
         """
         backends = self.backend_instances.values()
         _backends = kwargs.pop('backends', None)
@@ -270,11 +308,66 @@ class WebNip(object):
             caps = kwargs.pop('caps')
             backends = [backend for backend in backends if backend.has_caps(caps)]
 
+        return backends
+
+    def do(self, function, *args, **kwargs):
+        r"""
+        Do calls on loaded backends with specified arguments, on the workers
+        of :attr:`pool`.
+
+        This function has two modes:
+
+        - If *function* is a string, it calls the method with this name on
+          each backends with the specified arguments;
+        - If *function* is a callable, it calls it in a worker thread with
+          the locked backend instance at first arguments, and \*args and
+          \*\*kwargs.
+
+        :param function: backend's method name, or a callable object
+        :type function: :class:`str`
+        :param backends: list of backends to iterate on
+        :type backends: list[:class:`str`]
+        :param caps: iterate on backends which implement this caps
+        :type caps: list[:class:`weboob.capabilities.base.Capability`]
+        :param max_pending: if given, backends wait when this number of
+                            results are waiting to be consumed
+        :type max_pending: :class:`int`
+        :rtype: A :class:`weboob.core.bcall.BackendsCall` object (iterable)
+        """
+        backends = self._pop_backends(kwargs)
+
         # The return value MUST BE the BackendsCall instance. Please never iterate
         # here on this object, because caller might want to use other methods, like
         # wait() on callback_thread().
         # Thanks a lot.
-        return BackendsCall(backends, function, *args, **kwargs)
+        return BackendsCall(backends, function, *args, pool=self.pool, **kwargs)
+
+    def ado(self, function, *args, **kwargs):
+        """
+        asyncio version of :meth:`do`.
+
+        It takes the same arguments, plus *timeout*, the maximum duration in
+        seconds of each backend call. It returns a future of a
+        :class:`weboob.core.aiocall.AsyncBackendsCall`, which is an
+        asynchronous iterator::
+
+            async for account in await weboob.ado('iter_accounts'):
+                print(account)
+
+        :param timeout: maximum duration of each backend call (a backend
+                        blocked in a request is only stopped when it returns,
+                        see :class:`weboob.core.aiocall.AsyncBackendsCall`)
+        :type timeout: :class:`float`
+        :rtype: :class:`asyncio.Future`
+        """
+        from weboob.core.aiocall import AsyncBackendsCall
+
+        backends = self._pop_backends(kwargs)
+        call = AsyncBackendsCall(backends, function, *args, pool=self.pool, **kwargs)
+
+        future = call.loop.create_future()
+        future.set_result(call)
+        return future
 
     def schedule(self, interval, function, *args):
         """
@@ -341,19 +434,19 @@ class Weboob(WebNip):
     :type backends_filename: str
     :param storage: provide a storage where backends can save data
     :type storage: :class:`weboob.tools.storage.IStorage`
+    :param max_workers: maximum number of threads used to call backends
+    :type max_workers: :class:`int`
     """
     BACKENDS_FILENAME = 'backends'
 
-    def __init__(self, workdir=None, datadir=None, backends_filename=None, scheduler=None, storage=None):
-        super(Weboob, self).__init__(modules_path=False, scheduler=scheduler, storage=storage)
+    def __init__(self, workdir=None, datadir=None, backends_filename=None, scheduler=None, storage=None, max_workers=None):
+        self.startup_timings = StartupTimings()
+        start = time()
 
-        # Create WORKDIR
-        if workdir is None:
-            if 'WEBOOB_WORKDIR' in os.environ:
-                workdir = os.environ['WEBOOB_WORKDIR']
-            else:
-                workdir = os.path.join(os.environ.get('XDG_CONFIG_HOME', os.path.join(os.path.expanduser('~'), '.config')), 'weboob')
+        super(Weboob, self).__init__(modules_path=False, scheduler=scheduler, storage=storage, max_workers=max_workers)
 
+        # Create WORKDIR
+        workdir = self.get_workdir(workdir)
         self.workdir = os.path.realpath(workdir)
         self._create_dir(workdir)
 
@@ -380,6 +473,23 @@ class Weboob(WebNip):
             backends_filename = os.path.join(self.workdir, backends_filename)
         self.backends_config = BackendsConfig(backends_filename)
 
+        self.startup_timings.add('init', time() - start)
+
+    @staticmethod
+    def get_workdir(workdir=None):
+        """
+        Get the path of the working directory, without creating it.
+
+        :param workdir: path given by the user, if any
+        :type workdir: str
+        :rtype: str
+        """
+        if workdir is not None:
+            return workdir
+        if 'WEBOOB_WORKDIR' in os.environ:
+            return os.environ['WEBOOB_WORKDIR']
+        return os.path.join(os.environ.get('XDG_CONFIG_HOME', os.path.join(os.path.expanduser('~'), '.config')), 'weboob')
+
     def _create_dir(self, name):
         if not os.path.exists(name):
             os.makedirs(name)
@@ -444,49 +554,84 @@ class Weboob(WebNip):
         loaded = {}
         if storage is None:
             storage = self.storage
+        timings = self.startup_timings
+
+        with timings.phase('repositories'):
+            if not self.repositories.check_repositories():
+                self.logger.error(u'Repositories are not consistent with the sources.list')
+                raise VersionsMismatchError(u'Versions mismatch, please run "weboob-config update"')
+
+        # Select backends and resolve their modules in one pass.
+        with timings.phase('resolve'):
+            modules_info = self.repositories.get_all_modules_info()
+            selected = []
+            for backend_name, module_name, params in self.backends_config.iter_backends():
+                if '_enabled' in params and not params['_enabled'].lower() in ('1', 'y', 'true', 'on', 'yes') or \
+                   names is not None and backend_name not in names or \
+                   modules is not None and module_name not in modules or \
+                   exclude is not None and backend_name in exclude:
+                    continue
+
+                minfo = modules_info.get(module_name)
+                if minfo is None:
+                    self.logger.warning(u'Backend "%s" is referenced in %s but was not found. '
+                                        u'Perhaps a missing repository or a removed module?', module_name, self.backends_config.confpath)
+                    continue
+
+                if caps is not None and not minfo.has_caps(caps):
+                    continue
+
+                selected.append((backend_name, module_name, params))
+
+        needed = OrderedDict((module_name, modules_info[module_name]) for _, module_name, _ in selected)
+        missing = [minfo for minfo in needed.values() if not minfo.is_installed()]
+
+        # Missing modules are downloaded in background while installed ones
+        # are imported.
+        install = self.repositories.install_many(missing) if missing else None
+        load_errors = {}
+        with timings.phase('import'):
+            self._load_modules([name for name, minfo in needed.items() if minfo.is_installed()], load_errors)
+
+        if install is not None:
+            with timings.phase('install'):
+                install_errors = install.wait()
+            for minfo in missing:
+                if minfo.name in install_errors:
+                    raise install_errors[minfo.name]
+
+            with timings.phase('import'):
+                self._load_modules([minfo.name for minfo in missing], load_errors)
+
+        with timings.phase('instantiate'):
+            for backend_name, module_name, params in selected:
+                if module_name in load_errors:
+                    self.logger.error(u'Unable to load module "%s": %s', module_name, load_errors[module_name])
+                    continue
 
-        if not self.repositories.check_repositories():
-            self.logger.error(u'Repositories are not consistent with the sources.list')
-            raise VersionsMismatchError(u'Versions mismatch, please run "weboob-config update"')
-
-        for backend_name, module_name, params in self.backends_config.iter_backends():
-            if '_enabled' in params and not params['_enabled'].lower() in ('1', 'y', 'true', 'on', 'yes') or \
-               names is not None and backend_name not in names or \
-               modules is not None and module_name not in modules or \
-               exclude is not None and backend_name in exclude:
-                continue
+                module = self.modules_loader.get_or_load_module(module_name)
 
-            minfo = self.repositories.get_module_info(module_name)
-            if minfo is None:
-                self.logger.warning(u'Backend "%s" is referenced in %s but was not found. '
-                                    u'Perhaps a missing repository or a removed module?', module_name, self.backends_config.confpath)
-                continue
+                if backend_name in self.backend_instances:
+                    self.logger.warning(u'Oops, the backend "%s" is already loaded. Unload it before reloading...', backend_name)
+                    self.unload_backends(backend_name)
 
-            if caps is not None and not minfo.has_caps(caps):
-                continue
+                try:
+                    backend_instance = module.create_instance(self, backend_name, params, storage)
+                except Module.ConfigError as e:
+                    if errors is not None:
+                        errors.append(self.LoadError(backend_name, e))
+                else:
+                    self.backend_instances[backend_name] = loaded[backend_name] = backend_instance
 
-            if not minfo.is_installed():
-                self.repositories.install(minfo)
+        self.logger.debug(u'Startup timings: %s', u', '.join(u'%s=%.3fs' % item for item in timings))
+        return loaded
 
-            module = None
+    def _load_modules(self, module_names, errors):
+        for module_name in module_names:
             try:
-                module = self.modules_loader.get_or_load_module(module_name)
+                self.modules_loader.get_or_load_module(module_name)
             except ModuleLoadError as e:
-                self.logger.error(u'Unable to load module "%s": %s', module_name, e)
-                continue
-
-            if backend_name in self.backend_instances:
-                self.logger.warning(u'Oops, the backend "%s" is already loaded. Unload it before reloading...', backend_name)
-                self.unload_backends(backend_name)
-
-            try:
-                backend_instance = module.create_instance(self, backend_name, params, storage)
-            except Module.ConfigError as e:
-                if errors is not None:
-                    errors.append(self.LoadError(backend_name, e))
-            else:
-                self.backend_instances[backend_name] = loaded[backend_name] = backend_instance
-        return loaded
+                errors[module_name] = e
 
     def load_or_install_module(self, module_name):
         """ Load a backend, and install it if not done before """
@@ -28,9 +28,11 @@ import os
 import subprocess
 import hashlib
 from datetime import datetime
+from collections import deque
 from contextlib import closing
 from compileall import compile_dir
 from io import BytesIO
+from threading import Lock, Thread
 
 from weboob.exceptions import BrowserHTTPError, BrowserHTTPNotFound, ModuleInstallError
 from .modules import LoadedModule
@@ -348,6 +350,7 @@ class Versions(object):
     def __init__(self, path):
         self.path = path
         self.versions = {}
+        self.lock = Lock()
 
         try:
             with open(os.path.join(self.path, self.VERSIONS_LIST), 'r') as fp:
@@ -364,12 +367,13 @@ class Versions(object):
         return self.versions.get(name, None)
 
     def set(self, name, version):
-        self.versions[name] = int(version)
-        self.save()
+        with self.lock:
+            self.versions[name] = int(version)
+            self.save()
 
     def save(self):
         config = RawConfigParser()
-        for name, version in self.versions.iteritems():
+        for name, version in self.versions.items():
             config.set(DEFAULTSECT, name, version)
         with open(os.path.join(self.path, self.VERSIONS_LIST), 'wb') as fp:
             config.write(fp)
@@ -401,6 +405,62 @@ class PrintProgress(IProgress):
         return True
 
 
+class InstallBatch(object):
+    """
+    Install several modules in background threads.
+
+    Modules are downloaded and set up by at most *max_workers* threads, so
+    the caller can do something else (for example import modules which are
+    already installed) before calling :meth:`wait`.
+
+    :param repositories: repositories to install modules from
+    :type repositories: :class:`Repositories`
+    :param modules: modules to install
+    :type modules: list[:class:`ModuleInfo`]
+    :param progress: observer object
+    :type progress: :class:`IProgress`
+    :param max_workers: maximum number of concurrent installations
+    :type max_workers: :class:`int`
+    """
+
+    def __init__(self, repositories, modules, progress, max_workers):
+        self.repositories = repositories
+        self.progress = progress
+        self.modules = deque(modules)
+        self.errors = {}
+        self.lock = Lock()
+
+        self.threads = []
+        for i in range(min(max_workers, len(self.modules))):
+            thread = Thread(target=self._worker)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def _worker(self):
+        while True:
+            with self.lock:
+                if not self.modules:
+                    return
+                module = self.modules.popleft()
+
+            try:
+                self.repositories.install(module, self.progress)
+            except Exception as e:
+                self.errors[module.name] = e
+
+    def wait(self):
+        """
+        Wait for every installation to be finished.
+
+        :returns: errors raised by installations, by module name
+        :rtype: dict[:class:`str`, :class:`Exception`]
+        """
+        for thread in self.threads:
+            thread.join()
+        return self.errors
+
+
 DEFAULT_SOURCES_LIST = \
 """# List of Weboob repositories
 #
@@ -418,6 +478,7 @@ https://updates.weboob.org/%(version)s/main/
 
 class Repositories(object):
     SOURCES_LIST = 'sources.list'
+    MAX_INSTALL_WORKERS = 4
     MODULES_DIR = 'modules'
     REPOS_DIR = 'repositories'
     KEYRINGS_DIR = 'keyrings'
@@ -714,6 +775,26 @@ class Repositories(object):
 
         progress.progress(1.0, 'Module %s has been installed!' % module.name)
 
+    def install_many(self, modules, progress=PrintProgress(), max_workers=None):
+        """
+        Install several modules concurrently.
+
+        The installations run in background; call
+        :meth:`InstallBatch.wait` on the returned object to get errors.
+
+        :param modules: modules to install
+        :type modules: list[:class:`ModuleInfo`]
+        :param progress: observer object
+        :type progress: :class:`IProgress`
+        :param max_workers: maximum number of concurrent installations;
+                            default is :attr:`MAX_INSTALL_WORKERS`
+        :type max_workers: :class:`int`
+        :rtype: :class:`InstallBatch`
+        """
+        # Create the browser now, it would be racy in worker threads.
+        self.load_browser()
+        return InstallBatch(self, modules, progress, max_workers or self.MAX_INSTALL_WORKERS)
+
     @staticmethod
     def url2filename(url):
         """
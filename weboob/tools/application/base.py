@@ -170,6 +170,7 @@ class Application(object):
         logging_options.add_option('-v', '--verbose', action='store_true', help='display info messages')
         logging_options.add_option('--logging-file', action='store', type='string', dest='logging_file', help='file to save logs')
         logging_options.add_option('-a', '--save-responses', action='store_true', help='save every response')
+        logging_options.add_option('--profile-startup', action='store_true', help='display time spent in each phase of backends loading')
         self._parser.add_option_group(logging_options)
         self._parser.add_option('--shell-completion', action='store_true', help=optparse.SUPPRESS_HELP)
         self._is_default_count = True
@@ -187,22 +188,25 @@ class Application(object):
 
         :param path: An optional specific path
         :type path: :class:`str`
-        :param klass: What class to instance
+        :param klass: What class to instance; default is
+                      :class:`weboob.tools.storage.SQLiteStorage`, stored
+                      next to *path* and initialized from it if it is a
+                      YAML storage file.
         :type klass: :class:`weboob.tools.storage.IStorage`
         :param localonly: If True, do not set it on the :class:`Weboob` object.
         :type localonly: :class:`bool`
         :rtype: :class:`weboob.tools.storage.IStorage`
         """
-        if klass is None:
-            from weboob.tools.storage import StandardStorage
-            klass = StandardStorage
-
         if path is None:
             path = os.path.join(self.CONFDIR, self.APPNAME + '.storage')
         elif os.path.sep not in path:
             path = os.path.join(self.CONFDIR, path)
 
-        storage = klass(path)
+        if klass is None:
+            from weboob.tools.storage import SQLiteStorage
+            storage = SQLiteStorage(path + '.sqlite', yaml_path=path)
+        else:
+            storage = klass(path)
         self.storage = ApplicationStorage(self.APPNAME, storage)
         self.storage.load(self.STORAGE)
 
@@ -252,6 +256,9 @@ class Application(object):
         loaded = self.weboob.load_backends(caps, names, exclude=exclude, *args, **kwargs)
         if not loaded:
             logging.info(u'No backend loaded')
+        if self.options.profile_startup:
+            for line in self.weboob.startup_timings.format():
+                print(line, file=self.stderr)
         return loaded
 
     def _get_optparse_version(self):
@@ -279,11 +286,18 @@ class Application(object):
         modif = 0
 
         for i, sub in enumerate(res):
-            sub = self._do_complete_obj(backend, fields, sub)
             if self.condition and self.condition.limit and \
                self.condition.limit == i:
                 return
 
+            # Do not fill objects which are known to be filtered out.
+            if self.condition and isinstance(sub, BaseObject):
+                sub.backend = backend.name
+                if self.condition.is_loaded(sub) and not self.condition.is_valid(sub):
+                    modif += 1
+                    continue
+
+            sub = self._do_complete_obj(backend, fields, sub)
             if self.condition and not self.condition.is_valid(sub):
                 modif += 1
             else:
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import
+
+import sys
+from decimal import Decimal
+
+import pyarrow
+
+from .columnar import ColumnarFormatter
+
+__all__ = ['ArrowFormatter']
+
+
+class ArrowFormatter(ColumnarFormatter):
+    """
+    Formats results as an Arrow IPC stream, with a record batch per chunk.
+
+    Each table is written as a separate stream.
+    """
+
+    # Number of digits kept after the decimal point of Decimal values
+    DECIMAL_SCALE = 10
+
+    def __init__(self):
+        ColumnarFormatter.__init__(self)
+        self.fp = None
+        self.writer = None
+
+    def get_arrow_type(self, type_):
+        if type_ == 'decimal':
+            return pyarrow.decimal128(38, self.DECIMAL_SCALE)
+        return {'bool':      pyarrow.bool_(),
+                'int':       pyarrow.int64(),
+                'float':     pyarrow.float64(),
+                'date':      pyarrow.date32(),
+                'datetime':  pyarrow.timestamp('us'),
+                'time':      pyarrow.time64('us'),
+                'timedelta': pyarrow.duration('us'),
+                'bytes':     pyarrow.binary(),
+                'string':    pyarrow.string(),
+               }[type_]
+
+    def start_table(self, schema):
+        self.arrow_types = [self.get_arrow_type(type_) for name, type_ in schema]
+        self.arrow_schema = pyarrow.schema([pyarrow.field(name, arrow_type)
+                                            for (name, type_), arrow_type in zip(schema, self.arrow_types)])
+        if isinstance(self.outfile, basestring):
+            self.fp = open(self.outfile, 'ab')
+            sink = self.fp
+        else:
+            # Binary buffer of text streams, like sys.stdout on Python 3
+            sink = getattr(self.outfile, 'buffer', self.outfile)
+        self.writer = pyarrow.RecordBatchStreamWriter(sink, self.arrow_schema)
+
+    def write_columns(self, columns):
+        exponent = Decimal(1).scaleb(-self.DECIMAL_SCALE)
+        arrays = []
+        for (name, type_), arrow_type, column in zip(self.schema, self.arrow_types, columns):
+            if type_ == 'decimal':
+                column = [None if value is None else value.quantize(exponent) for value in column]
+            arrays.append(pyarrow.array(column, type=arrow_type))
+        names = [name for name, type_ in self.schema]
+        self.writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, names))
+
+    def close_table(self):
+        self.writer.close()
+        self.writer = None
+        if self.fp is not None:
+            self.fp.close()
+            self.fp = None
+        elif self.outfile is sys.stdout:
+            getattr(sys.stdout, 'buffer', sys.stdout).flush()
@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import
+
+import csv
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from weboob.capabilities.base import BaseObject, empty
+
+from .iformatter import IFormatter
+
+__all__ = ['ColumnarFormatter', 'TypedCSVFormatter', 'column_type']
+
+
+def column_type(types, values=()):
+    """
+    Get the type of a column from the python types its values can have.
+
+    :param types: types declared by a field, or found in values
+    :param values: values of the first chunk, to know if dates have a time
+    :rtype: str
+
+    >>> column_type([int, long])
+    'int'
+    >>> column_type([date, datetime], [date(2016, 1, 1), None])
+    'date'
+    >>> column_type([date, datetime], [datetime(2016, 1, 1, 12, 30)])
+    'datetime'
+    >>> column_type([basestring, date, datetime])
+    'string'
+    """
+    types = set(types)
+    if not types:
+        return 'string'
+    elif types <= set([bool]):
+        return 'bool'
+    elif types <= set([int, long]):
+        return 'int'
+    elif types <= set([float]):
+        return 'float'
+    elif types <= set([Decimal]):
+        return 'decimal'
+    elif types <= set([timedelta]):
+        return 'timedelta'
+    elif types <= set([date, datetime]) or types <= set([time, datetime]):
+        if any(isinstance(value, datetime) for value in values):
+            return 'datetime'
+        return 'date' if date in types else 'time'
+    elif types <= set([str]):
+        return 'bytes'
+    return 'string'
+
+
+def _to_float(value):
+    if isinstance(value, (int, long, Decimal)):
+        return float(value)
+
+
+def _to_decimal(value):
+    if isinstance(value, (int, long, float)):
+        return Decimal(repr(value))
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+
+
+class ColumnarFormatter(IFormatter):
+    """
+    Base class of formatters writing results as chunks of typed columns.
+
+    Columns are the selected fields of the formatted objects, and their
+    types come from the declaration of fields in the class of objects, or
+    from values of the first chunk for dicts. A new table is started when
+    objects of another class are formatted.
+
+    Values of every chunk are checked against the types of columns, and
+    converted to them when it is safe; :class:`ValueError` is raised
+    otherwise.
+    """
+
+    # Number of rows in a chunk
+    CHUNK_SIZE = 1024
+
+    # Python types of values of each type of column, and the function to
+    # convert values of other types, if any.
+    VALUE_TYPES = {'bool':      ((bool,), None),
+                   'int':       ((int, long), None),
+                   'float':     ((float,), _to_float),
+                   'decimal':   ((Decimal,), _to_decimal),
+                   'date':      ((date,), _to_date),
+                   'datetime':  ((datetime,), None),
+                   'time':      ((time,), None),
+                   'timedelta': ((timedelta,), None),
+                   'bytes':     ((str,), None),
+                   'string':    ((unicode,), unicode),
+                  }
+
+    def __init__(self):
+        IFormatter.__init__(self)
+        self.klass = None
+        # Python types of each column, declared or found in values
+        self.types = None
+        # List of (name, type) of columns, set when the first chunk is written
+        self.schema = None
+        self.columns = None
+
+    def format(self, obj, selected_fields=None, alias=None):
+        klass = type(obj) if isinstance(obj, BaseObject) else dict
+        if klass is not self.klass:
+            self.end_table()
+            self.klass = klass
+            if klass is not dict:
+                self.types = self.get_declared_types(klass, selected_fields)
+        return IFormatter.format(self, obj, selected_fields, alias)
+
+    def get_declared_types(self, klass, selected_fields):
+        types = []
+        if not selected_fields or 'id' in selected_fields:
+            types.append(('id', (unicode,)))
+        for name, field in klass._fields.iteritems():
+            if not selected_fields or name in selected_fields:
+                types.append((name, field.types))
+        return types
+
+    def format_dict(self, item):
+        if self.columns is None:
+            if self.klass is dict:
+                self.types = [(name, ()) for name in item]
+            self.columns = [[] for name in self.types]
+
+        for (name, types), column in zip(self.types, self.columns):
+            value = item.get(name)
+            column.append(None if empty(value) else value)
+
+        if len(self.columns[0]) >= self.CHUNK_SIZE:
+            self.write_chunk()
+
+    def format_collection(self, collection, only):
+        # Collections are not rows of the table.
+        pass
+
+    def write_chunk(self):
+        if not self.columns or not self.columns[0]:
+            return
+
+        if self.schema is None:
+            schema = []
+            for (name, types), column in zip(self.types, self.columns):
+                values = [value for value in column if value is not None]
+                if self.klass is dict:
+                    types = [type(value) for value in values]
+                schema.append((name, column_type(types, values)))
+            self.start_table(schema)
+            self.schema = schema
+
+        columns = []
+        for (name, type_), column in zip(self.schema, self.columns):
+            columns.append([None if value is None else self.convert(name, type_, value) for value in column])
+        self.write_columns(columns)
+        self.columns = [[] for name in self.schema]
+
+    def convert(self, name, type_, value):
+        types, converter = self.VALUE_TYPES[type_]
+        if isinstance(value, types) and not (type_ == 'date' and isinstance(value, datetime)):
+            return value
+
+        converted = converter(value) if converter is not None else None
+        if converted is None:
+            raise ValueError('Value %r of column "%s" is not of type %s' % (value, name, type_))
+        return converted
+
+    def end_table(self):
+        self.write_chunk()
+        if self.schema is not None:
+            self.close_table()
+        self.klass = None
+        self.types = None
+        self.schema = None
+        self.columns = None
+
+    def flush(self):
+        self.end_table()
+
+    def start_table(self, schema):
+        """
+        Start a table.
+
+        :param schema: name and type of each column
+        :type schema: list[(str, str)]
+        """
+        raise NotImplementedError()
+
+    def write_columns(self, columns):
+        """
+        Write a chunk of rows.
+
+        :param columns: values of each column, of the python types of
+                        the column, or None for empty values
+        :type columns: list[list]
+        """
+        raise NotImplementedError()
+
+    def close_table(self):
+        pass
+
+
+class TypedCSVFormatter(ColumnarFormatter):
+    """
+    Formats results as CSV, with the type of each column in the header.
+
+    Each column of the header is written as ``name:type``, and empty
+    values are written as ``\\N``.
+    """
+
+    NULL = '\\N'
+
+    CONVERTERS = {'bool':      lambda value: '1' if value else '0',
+                  'int':       str,
+                  'float':     repr,
+                  'decimal':   str,
+                  'date':      lambda value: value.isoformat(),
+                  'datetime':  lambda value: value.isoformat(),
+                  'time':      lambda value: value.isoformat(),
+                  'timedelta': lambda value: repr(value.total_seconds()),
+                  'bytes':     str,
+                  'string':    lambda value: unicode(value).encode('utf-8'),
+                 }
+
+    def __init__(self, field_separator=';'):
+        ColumnarFormatter.__init__(self)
+        self.field_separator = field_separator
+
+    def write_rows(self, rows):
+        if not isinstance(self.outfile, basestring):
+            return csv.writer(self.outfile, delimiter=self.field_separator).writerows(rows)
+
+        with open(self.outfile, 'a+') as fp:
+            csv.writer(fp, delimiter=self.field_separator).writerows(rows)
+
+    def start_table(self, schema):
+        self.converters = [self.CONVERTERS[type_] for name, type_ in schema]
+        self.write_rows([['%s:%s' % (name, type_) for name, type_ in schema]])
+
+    def write_columns(self, columns):
+        converted = []
+        for converter, column in zip(self.converters, columns):
+            converted.append([self.NULL if value is None else converter(value) for value in column])
+        self.write_rows(zip(*converted))
+
+
+def test():
+    from weboob.capabilities.bank import Transaction
+    from weboob.capabilities.base import NotAvailable
+    from tempfile import mkstemp
+    from os import remove
+
+    _, name = mkstemp()
+    fmt = TypedCSVFormatter()
+    fmt.outfile = name
+    fmt.CHUNK_SIZE = 2
+    for i in range(3):
+        tr = Transaction()
+        tr.id = u'%d' % i
+        tr.date = date(2016, 1, i + 1)
+        tr.amount = Decimal('-%d.50' % i)
+        tr.label = u'caf\xe9' if i else NotAvailable
+        fmt.format(tr, selected_fields=('id', 'date', 'amount', 'label', 'type'))
+    fmt.format(OrderedDict([('foo', 1), ('bar', u'baz')]))
+    fmt.flush()
+    with open(name) as f:
+        res = f.read()
+    remove(name)
+    assert res == ('id:string;date:date;type:int;label:string;amount:decimal\r\n'
+                   '0;2016-01-01;0;\\N;-0.50\r\n'
+                   '1;2016-01-02;0;caf\xc3\xa9;-1.50\r\n'
+                   '2;2016-01-03;0;caf\xc3\xa9;-2.50\r\n'
+                   'foo:int;bar:string\r\n'
+                   '1;baz\r\n'), res
+
+
+def test_chunks():
+    from tempfile import mkstemp
+    from os import remove
+
+    _, name = mkstemp()
+    fmt = TypedCSVFormatter()
+    fmt.outfile = name
+    fmt.CHUNK_SIZE = 2
+    fmt.format(OrderedDict([('n', 1), ('x', 1.5), ('d', date(2016, 1, 1))]))
+    fmt.format(OrderedDict([('n', 2), ('x', 2.5), ('d', date(2016, 1, 2))]))
+    fmt.format(OrderedDict([('n', 3), ('x', 3), ('d', datetime(2016, 1, 3, 12))]))
+    fmt.format(OrderedDict([('n', 4), ('x', Decimal('4.5')), ('d', None)]))
+    fmt.format(OrderedDict([('n', 5), ('x', None), ('d', date(2016, 1, 5))]))
+    fmt.flush()
+    with open(name) as f:
+        res = f.read()
+    assert res == ('n:int;x:float;d:date\r\n'
+                   '1;1.5;2016-01-01\r\n'
+                   '2;2.5;2016-01-02\r\n'
+                   '3;3.0;2016-01-03\r\n'
+                   '4;4.5;\\N\r\n'
+                   '5;\\N;2016-01-05\r\n'), res
+
+    fmt = TypedCSVFormatter()
+    fmt.outfile = name
+    fmt.CHUNK_SIZE = 2
+    fmt.format(OrderedDict([('n', 1), ('d', date(2016, 1, 1))]))
+    fmt.format(OrderedDict([('n', 2), ('d', date(2016, 1, 2))]))
+    fmt.format(OrderedDict([('n', 3.5), ('d', date(2016, 1, 3))]))
+    try:
+        fmt.format(OrderedDict([('n', 4), ('d', u'2016-01-04')]))
+    except ValueError as e:
+        assert 'column "n"' in str(e), e
+    else:
+        assert False, 'a float in an int column should be rejected'
+    finally:
+        remove(name)
+
+
+def test_arrow():
+    from unittest.case import SkipTest
+    from tempfile import mkstemp
+    from os import remove
+
+    try:
+        import pyarrow
+    except ImportError:
+        raise SkipTest('pyarrow is not installed')
+    from .arrow import ArrowFormatter
+
+    _, name = mkstemp()
+    fmt = ArrowFormatter()
+    fmt.outfile = name
+    fmt.CHUNK_SIZE = 2
+    fmt.format(OrderedDict([('n', 1), ('x', 1.5), ('d', date(2016, 1, 1)), ('s', u'caf\xe9')]))
+    fmt.format(OrderedDict([('n', 2), ('x', 2.5), ('d', None), ('s', u'foo')]))
+    fmt.format(OrderedDict([('n', 3), ('x', 3), ('d', datetime(2016, 1, 3, 12)), ('s', None)]))
+    fmt.flush()
+    try:
+        with open(name, 'rb') as f:
+            table = pyarrow.RecordBatchStreamReader(f).read_all()
+    finally:
+        remove(name)
+    assert table.num_rows == 3
+    assert table.to_pydict() == {'n': [1, 2, 3],
+                                 'x': [1.5, 2.5, 3.0],
+                                 'd': [date(2016, 1, 1), None, date(2016, 1, 3)],
+                                 's': [u'caf\xe9', u'foo', None],
+                                }, table.to_pydict()
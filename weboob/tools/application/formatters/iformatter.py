@@ -67,6 +67,15 @@ from weboob.tools.misc import guess_encoding
 __all__ = ['IFormatter', 'MandatoryFieldsNotFound']
 
 
+# Returned by getattr() for deleted fields
+_MISSING = object()
+
+
+def _method(klass, name):
+    method = getattr(klass, name)
+    return getattr(method, '__func__', method)
+
+
 class MandatoryFieldsNotFound(Exception):
     def __init__(self, missing_fields):
         Exception.__init__(self, u'Mandatory fields not found: %s.' % ', '.join(missing_fields))
@@ -98,6 +107,8 @@ class IFormatter(object):
         self.termrows = 0
         self.termcols = None
         self.outfile = outfile
+        # Fields to read on objects of each class, see get_projection()
+        self.projections = {}
         # XXX if stdin is not a tty, it seems that the command fails.
 
         if sys.stdout.isatty() and sys.stdin.isatty():
@@ -168,42 +179,93 @@ class IFormatter(object):
         :param alias: an alias to use instead of the object's ID
         :type alias: unicode
         """
-        if isinstance(obj, BaseObject):
+        if isinstance(obj, BaseObject) and type(self).format_obj != IFormatter.format_obj:
             if selected_fields:  # can be an empty list (nothing to do), or None (return all fields)
                 obj = obj.copy()
                 for name, value in obj.iter_fields():
                     if name not in selected_fields:
                         delattr(obj, name)
 
-            if self.MANDATORY_FIELDS:
-                missing_fields = set(self.MANDATORY_FIELDS) - set([name for name, value in obj.iter_fields()])
-                if missing_fields:
-                    raise MandatoryFieldsNotFound(missing_fields)
-
+            self.check_mandatory_fields([name for name, value in obj.iter_fields()])
             formatted = self.format_obj(obj, alias)
         else:
-            try:
-                obj = OrderedDict(obj)
-            except ValueError:
-                raise TypeError('Please give a BaseObject or a dict')
-
-            if selected_fields:
-                obj = obj.copy()
-                for name, value in obj.iteritems():
-                    if name not in selected_fields:
-                        obj.pop(name)
-
-            if self.MANDATORY_FIELDS:
-                missing_fields = set(self.MANDATORY_FIELDS) - set(obj)
-                if missing_fields:
-                    raise MandatoryFieldsNotFound(missing_fields)
+            if isinstance(obj, BaseObject):
+                # Only the fields are formatted, so they are projected
+                # instead of copying the object to delete the other ones.
+                obj = self.project_obj(obj, selected_fields)
+            else:
+                try:
+                    obj = OrderedDict(obj)
+                except ValueError:
+                    raise TypeError('Please give a BaseObject or a dict')
 
+                obj = self.project(obj, selected_fields)
+            self.check_mandatory_fields(obj)
             formatted = self.format_dict(obj)
 
         if formatted:
             self.output(formatted)
         return formatted
 
+    def check_mandatory_fields(self, names):
+        if self.MANDATORY_FIELDS:
+            missing_fields = set(self.MANDATORY_FIELDS) - set(names)
+            if missing_fields:
+                raise MandatoryFieldsNotFound(missing_fields)
+
+    def project(self, item, selected_fields):
+        """
+        Keep only selected fields of a dict.
+
+        :param item: fields of the object
+        :type item: OrderedDict
+        :param selected_fields: fields to keep. If None or empty, all fields are kept
+        :type selected_fields: tuple
+        :rtype: OrderedDict
+        """
+        if not selected_fields:
+            return item
+        return OrderedDict((name, value) for name, value in item.iteritems() if name in selected_fields)
+
+    def get_projection(self, klass, selected_fields):
+        """
+        Get the names of fields to read on objects of a class, or None if
+        the class overrides :meth:`BaseObject.to_dict`, which has to be
+        called.
+        """
+        key = (klass, tuple(selected_fields) if selected_fields else None)
+        try:
+            return self.projections[key]
+        except KeyError:
+            if _method(klass, 'to_dict') is not _method(BaseObject, 'to_dict') or \
+               _method(klass, 'iter_fields') is not _method(BaseObject, 'iter_fields'):
+                projection = None
+            else:
+                projection = [name for name in klass._fields if not selected_fields or name in selected_fields]
+            self.projections[key] = projection
+            return projection
+
+    def project_obj(self, obj, selected_fields):
+        """
+        Get selected fields of an object, as :meth:`BaseObject.to_dict`
+        would give them.
+
+        :type obj: BaseObject
+        :rtype: OrderedDict
+        """
+        projection = self.get_projection(type(obj), selected_fields)
+        if projection is None:
+            return self.project(obj.to_dict(), selected_fields)
+
+        items = []
+        if obj.id is not None and (not selected_fields or 'id' in selected_fields):
+            items.append(('id', obj.fullid if obj.backend is not None else obj.id))
+        for name in projection:
+            value = getattr(obj, name, _MISSING)
+            if value is not _MISSING:
+                items.append((name, value))
+        return OrderedDict(items)
+
     def format_obj(self, obj, alias=None):
         """
         Format an object to be human-readable.
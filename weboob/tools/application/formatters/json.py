@@ -18,6 +18,8 @@
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
 
+import sys
+
 from weboob.capabilities.base import NotAvailable, NotLoaded
 from weboob.tools.json import json
 
@@ -29,37 +31,70 @@ __all__ = ['JsonFormatter', 'JsonLineFormatter']
 class Encoder(json.JSONEncoder):
     "generic weboob object encoder"
 
+    def __init__(self, *args, **kwargs):
+        super(Encoder, self).__init__(*args, **kwargs)
+        # Function to convert objects of each class to a serializable value
+        self.converters = {}
+
+    def get_converter(self, klass):
+        if klass in (type(NotAvailable), type(NotLoaded)):
+            return lambda obj: None
+        if hasattr(klass, 'to_dict'):
+            return klass.to_dict
+        return str
+
     def default(self, obj):
         try:
-            return json.JSONEncoder.default(self, obj)
-        except TypeError:
-            if obj is NotAvailable or obj is NotLoaded:
-                return None
-
-            try:
-                dct = obj.to_dict()
-            except AttributeError:
-                return str(obj)
-            return dct
+            converter = self.converters[type(obj)]
+        except KeyError:
+            converter = self.converters[type(obj)] = self.get_converter(type(obj))
+        return converter(obj)
 
 
 class JsonFormatter(IFormatter):
     """
     Formats the whole list as a single JSON list object.
+
+    Items are written as they come, one per line, so the list is never
+    kept in memory.
     """
 
+    # Number of items written at once in a file, as it is opened by each
+    # call to output()
+    FILE_BATCH_SIZE = 100
+
     def __init__(self):
         IFormatter.__init__(self)
-        self.queue = []
+        self.encoder = Encoder()
+        self.pending = []
+        self.started = False
+
+    def write_items(self, items, end):
+        self.output(u'%s%s%s' % (u'' if self.started else u'[', u',\n'.join(items), end))
+        self.started = True
+
+    def write(self, item):
+        self.pending.append(self.encoder.encode(item))
+        # The last item is kept until the next one or flush(), to know if
+        # it has to be followed by a comma or by the end of the list.
+        batch_size = 1 if self.outfile == sys.stdout else self.FILE_BATCH_SIZE
+        if len(self.pending) > batch_size:
+            self.write_items(self.pending[:-1], u',')
+            del self.pending[:-1]
 
     def flush(self):
-        self.output(json.dumps(self.queue, cls=Encoder))
+        if self.pending or not self.started:
+            self.write_items(self.pending, u']')
+        else:
+            self.output(u']')
+        self.pending = []
+        self.started = False
 
     def format_dict(self, item):
-        self.queue.append(item)
+        self.write(item)
 
     def format_collection(self, collection, only):
-        self.queue.append(collection.to_dict())
+        self.write(collection.to_dict())
 
 
 class JsonLineFormatter(IFormatter):
@@ -68,11 +103,31 @@ class JsonLineFormatter(IFormatter):
     The advantage is that it can be streamed.
     """
 
+    def __init__(self):
+        IFormatter.__init__(self)
+        self.encoder = Encoder()
+
     def format_dict(self, item):
-        self.output(json.dumps(item, cls=Encoder))
+        self.output(self.encoder.encode(item))
 
 
 def test():
     from .iformatter import formatter_test_output as fmt
     assert fmt(JsonFormatter, {'foo': 'bar'}) == '[{"foo": "bar"}]\n'
     assert fmt(JsonLineFormatter, {'foo': 'bar'}) == '{"foo": "bar"}\n'
+
+
+def test_stream():
+    from tempfile import mkstemp
+    from os import remove
+    _, name = mkstemp()
+    fmt = JsonFormatter()
+    fmt.outfile = name
+    for i in range(3):
+        fmt.format({'foo': i, 'bar': 'baz'}, selected_fields=('foo',))
+    fmt.flush()
+    with open(name) as f:
+        res = f.read()
+    remove(name)
+    assert res == '[{"foo": 0},\n{"foo": 1},\n{"foo": 2}]\n'
+    assert json.loads(res) == [{'foo': 0}, {'foo': 1}, {'foo': 2}]
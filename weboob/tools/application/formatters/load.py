@@ -18,6 +18,9 @@
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
 
+import logging
+
+
 __all__ = ['FormattersLoader', 'FormatterLoadError']
 
 
@@ -26,7 +29,7 @@ class FormatterLoadError(Exception):
 
 
 class FormattersLoader(object):
-    BUILTINS = ['htmltable', 'multiline', 'simple', 'table', 'csv', 'webkit', 'json', 'json_line']
+    BUILTINS = ['htmltable', 'multiline', 'simple', 'table', 'csv', 'webkit', 'json', 'json_line', 'typed_csv', 'arrow']
 
     def __init__(self):
         self.formatters = {}
@@ -77,3 +80,14 @@ class FormattersLoader(object):
         elif name == 'json_line':
             from .json import JsonLineFormatter
             return JsonLineFormatter
+        elif name == 'typed_csv':
+            from .columnar import TypedCSVFormatter
+            return TypedCSVFormatter
+        elif name == 'arrow':
+            try:
+                from .arrow import ArrowFormatter
+            except ImportError as e:
+                logging.warning(u'Unable to load the arrow formatter (%s), using typed_csv instead' % e)
+                from .columnar import TypedCSVFormatter
+                return TypedCSVFormatter
+            return ArrowFormatter
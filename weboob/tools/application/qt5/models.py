@@ -199,14 +199,14 @@ class ResultModel(QAbstractItemModel):
         if n:
             self.endRemoveRows()
 
-    @Slot(object)
-    def _gotRootDone(self, obj):
-        self._addToRoot(obj)
+    @Slot(list)
+    def _gotRootDone(self, objs):
+        self.addRootItems(objs)
 
     def addRootDo(self, *args, **kwargs):
         """Make a weboob.do and add returned items to root of model"""
         process = DoWrapper(self.weboob, None)
-        process.gotResponse.connect(self._gotRootDone)
+        process.gotResponses.connect(self._gotRootDone)
         process.finished.connect(self.jobFinished)
 
         process.do(*args, **kwargs)
@@ -222,8 +222,7 @@ class ResultModel(QAbstractItemModel):
         return self.addRootDo(app._do_complete, self.limit, fields, *args, **kwargs)
 
     def addRootItems(self, objs):
-        for obj in objs:
-            self._addToRoot(obj)
+        self._addItems(objs, None, QModelIndex())
 
     def setColumnFields(self, columns):
         self.columns = columns
@@ -237,22 +236,28 @@ class ResultModel(QAbstractItemModel):
         self._addItem(obj, None, QModelIndex())
 
     def _addItem(self, obj, parent, parent_qidx):
+        self._addItems([obj], parent, parent_qidx)
+
+    def _addItems(self, objs, parent, parent_qidx):
+        if not objs:
+            return
         children = self.children.setdefault(parent, [])
         n = len(children)
-        self.beginInsertRows(parent_qidx, n, n)
-        children.append(obj)
-        self.parents[obj] = parent
+        self.beginInsertRows(parent_qidx, n, n + len(objs) - 1)
+        children.extend(objs)
+        for obj in objs:
+            self.parents[obj] = parent
         self.endInsertRows()
 
-    @Slot(object)
-    def _expanderGotResponse(self, obj):
+    @Slot(list)
+    def _expanderGotResponse(self, objs):
         parent, parent_qidx = self.jobExpanders[self.sender()]
-        self._addItem(obj, parent, parent_qidx)
+        self._addItems(objs, parent, parent_qidx)
 
     def _prepareExpanderJob(self, parent, parent_qidx):
         process = DoWrapper(self.weboob, None)
         process.finished.connect(self.jobFinished)
-        process.gotResponse.connect(self._expanderGotResponse)
+        process.gotResponses.connect(self._expanderGotResponse)
         self.jobExpanders[process] = (parent, parent_qidx)
         return process
 
@@ -318,14 +323,14 @@ class ResultModel(QAbstractItemModel):
     def fillObj(self, obj, fields, qidx):
         process = DoWrapper(self.weboob, None)
         self.jobFillers[process] = qidx
-        process.gotResponse.connect(self._fillerGotResponse)
+        process.gotResponses.connect(self._fillerGotResponse)
         process.finished.connect(self.jobFinished)
 
         process.do('fillobj', obj, fields, backends=qidx.data(self.RoleBackendName))
         self.jobAdded.emit()
         self.jobs.add(process)
 
-    @Slot(object)
+    @Slot(list)
     def _fillerGotResponse(self, _):
         qidx = self.jobFillers[self.sender()]
         self.dataChanged.emit(qidx, qidx)
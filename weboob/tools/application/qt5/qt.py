@@ -130,11 +130,14 @@ class QCallbacksManager(QObject):
 
     @Slot()
     def do_request(self):
+        # Answer every pending request, without blocking the threads
+        # adding new ones meanwhile.
         self.mutex.lock()
-        request = self.requests.pop()
-        request.answer = request()
-        request.event.set()
+        requests, self.requests = self.requests, []
         self.mutex.unlock()
+        for request in requests:
+            request.answer = request()
+            request.event.set()
 
     def add_request(self, request):
         self.mutex.lock()
@@ -192,11 +195,30 @@ class QtMainWindow(QMainWindow):
 
 
 class QtDo(QObject):
+    """
+    Run a call on backends, and give results to callbacks in the GUI thread.
+
+    Results are delivered in batches: every result received while the GUI
+    thread was handling the previous batch is given at once, with a single
+    signal. Backends wait when :attr:`MAX_PENDING` results are not handled
+    yet, so they can't outrun the GUI.
+
+    :param cb: called with each result
+    :param eb: called with (backend, error, backtrace) for each error
+    :param fb: called when the call is over
+    :param bcb: if given, called with each batch of results instead of *cb*
+    """
+
     gotResponse = Signal(object)
+    gotResponses = Signal(list)
+    # Emitted by the callback thread, when a batch is ready
+    _gotBatch = Signal(list)
     gotError = Signal(object, object, object)
     finished = Signal()
 
-    def __init__(self, weboob, cb, eb=None, fb=None, retain=False):
+    MAX_PENDING = 1000
+
+    def __init__(self, weboob, cb, eb=None, fb=None, retain=False, bcb=None):
         super(QtDo, self).__init__()
 
         if not eb:
@@ -207,8 +229,11 @@ class QtDo(QObject):
         self.cb = cb
         self.eb = eb
         self.fb = fb
+        self.bcb = bcb
+        # Set when the GUI thread has handled the last batch.
+        self.batch_done = Event()
 
-        self.gotResponse.connect(self.local_cb)
+        self._gotBatch.connect(self.local_cb)
         self.gotError.connect(self.local_eb)
         self.finished.connect(self.local_fb)
 
@@ -223,13 +248,16 @@ class QtDo(QObject):
 
     def do(self, *args, **kwargs):
         assert self.process is None
+        kwargs.setdefault('max_pending', self.MAX_PENDING)
         self.process = self.weboob.do(*args, **kwargs)
-        self.process.callback_thread(self.thread_cb, self.thread_eb, self.thread_fb)
+        self.process.callback_thread(self.thread_cb, self.thread_eb, self.thread_fb, batch=True)
 
     @Slot()
     def stop(self, wait=False):
         if self.process is not None:
             self.process.stop(wait)
+        # Do not let the callback thread wait for a batch to be handled.
+        self.batch_done.set()
 
     @Slot(object, object, object)
     def default_eb(self, backend, error, backtrace):
@@ -274,10 +302,22 @@ class QtDo(QObject):
         QMessageBox.critical(None, self.tr('Error with backend %s') % backend.name,
                              msg, QMessageBox.Ok)
 
-    @Slot(object)
-    def local_cb(self, data):
-        if self.cb:
-            self.cb(data)
+    @Slot(list)
+    def local_cb(self, batch):
+        try:
+            if self.process is None or self.process.stop_event.is_set():
+                return
+            if self.bcb:
+                self.bcb(batch)
+            elif self.cb:
+                for data in batch:
+                    self.cb(data)
+            self.gotResponses.emit(batch)
+            if self.receivers(self.gotResponse):
+                for data in batch:
+                    self.gotResponse.emit(data)
+        finally:
+            self.batch_done.set()
 
     @Slot(object, object, object)
     def local_eb(self, backend, error, backtrace):
@@ -289,13 +329,19 @@ class QtDo(QObject):
         if self.fb:
             self.fb()
 
-        self.gotResponse.disconnect(self.local_cb)
+        self._gotBatch.disconnect(self.local_cb)
         self.gotError.disconnect(self.local_eb)
         self.finished.disconnect(self.local_fb)
         self.process = None
 
-    def thread_cb(self, data):
-        self.gotResponse.emit(data)
+    def thread_cb(self, batch):
+        self.batch_done.clear()
+        if self.process.stop_event.is_set():
+            return
+        self._gotBatch.emit(batch)
+        # Wait for the GUI thread, so next results are coalesced in the
+        # next batch meanwhile.
+        self.batch_done.wait()
 
     def thread_eb(self, backend, error, backtrace):
         self.gotError.emit(backend, error, backtrace)
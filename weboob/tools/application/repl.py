@@ -22,6 +22,8 @@ from __future__ import print_function
 import atexit
 from cmd import Cmd
 from collections import OrderedDict
+from functools import cmp_to_key
+import heapq
 import logging
 import re
 from optparse import OptionGroup, OptionParser, IndentedHelpFormatter
@@ -967,16 +969,36 @@ class ReplApplication(Cmd, ConsoleApplication):
 
         return -1
 
+    def sort_key(self, obj):
+        """
+        Key used to sort listed objects, consistent with :meth:`comp_object`.
+
+        Objects are sorted by backend first, which allows "ls" to display
+        the objects of a backend as soon as it and the previous ones have
+        finished. Override :meth:`comp_object` instead to sort in another
+        way.
+        """
+        return (obj.backend, obj.id)
+
+    def get_sort_key(self):
+        """
+        Get the key function used to sort objects, which is
+        :meth:`sort_key` unless :meth:`comp_object` is overridden.
+        """
+        if type(self).comp_object != ReplApplication.comp_object:
+            return cmp_to_key(self.comp_object)
+        return self.sort_key
 
     @defaultcount(40)
     def do_ls(self, line):
         """
-        ls [-d] [-U] [PATH]
+        ls [-d] [-U] [-n COUNT] [PATH]
 
         List objects in current path.
         If an argument is given, list the specified path.
         Use -U option to not sort results. It allows you to use a "fast path" to
         return results as soon as possible.
+        Use -n option to only display the COUNT first objects, once sorted.
         Use -d option to display information about a collection (and to not
         display the content of it). It has the same behavior than the well
         known UNIX "ls" command.
@@ -985,6 +1007,7 @@ class ReplApplication(Cmd, ConsoleApplication):
         path = line.strip()
         only = False
         sort = True
+        top = None
 
         if '-U' in line.strip().partition(' '):
             path = line.strip().partition(' ')[-1]
@@ -994,36 +1017,30 @@ class ReplApplication(Cmd, ConsoleApplication):
             path = None
             only = line.strip().partition(' ')[-1]
 
+        if line.strip().partition(' ')[0] == '-n':
+            top, _, path = line.strip().partition(' ')[-1].partition(' ')
+            try:
+                top = int(top)
+            except ValueError:
+                print('Error: "%s" is not a number' % top, file=self.stderr)
+                return 2
+
         if path:
             for _path in path.split('/'):
                 # We have an argument, let's ch to the directory before the ls
                 self.working_path.cd1(_path)
 
-        objects = []
-        collections = []
         self.objects = []
 
         self.start_format()
 
-        for res in self._fetch_objects(objs=self.COLLECTION_OBJECTS):
-            if isinstance(res, Collection):
-                collections.append(res)
-                if sort is False:
-                    self.formatter.format_collection(res, only)
-            else:
-                if sort:
-                    objects.append(res)
-                else:
-                    self._format_obj(res, only)
-
-        if sort:
-            objects.sort(cmp=self.comp_object)
-            collections = self._merge_collections_with_same_path(collections)
-            collections.sort(cmp=self.comp_object)
-            for collection in collections:
-                self.formatter.format_collection(collection, only)
-            for obj in objects:
-                self._format_obj(obj, only)
+        call = self._call_iter_resources(objs=self.COLLECTION_OBJECTS)
+        if not sort:
+            collections = self._ls_unsorted(call, only)
+        elif top is None and self.get_sort_key() == self.sort_key:
+            collections = self._ls_by_backend(call, only)
+        else:
+            collections = self._ls_sorted(call, only, top)
 
         if path:
             for _path in path.split('/'):
@@ -1033,21 +1050,92 @@ class ReplApplication(Cmd, ConsoleApplication):
             # Save collections only if we listed the current path.
             self.collections = collections
 
-    def _find_collection(self, collection, collections):
-        for col in collections:
-            if col.split_path == collection.split_path:
-                return col
-        return None
+    def _ls_unsorted(self, call, only):
+        collections = []
+        for res in self._iter_call(call):
+            if isinstance(res, Collection):
+                collections.append(res)
+                self.formatter.format_collection(res, only)
+            else:
+                self._format_obj(res, only)
+        return collections
+
+    def _ls_sorted(self, call, only, top=None):
+        key = self.get_sort_key()
+        collections = []
+
+        def iter_objects():
+            for res in self._iter_call(call):
+                if isinstance(res, Collection):
+                    collections.append(res)
+                else:
+                    yield res
+
+        if top is None:
+            objects = sorted(iter_objects(), key=key)
+        else:
+            # nsmallest() only keeps a heap of the "top" first objects.
+            objects = heapq.nsmallest(top, iter_objects(), key=key)
+
+        collections = self._merge_collections_with_same_path(collections)
+        collections.sort(key=key)
+        for collection in collections:
+            self.formatter.format_collection(collection, only)
+        for obj in objects:
+            self._format_obj(obj, only)
+        return collections
+
+    def _ls_by_backend(self, call, only):
+        """
+        Display results sorted by :meth:`sort_key`, backend by backend, as
+        soon as a backend and all the previous ones have finished.
+
+        Collections of a backend are displayed before its objects. A
+        collection which has the same path than an already displayed one is
+        merged into it.
+        """
+        names = sorted(set(backend.name for backend in call.backends))
+        finished = set()
+        results = dict((name, ([], [])) for name in names)
+        merged = OrderedDict()
+
+        for backend, res in self._iter_call(call, by_backend=True):
+            if res is not call.FINISHED:
+                results[backend.name][isinstance(res, Collection)].append(res)
+                continue
+
+            finished.add(backend.name)
+            while names and names[0] in finished:
+                objects, collections = results.pop(names.pop(0))
+                collections.sort(key=self.sort_key)
+                for collection in collections:
+                    if self._merge_collection(collection, merged):
+                        self.formatter.format_collection(collection, only)
+                objects.sort(key=self.sort_key)
+                for obj in objects:
+                    self._format_obj(obj, only)
+
+        return list(merged.values())
+
+    def _merge_collection(self, collection, merged):
+        """
+        Merge a collection into a dict of collections by path.
+
+        :returns: True if there was no collection with this path yet
+        """
+        path = tuple(collection.split_path)
+        col = merged.get(path)
+        if col is None:
+            merged[path] = collection
+            return True
+        col.backend += " %s" % collection.backend
+        return False
 
     def _merge_collections_with_same_path(self, collections):
-        to_return = []
+        merged = OrderedDict()
         for collection in collections:
-            col = self._find_collection(collection, to_return)
-            if col:
-                col.backend += " %s" % collection.backend
-            else:
-                to_return.append(collection)
-        return to_return
+            self._merge_collection(collection, merged)
+        return list(merged.values())
 
     def _format_obj(self, obj, only):
         if only is False or not hasattr(obj, 'id') or obj.id in only:
@@ -1090,17 +1178,21 @@ class ReplApplication(Cmd, ConsoleApplication):
 
         self._change_prompt()
 
-    def _fetch_objects(self, objs):
-        split_path = self.working_path.get()
+    def _call_iter_resources(self, objs):
+        return self.do('iter_resources', objs=objs,
+                                         split_path=self.working_path.get(),
+                                         caps=CapCollection)
 
+    def _iter_call(self, call, by_backend=False):
         try:
-            for res in self.do('iter_resources', objs=objs,
-                                                 split_path=split_path,
-                                                 caps=CapCollection):
+            for res in (call.iter_by_backend() if by_backend else call):
                 yield res
         except CallErrors as errors:
             self.bcall_errors_handler(errors, CollectionNotFound)
 
+    def _fetch_objects(self, objs):
+        return self._iter_call(self._call_iter_resources(objs))
+
 
     def all_collections(self):
         """
@@ -17,7 +17,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
+import re
+from datetime import date, datetime, timedelta
+
+import weboob.tools.date as date_utils
 from weboob.capabilities import UserError
+from weboob.capabilities.base import BaseObject, NotLoaded
 
 
 __all__ = ['ResultsCondition', 'ResultsConditionError']
@@ -32,11 +37,70 @@ class ResultsConditionError(UserError):
     pass
 
 
+TIMEDELTA_RE = re.compile(r'^\s*((?P<hours>\d+)\s*h)?\s*((?P<minutes>\d+)\s*m)?\s*((?P<seconds>\d+)\s*s)?\s*$')
+
+# Returned when a field is not in the tested object
+MISSING = object()
+# Returned when the right operand can't be converted to the type of a value
+INVALID = object()
+
+
+def parse_literal(literal, value):
+    """
+    Convert the right operand of a condition, always given as string by
+    the application, to the type of the tested value.
+    """
+    if isinstance(value, date_utils.date):
+        return date(*[int(x) for x in literal.split('-')])
+    elif isinstance(value, date_utils.datetime):
+        splitted_datetime = literal.split(' ')
+        return datetime(*([int(x) for x in splitted_datetime[0].split('-')] +
+                          [int(x) for x in splitted_datetime[1].split(':')]))
+    elif isinstance(value, timedelta):
+        time_dict = TIMEDELTA_RE.match(literal).groupdict()
+        return timedelta(seconds=int(time_dict['seconds'] or "0"),
+                         minutes=int(time_dict['minutes'] or "0"),
+                         hours=int(time_dict['hours'] or "0"))
+    else:
+        return type(value)(literal)
+
+
 class Condition(object):
     def __init__(self, left, op, right):
         self.left = left  # Field of the object to test
         self.op = op
         self.right = right
+        self.function = functions[op]
+        # Right operand converted to the type of each tested value
+        self.literals = {}
+
+    def convert(self, value):
+        """
+        Get the right operand converted to the type of *value*, or
+        :data:`INVALID` if it can't be.
+        """
+        try:
+            return self.literals[type(value)]
+        except KeyError:
+            try:
+                literal = parse_literal(self.right, value)
+            except Exception:
+                literal = INVALID
+            self.literals[type(value)] = literal
+            return literal
+
+    def evaluate(self, obj, value):
+        # in the case of id, test id@backend and id
+        if self.left == 'id':
+            return self.function(self.right, value) or self.function(self.right, obj.id)
+
+        literal = self.convert(value)
+        if literal is INVALID:
+            return False
+        try:
+            return self.function(literal, value)
+        except Exception:
+            return False
 
 
 def is_egal(left, right):
@@ -61,6 +125,11 @@ def is_in(left, right):
 functions = {'!=': is_notegal, '=': is_egal, '>': is_sup, '<': is_inf, '|': is_in}
 
 
+def _method(klass, name):
+    method = getattr(klass, name)
+    return getattr(method, '__func__', method)
+
+
 class ResultsCondition(IResultsCondition):
     condition_str = None
 
@@ -96,46 +165,64 @@ class ResultsCondition(IResultsCondition):
             or_list.append(and_list)
         self.condition = or_list
         self.condition_str = condition_str
+        self.fields = set(condition.left for and_list in or_list for condition in and_list)
+        # Classes whose fields can be read without calling to_dict()
+        self._plain_classes = {}
+
+    def is_plain(self, klass):
+        try:
+            return self._plain_classes[klass]
+        except KeyError:
+            plain = issubclass(klass, BaseObject) and \
+                    _method(klass, 'to_dict') is _method(BaseObject, 'to_dict') and \
+                    _method(klass, 'iter_fields') is _method(BaseObject, 'iter_fields')
+            self._plain_classes[klass] = plain
+            return plain
+
+    def get_value(self, obj, d, name):
+        """
+        Get the value of a field, as given by :meth:`BaseObject.to_dict`.
+
+        :param d: result of ``obj.to_dict()``, or None if the class of *obj*
+                  does not override it
+        :returns: the value, or :data:`MISSING`
+        """
+        if d is not None:
+            return d.get(name, MISSING)
+
+        if name == 'id':
+            if obj.id is None:
+                return MISSING
+            return obj.fullid if obj.backend is not None else obj.id
+        if name not in obj._fields:
+            return MISSING
+        return getattr(obj, name, MISSING)
+
+    def is_loaded(self, obj):
+        """
+        Return True if every field used by the condition is loaded on *obj*,
+        so it can be checked before calling fillobj().
+        """
+        if not isinstance(obj, BaseObject):
+            return False
+
+        d = None if self.is_plain(type(obj)) else obj.to_dict()
+        for name in self.fields:
+            value = self.get_value(obj, d, name)
+            if value is MISSING or value is NotLoaded:
+                return False
+        return True
 
     def is_valid(self, obj):
-        import weboob.tools.date as date_utils
-        import re
-        from datetime import date, datetime, timedelta
-        d = obj.to_dict()
+        d = None if self.is_plain(type(obj)) else obj.to_dict()
         # We evaluate all member of a list at each iteration.
         for _or in self.condition:
             myeval = True
             for condition in _or:
-                if condition.left in d:
-                    # in the case of id, test id@backend and id
-                    if condition.left == 'id':
-                        tocompare = condition.right
-                        evalfullid = functions[condition.op](tocompare, d['id'])
-                        evalid = functions[condition.op](tocompare, obj.id)
-                        myeval = evalfullid or evalid
-                    else:
-                        # We have to change the type of v, always gived as string by application
-                        typed = type(d[condition.left])
-                        try:
-                            if isinstance(d[condition.left], date_utils.date):
-                                tocompare = date(*[int(x) for x in condition.right.split('-')])
-                            elif isinstance(d[condition.left], date_utils.datetime):
-                                splitted_datetime = condition.right.split(' ')
-                                tocompare = datetime(*([int(x) for x in splitted_datetime[0].split('-')] +
-                                                       [int(x) for x in splitted_datetime[1].split(':')]))
-                            elif isinstance(d[condition.left], timedelta):
-                                time_dict = re.match('^\s*((?P<hours>\d+)\s*h)?\s*((?P<minutes>\d+)\s*m)?\s*((?P<seconds>\d+)\s*s)?\s*$',
-                                                     condition.right).groupdict()
-                                tocompare = timedelta(seconds=int(time_dict['seconds'] or "0"),
-                                                      minutes=int(time_dict['minutes'] or "0"),
-                                                      hours=int(time_dict['hours'] or "0"))
-                            else:
-                                tocompare = typed(condition.right)
-                            myeval = functions[condition.op](tocompare, d[condition.left])
-                        except:
-                            myeval = False
-                else:
+                value = self.get_value(obj, d, condition.left)
+                if value is MISSING:
                     raise ResultsConditionError(u'Field "%s" is not valid.' % condition.left)
+                myeval = condition.evaluate(obj, value)
                 # Do not try all AND conditions if one is false
                 if not myeval:
                     break
@@ -145,6 +232,38 @@ class ResultsCondition(IResultsCondition):
         # If we are here, all OR conditions are False
         return False
 
+    def get_lower_bound(self, name, example):
+        """
+        Get the lowest value of a field accepted by the condition.
+
+        It can be used to stop iterating on results sorted by this field
+        in descending order.
+
+        :param name: name of the field
+        :type name: :class:`str`
+        :param example: any value of the type of the field, used to convert
+                        operands
+        :returns: the bound, or None if the condition does not have one
+
+        >>> from weboob.tools.date import date
+        >>> ResultsCondition('date>2016-01-01 AND amount<0').get_lower_bound('date', date.today())
+        datetime.date(2016, 1, 1)
+        >>> ResultsCondition('date>2016-01-01 OR amount<0').get_lower_bound('date', date.today())
+        """
+        bounds = []
+        for _or in self.condition:
+            bound = None
+            for condition in _or:
+                if condition.left != name or condition.op not in ('>', '='):
+                    continue
+                literal = condition.convert(example)
+                if literal is not INVALID and (bound is None or literal > bound):
+                    bound = literal
+            if bound is None:
+                return None
+            bounds.append(bound)
+        return min(bounds)
+
     def __str__(self):
         return unicode(self).encode('utf-8')
 
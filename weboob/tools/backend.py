@@ -18,6 +18,8 @@
 
 
 import os
+import time
+from datetime import datetime
 from threading import RLock
 from copy import copy
 
@@ -29,7 +31,107 @@ from weboob.tools.value import ValuesDict
 from weboob.exceptions import ModuleInstallError
 
 
-__all__ = ['BackendStorage', 'BackendConfig', 'Module']
+__all__ = ['SeenIndex', 'BackendStorage', 'BackendConfig', 'Module']
+
+
+class SeenIndex(object):
+    """
+    Set of IDs of seen objects, kept in a backend storage.
+
+    IDs are stored with the time they were added, and expire after
+    *max_age* seconds, or when there are more than *max_size* of them.
+    Changes are saved by batches, every :attr:`BATCH_SIZE` changes or
+    when :meth:`commit` is called.
+
+    It is obtained with :meth:`BackendStorage.seen_index`.
+
+    :param storage: storage of the backend
+    :type storage: :class:`BackendStorage`
+    :param name: key of the index in the storage
+    :type name: :class:`str`
+    :param max_age: number of seconds after which IDs expire
+    :type max_age: :class:`int`
+    :param max_size: maximal number of IDs to keep
+    :type max_size: :class:`int`
+    """
+
+    # Number of changes after which they are committed
+    BATCH_SIZE = 50
+
+    def __init__(self, storage, name, max_age=None, max_size=None):
+        self.storage = storage
+        self.name = name
+        self.max_age = max_age
+        self.max_size = max_size
+        self.pending = 0
+
+        entries = storage.get(name, default={})
+        if isinstance(entries, dict) and all(isinstance(value, float) for value in entries.itervalues()):
+            self.entries = entries
+        else:
+            # Previous formats were a list of IDs, or a dict with any value
+            # for each ID.
+            self.entries = {}
+            now = time.time()
+            for id in entries:
+                value = entries[id] if isinstance(entries, dict) else None
+                if isinstance(value, datetime):
+                    self.entries[id] = time.mktime(value.timetuple())
+                else:
+                    self.entries[id] = now
+            self.pending += 1
+
+    def __contains__(self, id):
+        return id in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, id):
+        """
+        Mark an ID as seen.
+        """
+        self.entries[id] = time.time()
+        self.changed()
+
+    def discard(self, id):
+        """
+        Remove an ID, if it is in the index.
+        """
+        if self.entries.pop(id, None) is not None:
+            self.changed()
+
+    def changed(self):
+        self.pending += 1
+        if self.pending >= self.BATCH_SIZE:
+            self.commit()
+
+    def expire(self):
+        """
+        Remove expired IDs.
+        """
+        if self.max_age is not None:
+            limit = time.time() - self.max_age
+            for id in [id for id, added in self.entries.iteritems() if added < limit]:
+                del self.entries[id]
+        if self.max_size is not None and len(self.entries) > self.max_size:
+            ids = sorted(self.entries, key=self.entries.get)
+            for id in ids[:len(ids) - self.max_size]:
+                del self.entries[id]
+
+    def commit(self):
+        """
+        Save changes in the storage.
+        """
+        if not self.pending:
+            return
+        self.expire()
+        self.storage.set(self.name, self.entries)
+        self.storage.save()
+        self.pending = 0
 
 
 class BackendStorage(object):
@@ -48,6 +150,7 @@ class BackendStorage(object):
     def __init__(self, name, storage):
         self.name = name
         self.storage = storage
+        self.indexes = {}
 
     def set(self, *args):
         """
@@ -82,11 +185,11 @@ class BackendStorage(object):
 
         >>> from weboob.tools.storage import StandardStorage
         >>> backend = BackendStorage('blah', StandardStorage('/tmp/cfg'))
-        >>> backend.storage.get('config', 'nb_of_threads')
+        >>> backend.storage.get('config', 'nb_of_threads')  # doctest: +SKIP
         10
         >>> backend.storage.get('config', 'unexistant', 'path', default='lol')
         'lol'
-        >>> backend.storage.get('config')
+        >>> backend.storage.get('config')  # doctest: +SKIP
         {'nb_of_threads': 10, 'other_things': 'blah'}
 
         :param args: path to get
@@ -117,6 +220,35 @@ class BackendStorage(object):
         if self.storage:
             return self.storage.save('backends', self.name)
 
+    def seen_index(self, name='seen', max_age=None, max_size=None):
+        """
+        Get an index of seen IDs, created at the first call.
+
+        Example::
+
+            seen = self.storage.seen_index(max_size=100)
+            if message.id not in seen:
+                seen.add(message.id)
+            seen.commit()
+
+        :param name: key of the index in the storage
+        :param max_age: number of seconds after which IDs expire
+        :param max_size: maximal number of IDs to keep
+        :rtype: :class:`SeenIndex`
+        """
+        try:
+            return self.indexes[name]
+        except KeyError:
+            index = self.indexes[name] = SeenIndex(self, name, max_age, max_size)
+            return index
+
+    def commit(self):
+        """
+        Save changes of all indexes of seen IDs.
+        """
+        for index in self.indexes.itervalues():
+            index.commit()
+
 
 class BackendConfig(ValuesDict):
     """
@@ -285,6 +417,8 @@ class Module(object):
         """
         This abstract method is called when the backend is unloaded.
         """
+        self.storage.commit()
+
         if self._browser is None:
             return
 
@@ -489,3 +623,55 @@ class AbstractModule(Module):
 
         cls.__bases__ = tuple([parent] + list(cls.iter_caps()))
         return cls.__new__(cls, weboob, name, config, storage, logger, nofail)
+
+
+def _test_storage(path):
+    from weboob.tools.storage import StandardStorage
+
+    storage = BackendStorage('foo', StandardStorage(path))
+    storage.load({})
+    return storage
+
+
+def test_seen_index_persistence():
+    from tempfile import mkstemp
+
+    _, path = mkstemp()
+    try:
+        seen = _test_storage(path).seen_index()
+        seen.add('a')
+        seen.add('b')
+        seen.discard('b')
+        # Nothing is saved before a commit, or a full batch.
+        assert 'a' not in _test_storage(path).seen_index()
+        seen.commit()
+        assert list(_test_storage(path).seen_index()) == ['a']
+
+        for i in range(SeenIndex.BATCH_SIZE):
+            seen.add(i)
+        assert len(_test_storage(path).seen_index()) == SeenIndex.BATCH_SIZE + 1
+    finally:
+        os.remove(path)
+
+
+def test_seen_index_purge():
+    from tempfile import mkstemp
+
+    _, path = mkstemp()
+    try:
+        storage = _test_storage(path)
+        # Previous format, migrated when loaded.
+        storage.set('seen', ['a', 'b'])
+        seen = storage.seen_index(max_age=60, max_size=3)
+        assert sorted(seen) == ['a', 'b']
+
+        seen.entries['a'] -= 120
+        for id in ('c', 'd', 'e'):
+            seen.add(id)
+            seen.entries[id] += len(seen)
+        seen.commit()
+        # a has expired, and b is the oldest one.
+        assert sorted(seen) == ['c', 'd', 'e']
+        assert sorted(_test_storage(path).seen_index()) == ['c', 'd', 'e']
+    finally:
+        os.remove(path)
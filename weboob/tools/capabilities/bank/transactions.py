@@ -26,6 +26,7 @@ from weboob.capabilities.bank import Transaction, Account
 from weboob.capabilities import NotAvailable, NotLoaded
 from weboob.tools.misc import to_unicode
 from weboob.tools.log import getLogger
+from weboob.tools.date import cached_date_parser
 
 from weboob.exceptions import ParseError
 from weboob.browser.elements import TableElement, ItemElement
@@ -35,6 +36,20 @@ from weboob.browser.filters.standard import Filter, CleanText, CleanDecimal, Tab
 __all__ = ['FrenchTransaction', 'AmericanTransaction']
 
 
+@cached_date_parser
+def _parse_date(date):
+    """
+    Parse a date written as ddmmyyyy or dd/mm/yy(yy).
+
+    :returns: the date, or None if it is not in one of these layouts
+    """
+    if date.isdigit() and len(date) == 8:
+        return datetime.date(int(date[4:8]), int(date[2:4]), int(date[0:2]))
+    elif '/' in date:
+        return datetime.date(*reversed(map(int, date.split('/'))))
+    return None
+
+
 class classproperty(object):
     def __init__(self, f):
         self.f = f
@@ -83,10 +98,7 @@ class FrenchTransaction(Transaction):
             return NotAvailable
 
         if not isinstance(date, (datetime.date, datetime.datetime)):
-            if date.isdigit() and len(date) == 8:
-                date = datetime.date(int(date[4:8]), int(date[2:4]), int(date[0:2]))
-            elif '/' in date:
-                date = datetime.date(*reversed(map(int, date.split('/'))))
+            date = _parse_date(date) or date
         if not isinstance(date, (datetime.date, datetime.datetime)):
             self._logger.warning('Unable to parse date %r' % date)
             date = NotAvailable
@@ -214,10 +226,7 @@ class FrenchTransaction(Transaction):
                 return NotAvailable
 
             if not isinstance(date, (datetime.date, datetime.datetime)):
-                if date.isdigit() and len(date) == 8:
-                    date = datetime.date(int(date[4:8]), int(date[2:4]), int(date[0:2]))
-                elif '/' in date:
-                    date = datetime.date(*reversed(map(int, date.split('/'))))
+                date = _parse_date(date) or date
             if not isinstance(date, (datetime.date, datetime.datetime)):
                 date = NotAvailable
             elif date.year < 100:
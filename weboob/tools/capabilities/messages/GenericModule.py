@@ -18,7 +18,6 @@
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
 
-import time
 from weboob.capabilities.messages import CapMessages, Message, Thread
 from weboob.capabilities.base import find_object
 from weboob.tools.backend import Module
@@ -39,6 +38,13 @@ class GenericNewspaperModule(Module, CapMessages):
     URL2ID = None
     RSSSIZE = 0
 
+    @property
+    def seen(self):
+        max_size = None
+        if self.URL2ID and self.RSSSIZE != 0:
+            max_size = self.RSSSIZE + 10
+        return self.storage.seen_index(max_size=max_size)
+
     def get_thread(self, _id):
         if isinstance(_id, Thread):
             thread = _id
@@ -57,7 +63,7 @@ class GenericNewspaperModule(Module, CapMessages):
             thread = Thread(id)
 
         flags = Message.IS_HTML
-        if thread.id not in self.storage.get('seen', default={}):
+        if thread.id not in self.seen:
             flags |= Message.IS_UNREAD
         thread.title = content.title
         if not thread.date:
@@ -91,38 +97,14 @@ class GenericNewspaperModule(Module, CapMessages):
 
     def iter_unread_messages(self):
         for thread in self.iter_threads():
-            if thread.id in self.storage.get('seen', default={}):
+            if thread.id in self.seen:
                 continue
             self.fill_thread(thread, 'root')
             for msg in thread.iter_all_messages():
                 yield msg
+        self.seen.commit()
 
     def set_message_read(self, message):
-        self.storage.set(
-            'seen',
-            message.thread.id,
-            'comments',
-            self.storage.get(
-                'seen',
-                message.thread.id,
-                'comments',
-                default=[]) + [message.id])
-
-        if self.URL2ID and self.RSSSIZE != 0:
-            url2id = self.URL2ID
-            lastpurge = self.storage.get('lastpurge', default=0)
-            l = []
-            if time.time() - lastpurge > 7200:
-                self.storage.set('lastpurge', time.time())
-                for id in self.storage.get('seen', default={}):
-                    l.append((int(url2id(id)), id))
-                l.sort()
-                l.reverse()
-                tosave = [v[1] for v in l[0:self.RSSSIZE + 10]]
-                toremove = set([v for v in self.storage.get('seen', default={})]).difference(tosave)
-                for id in toremove:
-                    self.storage.delete('seen', id)
-
-        self.storage.save()
+        self.seen.add(message.thread.id)
 
     OBJECTS = {Thread: fill_thread}
@@ -26,6 +26,11 @@ try:
 except ImportError:
     raise ImportError('Please install python-imaging')
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class VirtKeyboardError(Exception):
     pass
@@ -89,6 +94,8 @@ class VirtKeyboard(object):
 
         self.width, self.height = self.image.size
         self.pixar = self.image.load()
+        self._mask = None
+        self._mask_columns = None
 
     def load_symbols(self, coords):
         self.coords = {}
@@ -99,62 +106,105 @@ class VirtKeyboard(object):
                 continue
             self.coords[i] = coord
             self.md5[i] = self.checksum(self.coords[i])
+        self._symbols_by_md5 = None
 
     def check_color(self, pixel):
         return pixel == self.color
 
+    @property
+    def mask(self):
+        """
+        Pixels of the image which have the color of symbols, computed once.
+
+        It is a boolean array of rows if numpy is available, or a list of
+        rows as strings where '.' is a pixel of a symbol and ' ' is not.
+        """
+        if self._mask is None:
+            if numpy is not None:
+                pixels = None
+                if type(self).check_color == VirtKeyboard.check_color and self.image.mode != '1':
+                    pixels = numpy.asarray(self.image)
+                if pixels is not None and pixels.ndim == 3 and isinstance(self.color, tuple):
+                    mask = (pixels == numpy.asarray(self.color)).all(axis=2)
+                elif pixels is not None and pixels.ndim == 2 and isinstance(self.color, (int, long)):
+                    mask = pixels == self.color
+                else:
+                    mask = numpy.fromiter((self.check_color(pixel) for pixel in self.image.getdata()),
+                                          dtype=bool, count=self.width * self.height)
+                self._mask = mask.reshape(self.height, self.width)
+            else:
+                line = ''.join('.' if self.check_color(pixel) else ' ' for pixel in self.image.getdata())
+                self._mask = [line[y * self.width:(y + 1) * self.width] for y in range(self.height)]
+        return self._mask
+
+    @property
+    def mask_columns(self):
+        """
+        Columns of :attr:`mask`, when it is a list of strings.
+        """
+        if self._mask_columns is None:
+            self._mask_columns = [''.join(column) for column in zip(*self.mask)]
+        return self._mask_columns
+
+    def clip_coords(self, x1, y1, x2, y2):
+        """
+        Clip coordinates to the image. The area is empty if x2 < x1 or
+        y2 < y1.
+        """
+        x1, y1 = max(x1, 0), max(y1, 0)
+        return x1, y1, max(min(x2, self.width - 1), x1 - 1), max(min(y2, self.height - 1), y1 - 1)
+
     def get_symbol_coords(self, coords):
         """Return narrow coordinates around symbol."""
         (x1, y1, x2, y2) = coords
         if self.margin:
             top, right, bottom, left = self.margin
             x1, y1, x2, y2 = x1 + left, y1 + top, x2 - right, y2 - bottom
-
-        newY1 = -1
-        newY2 = -1
-        for y in range(y1, min(y2 + 1, self.height)):
-            empty_line = True
-            for x in range(x1, min(x2 + 1, self.width)):
-                if self.check_color(self.pixar[x, y]):
-                    empty_line = False
-                    if newY1 < 0:
-                        newY1 = y
-                    break
-            if newY1 >= 0 and not empty_line:
-                newY2 = y
-        newX1 = -1
-        newX2 = -1
-        for x in range(x1, min(x2 + 1, self.width)):
-            empty_column = True
-            for y in range(y1, min(y2 + 1, self.height)):
-                if self.check_color(self.pixar[x, y]):
-                    empty_column = False
-                    if newX1 < 0:
-                        newX1 = x
-                    break
-            if newX1 >= 0 and not empty_column:
-                newX2 = x
-        return (newX1, newY1, newX2, newY2)
+        x1, y1, x2, y2 = self.clip_coords(x1, y1, x2, y2)
+
+        if numpy is not None:
+            area = self.mask[y1:y2 + 1, x1:x2 + 1]
+            rows = numpy.flatnonzero(area.any(axis=1))
+            columns = numpy.flatnonzero(area.any(axis=0))
+            if not len(rows):
+                return (-1, -1, -1, -1)
+            return (x1 + int(columns[0]), y1 + int(rows[0]), x1 + int(columns[-1]), y1 + int(rows[-1]))
+
+        rows = [y for y in range(y1, y2 + 1) if '.' in self.mask[y][x1:x2 + 1]]
+        columns = [x for x in range(x1, x2 + 1) if '.' in self.mask_columns[x][y1:y2 + 1]]
+        if not rows:
+            return (-1, -1, -1, -1)
+        return (columns[0], rows[0], columns[-1], rows[-1])
 
     def checksum(self, coords):
-        (x1, y1, x2, y2) = coords
-        s = ''
-        for y in range(y1, min(y2 + 1, self.height)):
-            for x in range(x1, min(x2 + 1, self.width)):
-                if self.check_color(self.pixar[x, y]):
-                    s += "."
-                else:
-                    s += " "
+        x1, y1, x2, y2 = self.clip_coords(*coords)
+        if numpy is not None:
+            area = self.mask[y1:y2 + 1, x1:x2 + 1]
+            s = numpy.where(area, ord('.'), ord(' ')).astype(numpy.uint8).tostring()
+        else:
+            s = ''.join(row[x1:x2 + 1] for row in self.mask[y1:y2 + 1])
         return hashlib.md5(s).hexdigest()
 
+    @property
+    def symbols_by_md5(self):
+        """
+        Reverse lookup table of :attr:`md5`.
+        """
+        if getattr(self, '_symbols_by_md5', None) is None:
+            self._symbols_by_md5 = {}
+            for i in self.md5:
+                self._symbols_by_md5.setdefault(self.md5[i], i)
+        return self._symbols_by_md5
+
     def get_symbol_code(self, md5sum_list):
         if isinstance(md5sum_list, basestring):
             md5sum_list = [md5sum_list]
 
         for md5sum in md5sum_list:
-            for i in self.md5:
-                if md5sum == self.md5[i]:
-                    return i
+            try:
+                return self.symbols_by_md5[md5sum]
+            except KeyError:
+                pass
         raise VirtKeyboardError('Symbol not found for hash "%s".' % md5sum)
 
     def get_string_code(self, string):
@@ -242,3 +292,63 @@ class GridVirtKeyboard(VirtKeyboard):
         super(GridVirtKeyboard, self).__init__()
 
         self.load_symbols(coords)
+
+
+def test_symbols():
+    from io import BytesIO
+    from PIL import ImageDraw
+
+    global numpy
+    real_numpy = numpy
+
+    class MyVirtKeyboard(VirtKeyboard):
+        margin = 1
+
+    class MyGreyVirtKeyboard(MyVirtKeyboard):
+        def check_color(self, pixel):
+            return pixel < 128
+
+    coords = {'0': (0, 0, 19, 19), '1': (20, 0, 39, 19), '2': (40, 0, 59, 19), 'empty': (60, 0, 79, 19)}
+
+    def make_image(mode, background, color):
+        image = Image.new(mode, (80, 20), background)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((4, 3, 12, 15), outline=color)
+        draw.line((30, 2, 30, 17), fill=color)
+        draw.line((44, 4, 55, 15), fill=color)
+        draw.line((50, 10, 60, 10), fill=color)
+        fp = BytesIO()
+        image.save(fp, 'PNG')
+        fp.seek(0)
+        return fp
+
+    def load(klass, mode, background, color):
+        vk = klass(make_image(mode, background, color), coords, color)
+        # Legacy checksum, computed pixel by pixel.
+        for symbol, (x1, y1, x2, y2) in vk.coords.items():
+            s = ''.join('.' if vk.check_color(vk.pixar[x, y]) else ' '
+                        for y in range(y1, y2 + 1) for x in range(x1, x2 + 1))
+            assert vk.md5[symbol] == hashlib.md5(s).hexdigest()
+        return vk.coords, vk.md5
+
+    expected_coords = {'0': (4, 3, 12, 15), '1': (30, 2, 30, 17), '2': (44, 4, 58, 15)}
+    results = []
+    try:
+        # With numpy if it is installed, and without it.
+        for numpy in ([real_numpy, None] if real_numpy is not None else [None]):
+            results.append(load(MyVirtKeyboard, 'RGB', (255, 255, 255), (0, 0, 0)))
+            results.append(load(MyVirtKeyboard, 'L', 255, 10))
+            results.append(load(MyGreyVirtKeyboard, 'L', 255, 10))
+    finally:
+        numpy = real_numpy
+
+    for coords_, md5 in results:
+        assert coords_ == expected_coords
+        assert md5 == results[0][1]
+    assert results[0][1] == {'0': '04c0340d9e57f7b16169df4f8be680a0',
+                             '1': '8d7ee89830ff6fb2bd033571d3f6080f',
+                             '2': 'd3ee977fcfd18628e5a590ad0477fb91'}
+
+    vk = MyVirtKeyboard(make_image('RGB', (255, 255, 255), (0, 0, 0)), coords, (0, 0, 0))
+    assert vk.symbols_by_md5 == dict((md5, symbol) for symbol, md5 in vk.md5.items())
+    assert vk.get_symbol_code(['unknown', vk.md5['2']]) == '2'
@@ -19,6 +19,8 @@
 
 import dateutil.parser
 from datetime import date as real_date, datetime as real_datetime, timedelta
+from functools import wraps
+from threading import Lock
 import time
 import re
 try:
@@ -26,8 +28,11 @@ try:
 except ImportError:
     raise ImportError('Please install python-dateutil')
 
+from weboob.tools.lrudict import LimitedLRUDict
 
-__all__ = ['local2utc', 'utc2local', 'LinearDateGuesser', 'date', 'datetime', 'new_date', 'new_datetime', 'closest_date']
+
+__all__ = ['local2utc', 'utc2local', 'LinearDateGuesser', 'date', 'datetime', 'new_date', 'new_datetime', 'closest_date',
+           'cached_date_parser', 'parse_datetime']
 
 
 def local2utc(dateobj):
@@ -292,13 +297,131 @@ DATE_TRANSLATE_IT = [(re.compile(ur'gennaio', re.I),   u'january'),
                      (re.compile(ur'domenica', re.I),  u'sunday')]
 
 
-def parse_french_date(date, **kwargs):
-    for fr, en in DATE_TRANSLATE_FR:
-        date = fr.sub(en, date)
+class DateCache(LimitedLRUDict):
+    """
+    Parsed dates of the most recent strings.
+
+    Dates parsed from strings without a year or a time are completed with
+    the current date, so it is cleared when the day changes.
+    """
+
+    max_entries = 4096
+
+    def __init__(self):
+        super(DateCache, self).__init__()
+        self.lock = Lock()
+        self.day = None
+
+    def check_day(self):
+        today = real_date.today()
+        if self.day != today:
+            self.clear()
+            self.day = today
+
+
+def cached_date_parser(func):
+    """
+    Decorator to keep the results of a function parsing dates in a
+    :class:`DateCache`, with the string and keyword arguments as key.
+
+    Calls with arguments which can't be hashed, or which raise an
+    exception, are not cached.
+    """
+    cache = DateCache()
+
+    @wraps(func)
+    def inner(text, **kwargs):
+        key = (text, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return func(text, **kwargs)
+
+        with cache.lock:
+            cache.check_day()
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+
+        value = func(text, **kwargs)
+        with cache.lock:
+            cache[key] = value
+        return value
+
+    inner.cache = cache
+    return inner
 
+
+# Arguments of dateutil.parser.parse() supported by the fast paths
+_FAST_KWARGS = frozenset(['dayfirst', 'fuzzy'])
+
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?)?$')
+_NUMERIC_DATE_RE = re.compile(r'^(\d{1,2})([/.-])(\d{1,2})\2(\d{4})$')
+_FRENCH_DATE_RE = re.compile(ur'^(\d{1,2}) (janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre) (\d{4})$',
+                             re.I)
+_FRENCH_MONTHS = [u'janvier', u'février', u'mars', u'avril', u'mai', u'juin', u'juillet',
+                  u'août', u'septembre', u'octobre', u'novembre', u'décembre']
+
+
+def _fast_parse(text, kwargs, french=False):
+    """
+    Parse common layouts of dates like dateutil.parser.parse() does.
+
+    :returns: the datetime, or None if the string has to be parsed by
+              dateutil
+    """
+    if not isinstance(text, basestring) or not _FAST_KWARGS.issuperset(kwargs):
+        return None
+
+    text = text.strip()
+    try:
+        if french:
+            m = _FRENCH_DATE_RE.match(text)
+            if m:
+                month = _FRENCH_MONTHS.index(m.group(2).lower()) + 1
+                return real_datetime(int(m.group(3)), month, int(m.group(1)))
+
+        m = _NUMERIC_DATE_RE.match(text)
+        if m:
+            first, second, year = int(m.group(1)), int(m.group(3)), int(m.group(4))
+            if kwargs.get('dayfirst'):
+                return real_datetime(year, second, first)
+            return real_datetime(year, first, second)
+
+        m = _ISO_DATE_RE.match(text)
+        if m and not kwargs.get('dayfirst'):
+            return real_datetime(*[int(value) for value in m.groups() if value is not None])
+    except ValueError:
+        # Let dateutil decide how to handle out of range values.
+        pass
+    return None
+
+
+@cached_date_parser
+def parse_datetime(text, **kwargs):
+    """
+    Same as dateutil.parser.parse(), but cached, and without calling
+    dateutil for the most common layouts of dates (dd/mm/yyyy, ISO 8601).
+    """
+    result = _fast_parse(text, kwargs)
+    if result is None:
+        result = dateutil.parser.parse(text, **kwargs)
+    return result
+
+
+@cached_date_parser
+def parse_french_date(date, **kwargs):
     if 'dayfirst' not in kwargs:
         kwargs['dayfirst'] = True
 
+    result = _fast_parse(date, kwargs, french=True)
+    if result is not None:
+        return result
+
+    for fr, en in DATE_TRANSLATE_FR:
+        date = fr.sub(en, date)
+
     return dateutil.parser.parse(date, **kwargs)
 
 
@@ -393,3 +516,17 @@ def test():
     range2 = [dt(2012,12,20), dt(2014,1,10)]
     assert closest_date(dt(2012,12,15), *range2) == dt(2013,12,15)
     assert closest_date(dt(2014,1,15), *range2) == dt(2013,1,15)
+
+    for text, kwargs in ((u'12/05/2016', {'dayfirst': True}),
+                         (u'05/13/2016', {'dayfirst': True}),
+                         (u'2016-05-12T10:20', {}),
+                         (u'2016-05-12', {'dayfirst': True}),
+                         (u'12 may 2016 10:20', {'dayfirst': True})):
+        assert parse_datetime(text, **kwargs) == dateutil.parser.parse(text, **kwargs)
+        assert parse_datetime(text, **kwargs) is parse_datetime(text, **kwargs)
+    assert _fast_parse(u'12/05/2016', {'dayfirst': True}) == dt(2016, 5, 12)
+    assert _fast_parse(u'12/05/2016', {'default': dt(2016, 1, 1)}) is None
+
+    assert parse_french_date(u'1 août 2016') == dt(2016, 8, 1)
+    assert parse_french_date(u'lundi 1 août 2016') == dt(2016, 8, 1)
+    assert _fast_parse(u'12 Janvier 2016', {'dayfirst': True}, french=True) == dt(2016, 1, 12)
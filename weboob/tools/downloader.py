@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2016 weboob project
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+from collections import deque
+from urlparse import urljoin
+
+from weboob.browser.browsers import Browser
+from weboob.browser.exceptions import ClientError
+
+__all__ = ['Download', 'Downloader', 'IDownloadProgress', 'PrintDownloadProgress']
+
+
+class Download(object):
+    """
+    State of a download.
+
+    :param url: URL of the file
+    :param dest: path of the written file
+    :param parts: number of parts (segments of a HLS stream), or None
+    """
+
+    def __init__(self, url, dest, parts=None):
+        self.url = url
+        self.dest = dest
+        # Total size in bytes, None if unknown
+        self.size = None
+        # Number of bytes written, including the resumed ones
+        self.done = 0
+        # Number of bytes which were already written when the download started
+        self.resumed = 0
+        self.parts = parts
+        self.parts_done = 0
+        self.start = time.time()
+        self.end = None
+
+    @property
+    def percent(self):
+        """
+        Progression between 0 and 1, or None if it is unknown.
+        """
+        if self.end is not None:
+            return 1.0
+        if self.size:
+            return float(self.done) / self.size
+        if self.parts:
+            return float(self.parts_done) / self.parts
+        return None
+
+    @property
+    def throughput(self):
+        """
+        Bytes per second received by this download.
+        """
+        elapsed = (self.end or time.time()) - self.start
+        if elapsed <= 0:
+            return 0.0
+        return (self.done - self.resumed) / elapsed
+
+
+class IDownloadProgress(object):
+    def progress(self, download):
+        raise NotImplementedError()
+
+    def finished(self, download):
+        raise NotImplementedError()
+
+
+class PrintDownloadProgress(IDownloadProgress):
+    """
+    Print progression of downloads on a single line.
+
+    :param interval: minimal number of seconds between two updates
+    """
+
+    def __init__(self, stream=None, interval=0.5):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.last = 0
+
+    def format_size(self, size):
+        for unit in ('B', 'KiB', 'MiB', 'GiB'):
+            if size < 1024:
+                break
+            size /= 1024.0
+        return '%.1f %s' % (size, unit)
+
+    def write(self, download):
+        line = '%s: %s' % (os.path.basename(download.dest), self.format_size(download.done))
+        if download.size:
+            line += ' / %s' % self.format_size(download.size)
+        if download.parts:
+            line += ' (%d/%d parts)' % (download.parts_done, download.parts)
+        if download.percent is not None:
+            line += ' [%3.0f%%]' % (download.percent * 100)
+        line += ' %s/s' % self.format_size(download.throughput)
+        self.stream.write('\r\033[K%s' % line)
+        self.stream.flush()
+
+    def progress(self, download):
+        now = time.time()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.write(download)
+
+    def finished(self, download):
+        self.write(download)
+        self.stream.write('\n')
+        self.last = 0
+
+
+class Downloader(object):
+    """
+    Download files with the session of a browser.
+
+    Files are streamed to disk, and an interrupted download is resumed from
+    the size of the existing file with a Range request. Segments of a HLS
+    stream and batches of files are fetched concurrently, with at most
+    *max_workers* requests in flight.
+
+    :param browser: browser of the backend, to share its cookies and
+                    headers; a new :class:`Browser` is used if it is not one
+    :param progress: observer of downloads
+    :type progress: :class:`IDownloadProgress`
+    :param max_workers: maximum number of concurrent requests
+    :type max_workers: :class:`int`
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    MAX_WORKERS = 4
+
+    # Offsets of Range requests are about the raw content, so downloads ask
+    # for it not to be compressed.
+    HEADERS = {'Accept-Encoding': 'identity'}
+
+    STREAM_INF_RE = re.compile(r'BANDWIDTH=(\d+)')
+
+    def __init__(self, browser=None, progress=None, max_workers=None, logger=None):
+        if not isinstance(browser, Browser):
+            # Deprecated browsers do not have a python-requests session.
+            browser = Browser(logger=logger)
+        self.browser = browser
+        self.progress = progress
+        self.max_workers = max_workers or self.MAX_WORKERS
+
+    def update(self, download, size):
+        download.done += size
+        if self.progress is not None:
+            self.progress.progress(download)
+
+    def finish(self, download):
+        download.end = time.time()
+        if self.progress is not None:
+            self.progress.finished(download)
+        return download
+
+    def download(self, url, dest, resume=True):
+        """
+        Download a file.
+
+        :param resume: if *dest* exists, only get what is missing
+        :rtype: :class:`Download`
+        """
+        download = Download(url, dest)
+        offset = os.path.getsize(dest) if resume and os.path.isfile(dest) else 0
+        headers = dict(self.HEADERS)
+        if offset:
+            headers['Range'] = 'bytes=%d-' % offset
+
+        try:
+            response = self.browser.open(url, headers=headers, stream=True)
+        except ClientError as e:
+            if offset and e.response.status_code == 416:
+                # The file is already complete.
+                download.done = download.resumed = download.size = offset
+                return self.finish(download)
+            raise
+
+        if response.status_code != 206:
+            # The server does not support ranges, start again.
+            offset = 0
+        download.done = download.resumed = offset
+        length = response.headers.get('Content-Length')
+        if length is not None and length.isdigit():
+            download.size = offset + int(length)
+
+        try:
+            with open(dest, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    f.write(chunk)
+                    self.update(download, len(chunk))
+        finally:
+            response.close()
+        return self.finish(download)
+
+    def get_hls_segments(self, url):
+        """
+        Get URLs of the segments of a HLS playlist.
+
+        When it is a master playlist, the variant stream with the highest
+        bandwidth is used.
+        """
+        response = self.browser.open(url, headers=self.HEADERS)
+        segments = []
+        best = None
+        bandwidth = None
+        for line in response.text.splitlines():
+            line = line.strip()
+            if line.startswith('#EXT-X-STREAM-INF'):
+                m = self.STREAM_INF_RE.search(line)
+                bandwidth = int(m.group(1)) if m else 0
+            elif line and not line.startswith('#'):
+                line = urljoin(response.url, line)
+                if bandwidth is None:
+                    segments.append(line)
+                elif best is None or bandwidth > best[0]:
+                    best = (bandwidth, line)
+                bandwidth = None
+
+        if best is not None:
+            return self.get_hls_segments(best[1])
+        return segments
+
+    def download_hls(self, url, dest):
+        """
+        Download a HLS stream by concatenating its segments.
+
+        :rtype: :class:`Download`
+        """
+        segments = self.get_hls_segments(url)
+        download = Download(url, dest, len(segments))
+        with open(dest, 'wb') as f:
+            for segment, content, error in self.fetch_many(segments):
+                if error is not None:
+                    raise error
+                f.write(content)
+                download.parts_done += 1
+                self.update(download, len(content))
+        return self.finish(download)
+
+    def fetch_many(self, urls):
+        """
+        Get the content of several URLs concurrently.
+
+        At most *max_workers* requests are in flight, and results are
+        yielded in the order of *urls*, so the consumer can stop at any
+        time.
+
+        :returns: iterator of (url, content, error); content is None if the
+                  request failed with error
+        """
+        pending = deque()
+        try:
+            for url in urls:
+                pending.append((url, self.browser.open(url, headers=self.HEADERS, is_async=True)))
+                if len(pending) >= self.max_workers:
+                    yield self._result(*pending.popleft())
+            while pending:
+                yield self._result(*pending.popleft())
+        finally:
+            for url, future in pending:
+                future.cancel()
+
+    def _result(self, url, future):
+        try:
+            return url, future.result().content, None
+        except Exception as e:
+            return url, None, e
+
+    def download_many(self, items):
+        """
+        Download several files concurrently.
+
+        :param items: iterable of (url, dest)
+        :returns: iterator of (url, dest, error), in the order of *items*;
+                  error is None if the file has been written
+        """
+        downloads = deque()
+
+        def urls():
+            for url, dest in items:
+                downloads.append(Download(url, dest))
+                yield url
+
+        for url, content, error in self.fetch_many(urls()):
+            download = downloads.popleft()
+            if error is None:
+                try:
+                    with open(download.dest, 'wb') as f:
+                        f.write(content)
+                except IOError as e:
+                    error = e
+                else:
+                    download.size = len(content)
+                    self.update(download, len(content))
+                    self.finish(download)
+            yield url, download.dest, error
+
+
+def test():
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from shutil import rmtree
+    from tempfile import mkdtemp
+    from threading import Thread
+
+    data = ''.join(chr(i % 256) for i in range(200000))
+    files = {'/master.m3u8': '#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=100\nlow/media.m3u8\n'
+                             '#EXT-X-STREAM-INF:BANDWIDTH=900\nhigh/media.m3u8\n',
+             '/high/media.m3u8': '#EXTM3U\n#EXTINF:10,\nseg0.ts\n#EXTINF:10,\n/high/seg1.ts\n'
+                                 '#EXTINF:10,\nseg2.ts\n#EXT-X-ENDLIST\n',
+             '/file': data,
+            }
+    for i in range(3):
+        files['/high/seg%d.ts' % i] = data[i * 1000:(i + 1) * 1000]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in files:
+                return self.send_error(404)
+            content = files[self.path]
+            m = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+            if m and int(m.group(1)) >= len(content):
+                self.send_response(416)
+                self.end_headers()
+                return
+            if m:
+                self.send_response(206)
+                content = content[int(m.group(1)):]
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    base = 'http://127.0.0.1:%d' % server.server_port
+    tmpdir = mkdtemp()
+    try:
+        downloader = Downloader(max_workers=2)
+        dest = os.path.join(tmpdir, 'file')
+        with open(dest, 'wb') as f:
+            f.write(data[:1234])
+        download = downloader.download(base + '/file', dest)
+        assert download.resumed == 1234 and download.size == len(data)
+        assert open(dest, 'rb').read() == data
+        download = downloader.download(base + '/file', dest)
+        assert download.done == len(data)
+        assert open(dest, 'rb').read() == data
+
+        dest = os.path.join(tmpdir, 'video.ts')
+        download = downloader.download_hls(base + '/master.m3u8', dest)
+        assert download.parts == download.parts_done == 3
+        assert open(dest, 'rb').read() == data[:3000]
+
+        items = [(base + '/high/seg%d.ts' % i, os.path.join(tmpdir, '%d.ts' % i)) for i in (2, 1, 0)]
+        items.append((base + '/missing', os.path.join(tmpdir, 'missing')))
+        results = list(downloader.download_many(items))
+        assert [dest for url, dest, error in results] == [dest for url, dest in items]
+        assert [error is None for url, dest, error in results] == [True, True, True, False]
+        assert open(os.path.join(tmpdir, '1.ts'), 'rb').read() == data[1000:2000]
+    finally:
+        server.shutdown()
+        rmtree(tmpdir)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# Copyright(C) 2010-2011  Romain Bignon
+#
+# This file is part of weboob.
+#
+# weboob is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# weboob is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with weboob. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Client of weboob-munin-collector, shared by the munin plugins of contrib/.
+"""
+
+import os
+import socket
+
+from weboob.capabilities.base import NotAvailable
+from weboob.core.ouiboube import Weboob
+from weboob.tools.json import json
+
+
+__all__ = ['get_workdir', 'CollectorErrors', 'RemoteObject', 'RemoteResult', 'CollectorClient']
+
+
+def get_workdir():
+    """
+    Get the weboob directory of munin plugins, set by ``env.weboob_path``.
+    """
+    return Weboob.get_workdir(os.environ.get('weboob_path'))
+
+
+class CollectorErrors(Exception):
+    """
+    Errors returned by weboob-munin-collector, as (backend name, error
+    type, message).
+    """
+
+    def __init__(self, errors):
+        Exception.__init__(self, errors)
+        self.errors = errors
+
+    def __iter__(self):
+        return iter(self.errors)
+
+
+class RemoteObject(object):
+    pass
+
+
+class RemoteResult(RemoteObject):
+    """
+    Result returned by weboob-munin-collector, with only the requested
+    attributes.
+    """
+
+    def __init__(self, backend, values):
+        self.backend = backend
+        for path, value in values.items():
+            obj = self
+            attribs = path.split('/')
+            for attrib in attribs[:-1]:
+                if not isinstance(getattr(obj, attrib, None), RemoteObject):
+                    setattr(obj, attrib, RemoteObject())
+                obj = getattr(obj, attrib)
+            setattr(obj, attribs[-1], NotAvailable if value is None else value)
+
+
+class CollectorClient(object):
+    """
+    Client of weboob-munin-collector, which keeps backends logged in and
+    shares results between plugins.
+
+    :param path: path of the socket of the collector
+    :type path: str
+    :param timeout: maximum duration in seconds of a call; on timeout,
+                    :class:`socket.timeout` is raised
+    :type timeout: float
+    """
+
+    TIMEOUT = 60
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout or self.TIMEOUT
+
+    def do(self, caps, method, *args, **kwargs):
+        request = {'caps': caps,
+                   'method': method,
+                   'args': args,
+                   'backends': kwargs.get('backends'),
+                   'ttl': kwargs.get('ttl', 3600),
+                   'fields': kwargs.get('fields', ['id']),
+                  }
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            f = sock.makefile('r+')
+            f.write('%s\n' % json.dumps(request))
+            f.flush()
+            answer = json.loads(f.readline())
+        finally:
+            sock.close()
+
+        results = [RemoteResult(result['backend'], result['values']) for result in answer['results']]
+        return results, answer['errors']
+
+
+def test_remote_result():
+    result = RemoteResult('backend', {'id': 'foo', 'temp/value': 42, 'label': None})
+    assert result.backend == 'backend'
+    assert result.id == 'foo'
+    assert result.temp.value == 42
+    assert result.label is NotAvailable
@@ -18,6 +18,10 @@
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
+import time
+from threading import Lock
+
+from weboob.tools.lrudict import LimitedLRUDict
 
 try:
     import feedparser
@@ -31,7 +35,7 @@ if '5.1' > feedparser.__version__ >= '5.0':
     import re
     sgmllib.endbracket = re.compile('[<>]')
 
-__all__ = ['Entry', 'Newsfeed']
+__all__ = ['Entry', 'ParsedFeed', 'Newsfeed']
 
 
 class Entry(object):
@@ -86,16 +90,137 @@ class Entry(object):
             self.id = rssid_func(self)
 
 
+class ParsedFeed(object):
+    """
+    A downloaded feed, with its entries indexed by ID.
+    """
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.time = time.time()
+        # Entries and index of entries by ID, for each rssid_func
+        self.entries = {}
+
+    def get_entries(self, rssid_func):
+        try:
+            return self.entries[rssid_func]
+        except KeyError:
+            entries = [Entry(entry, rssid_func) for entry in self.feed['entries']]
+            index = {}
+            for entry in entries:
+                index.setdefault(entry.id, entry)
+            self.entries[rssid_func] = entries, index
+            return entries, index
+
+
 class Newsfeed(object):
+    """
+    Entries of a RSS or Atom feed.
+
+    A downloaded feed is shared by every instance for the same URL during
+    :attr:`TTL` seconds. After that, it is downloaded again only if it has
+    changed, with the ETag and Last-Modified of the previous response. Only
+    the most recently used feeds are kept.
+
+    :param url: URL of the feed, or its content
+    :param rssid_func: function to get the ID of an :class:`Entry`
+    """
+
+    # Number of seconds during which a downloaded feed is used without
+    # checking if it has changed
+    TTL = 60
+
+    _feeds = LimitedLRUDict()
+    _feeds_lock = Lock()
+
     def __init__(self, url, rssid_func=None):
-        self.feed = feedparser.parse(url)
+        self.parsed = self.fetch(url)
+        self.feed = self.parsed.feed
         self.rssid_func = rssid_func
 
+    @classmethod
+    def fetch(cls, url):
+        with cls._feeds_lock:
+            try:
+                parsed = cls._feeds[url]
+            except KeyError:
+                parsed = None
+        if parsed is not None and time.time() - parsed.time < cls.TTL:
+            return parsed
+
+        if parsed is None:
+            feed = feedparser.parse(url)
+        else:
+            feed = feedparser.parse(url, etag=parsed.feed.get('etag'), modified=parsed.feed.get('modified'))
+            if feed.get('status') == 304:
+                parsed.time = time.time()
+                return parsed
+
+        parsed = ParsedFeed(feed)
+        # Only keep feeds which have been downloaded, even when redirected,
+        # under the requested URL.
+        status = feed.get('status')
+        if status is not None and status < 400:
+            with cls._feeds_lock:
+                cls._feeds[url] = parsed
+        return parsed
+
     def iter_entries(self):
-        for entry in self.feed['entries']:
-            yield Entry(entry, self.rssid_func)
+        entries, index = self.parsed.get_entries(self.rssid_func)
+        return iter(entries)
 
     def get_entry(self, id):
-        for entry in self.iter_entries():
-            if entry.id == id:
-                return entry
+        entries, index = self.parsed.get_entries(self.rssid_func)
+        return index.get(id)
+
+
+def test_fetch():
+    feed_entry = feedparser.FeedParserDict
+    feeds = {'http://weboob.org/feed': {'status': 200, 'etag': '"abc"', 'entries': [feed_entry(id='1')]}}
+    requests = []
+
+    def parse(url, etag=None, modified=None):
+        requests.append((url, etag))
+        if etag is not None and feeds[url].get('etag') == etag:
+            return {'status': 304}
+        return feeds[url]
+
+    real_parse = feedparser.parse
+    feedparser.parse = parse
+    try:
+        first = Newsfeed('http://weboob.org/feed')
+        assert Newsfeed('http://weboob.org/feed').parsed is first.parsed
+        assert requests == [('http://weboob.org/feed', None)]
+
+        # After the TTL, a 304 reuses the parsed feed.
+        first.parsed.time -= Newsfeed.TTL
+        second = Newsfeed('http://weboob.org/feed')
+        assert requests[1] == ('http://weboob.org/feed', '"abc"')
+        assert second.parsed is first.parsed
+        assert second.get_entry('1') is not None
+        assert second.get_entry('1') is first.get_entry('1')
+
+        # A changed feed is parsed again.
+        first.parsed.time -= Newsfeed.TTL
+        feeds['http://weboob.org/feed'] = {'status': 200, 'etag': '"def"', 'entries': [feed_entry(id='2')]}
+        third = Newsfeed('http://weboob.org/feed')
+        assert third.parsed is not first.parsed
+        assert [entry.id for entry in third.iter_entries()] == ['2']
+
+        # A redirected feed is kept under the requested URL.
+        feeds['http://weboob.org/old'] = {'status': 301, 'href': 'http://weboob.org/feed',
+                                          'etag': '"ghi"', 'entries': [feed_entry(id='3')]}
+        moved = Newsfeed('http://weboob.org/old')
+        assert Newsfeed('http://weboob.org/old').parsed is moved.parsed
+        assert requests[-1] == ('http://weboob.org/old', None)
+        moved.parsed.time -= Newsfeed.TTL
+        assert Newsfeed('http://weboob.org/old').parsed is moved.parsed
+        assert requests[-1] == ('http://weboob.org/old', '"ghi"')
+
+        # Errors are not kept.
+        feeds['http://weboob.org/gone'] = {'status': 404, 'entries': []}
+        Newsfeed('http://weboob.org/gone')
+        assert 'http://weboob.org/gone' not in Newsfeed._feeds
+    finally:
+        feedparser.parse = real_parse
+        Newsfeed._feeds.clear()
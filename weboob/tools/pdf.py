@@ -17,6 +17,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
+from bisect import bisect_right
 from io import BytesIO
 from collections import namedtuple
 import os
@@ -24,7 +25,7 @@ import subprocess
 from tempfile import mkstemp
 
 
-__all__ = ['decompress_pdf', 'get_pdf_rows']
+__all__ = ['decompress_pdf', 'get_pdf_rows', 'iter_pdf_pages', 'count_pdf_pages']
 
 
 def decompress_pdf(inpdf):
@@ -246,6 +247,60 @@ def build_rows(lines):
     return rows
 
 
+class TableIndex(object):
+    """
+    Index of rows of boxes returned by :func:`build_rows`, to find the box
+    containing a rect without checking every row and box.
+
+    Rows are sorted by their top, and boxes of a row by their left, so
+    boxes which may contain a rect are found by bisection: the first
+    candidate is the first one whose bottom (or right) is below (or
+    right of) the rect, according to the running maximum of bottoms
+    (or rights), and candidates stop after the top (or left) of the
+    rect.
+    """
+
+    # Margin added to bounds used for bisection, larger than the
+    # tolerance of ApproxFloat, to only skip rows and boxes which are
+    # sure not to match.
+    MARGIN = 3
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.max_y1s = self.running_max(row[0].y1 for row in rows)
+        self.x0s = [[box.x0 for box in row] for row in rows]
+        self.max_x1s = [self.running_max(box.x1 for box in row) for row in rows]
+
+    @staticmethod
+    def running_max(values):
+        result = []
+        for value in values:
+            result.append(max(value, result[-1]) if result else value)
+        return result
+
+    def find(self, rect):
+        """
+        Get the position (column, row) of the first box containing a rect,
+        like :func:`find_in_table`.
+        """
+        rows = self.rows
+        start = bisect_right(self.max_y1s, rect.y1 - self.MARGIN)
+        for j in xrange(start, len(rows)):
+            row = rows[j]
+            if ApproxFloat(row[0].y0) > rect.y1:
+                break
+
+            if not (ApproxFloat(row[0].y0) <= rect.y0 and ApproxFloat(row[0].y1) >= rect.y1):
+                continue
+
+            x0s = self.x0s[j]
+            end = bisect_right(x0s, rect.x0 + self.MARGIN)
+            for i in xrange(bisect_right(self.max_x1s[j], rect.x1 - self.MARGIN), end):
+                box = row[i]
+                if ApproxFloat(box.x0) <= rect.x0 and ApproxFloat(box.x1) >= rect.x1:
+                    return i, j
+
+
 def find_in_table(rows, rect):
     for j, row in enumerate(rows):
         if ApproxFloat(row[0].y0) > rect.y1:
@@ -261,16 +316,17 @@ def find_in_table(rows, rect):
 
 def arrange_texts_in_rows(rows, trects):
     table = [[[] for _ in row] for row in rows]
+    index = TableIndex(rows)
 
     for trect in trects:
-        pos = find_in_table(rows, trect)
+        pos = index.find(trect)
         if not pos:
             continue
         table[pos[1]][pos[0]].append(trect.text)
     return table
 
 
-def get_pdf_rows(data, miner_layout=True):
+def get_pdf_rows(data, miner_layout=True, processes=None):
     """
     Takes PDF file content as string and yield table row data for each page.
 
@@ -282,10 +338,70 @@ def get_pdf_rows(data, miner_layout=True):
     and tries to find rectangles and arrange them in rows, then arrange text in
     the rectangles.
 
+    If *processes* is more than 1, pages are parsed in a pool of that many
+    processes, which is faster for documents with many pages.
+
     External dependencies:
     PDFMiner (http://www.unixuser.org/~euske/python/pdfminer/index.html).
     """
 
+    if not processes or processes < 2:
+        for textrows in iter_pdf_pages_rows(data, miner_layout):
+            yield textrows
+        return
+
+    from multiprocessing import Pool
+
+    count = count_pdf_pages(data)
+    size = max(1, -(-count // processes))
+    chunks = [(data, miner_layout, range(start, min(start + size, count))) for start in xrange(0, count, size)]
+    if len(chunks) < 2:
+        for textrows in iter_pdf_pages_rows(data, miner_layout):
+            yield textrows
+        return
+
+    pool = Pool(min(processes, len(chunks)))
+    try:
+        for pages_rows in pool.imap(_get_pdf_pages_rows, chunks):
+            for textrows in pages_rows:
+                yield textrows
+    finally:
+        pool.terminate()
+
+
+def _get_pdf_pages_rows(args):
+    data, miner_layout, pagenos = args
+    return list(iter_pdf_pages_rows(data, miner_layout, pagenos))
+
+
+def count_pdf_pages(data):
+    """
+    Get the number of pages of a PDF, without processing them.
+    """
+    try:
+        from pdfminer.pdfparser import PDFSyntaxError
+    except ImportError:
+        raise ImportError('Please install python-pdfminer')
+
+    try:
+        from pdfminer.pdfpage import PDFPage
+    except ImportError:
+        # Old API of pdfminer
+        return sum(1 for page in iter_pdf_pages(data))
+
+    try:
+        return sum(1 for page in PDFPage.get_pages(BytesIO(data), check_extractable=True))
+    except PDFSyntaxError:
+        return 0
+
+
+def iter_pdf_pages(data, pagenos=None, device=None):
+    """
+    Yield pages of a PDF, processed by *device* if it is given.
+
+    :param pagenos: numbers of pages to yield, starting from 0, or None
+                    for every page
+    """
     try:
         from pdfminer.pdfparser import PDFParser, PDFSyntaxError
     except ImportError:
@@ -298,9 +414,7 @@ def get_pdf_rows(data, miner_layout=True):
     except ImportError:
         from pdfminer.pdfparser import PDFDocument
         newapi = False
-    from pdfminer.converter import PDFPageAggregator
-    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-    from pdfminer.layout import LAParams, LTRect, LTTextBox, LTTextLine, LTLine, LTChar
+    from pdfminer.pdfinterp import PDFPageInterpreter
 
     parser = PDFParser(BytesIO(data))
     try:
@@ -313,24 +427,49 @@ def get_pdf_rows(data, miner_layout=True):
     except PDFSyntaxError:
         return
 
-    rsrcmgr = PDFResourceManager()
-    if miner_layout:
-        device = PDFPageAggregator(rsrcmgr, laparams=LAParams())
-    else:
-        device = PDFPageAggregator(rsrcmgr)
-
-    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    if device is not None:
+        interpreter = PDFPageInterpreter(device.rsrcmgr, device)
     if newapi:
         pages = PDFPage.get_pages(BytesIO(data), check_extractable=True)
     else:
         doc.initialize()
         pages = doc.get_pages()
 
+    if pagenos is not None:
+        pagenos = set(pagenos)
     for npage, page in enumerate(pages):
-        interpreter.process_page(page)
+        if pagenos is not None and npage not in pagenos:
+            continue
+        if device is not None:
+            interpreter.process_page(page)
+        yield page
+
+
+def iter_pdf_pages_rows(data, miner_layout=True, pagenos=None):
+    """
+    Yield table row data for pages of a PDF, see :func:`get_pdf_rows`.
+
+    :param pagenos: numbers of pages to parse, starting from 0, or None
+                    for every page
+    """
+    try:
+        from pdfminer.converter import PDFPageAggregator
+    except ImportError:
+        raise ImportError('Please install python-pdfminer')
+    from pdfminer.pdfinterp import PDFResourceManager
+    from pdfminer.layout import LAParams, LTRect, LTTextBox, LTTextLine, LTLine, LTChar
+
+    rsrcmgr = PDFResourceManager()
+    if miner_layout:
+        device = PDFPageAggregator(rsrcmgr, laparams=LAParams())
+    else:
+        device = PDFPageAggregator(rsrcmgr)
+
+    for page in iter_pdf_pages(data, pagenos, device):
         page_layout = device.get_result()
 
-        texts = sum([list(lttext_to_multilines(obj, page_layout)) for obj in page_layout._objs if isinstance(obj, (LTTextBox, LTTextLine, LTChar))], [])
+        texts = [text for obj in page_layout._objs if isinstance(obj, (LTTextBox, LTTextLine, LTChar))
+                 for text in lttext_to_multilines(obj, page_layout)]
         if not miner_layout:
             texts.sort(key=lambda t: (t.y0, t.x0))
 
@@ -341,3 +480,47 @@ def get_pdf_rows(data, miner_layout=True):
 
         yield textrows
     device.close()
+
+
+def test_table_index():
+    import random
+
+    rand = random.Random(42)
+    for _ in range(20):
+        # Rows of adjacent boxes, with small gaps and overlaps like real
+        # tables have.
+        rows = []
+        y = 0
+        for _ in range(rand.randint(1, 15)):
+            height = rand.randint(5, 20)
+            row = []
+            x = 0
+            for _ in range(rand.randint(1, 8)):
+                width = rand.randint(5, 40)
+                row.append(Rect(x + rand.uniform(-1, 1), y + rand.uniform(-1, 1),
+                                x + width + rand.uniform(-1, 1), y + height + rand.uniform(-1, 1)))
+                x += width + rand.choice([0, 0, 1, 5])
+            rows.append(row)
+            y += height + rand.choice([0, 0, 1, 5])
+
+        index = TableIndex(rows)
+        for _ in range(200):
+            x0 = rand.uniform(-10, 300)
+            y0 = rand.uniform(-10, y + 10)
+            rect = TextRect(x0, y0, x0 + rand.uniform(0, 10), y0 + rand.uniform(0, 5), u'')
+            assert index.find(rect) == find_in_table(rows, rect), rect
+
+
+def test_count_pdf_pages():
+    data = (b'%PDF-1.1\n'
+            b'1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n'
+            b'2 0 obj << /Type /Pages /Kids [3 0 R 4 0 R 5 0 R] /Count 3 /MediaBox [0 0 100 100] /Resources << >> >> endobj\n'
+            b'3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n'
+            b'4 0 obj << /Type /Page /Parent 2 0 R >> endobj\n'
+            b'5 0 obj << /Type /Page /Parent 2 0 R >> endobj\n'
+            b'trailer << /Root 1 0 R >>\n'
+            b'%%EOF\n')
+    assert count_pdf_pages(data) == 3
+    assert count_pdf_pages(data) == sum(1 for page in iter_pdf_pages(data))
+    assert count_pdf_pages(b'garbage') == 0
+    assert list(get_pdf_rows(b'garbage', processes=2)) == []
@@ -18,9 +18,14 @@
 # along with weboob. If not, see <http://www.gnu.org/licenses/>.
 
 
+import os
+import sqlite3
 from copy import deepcopy
+from threading import Lock
 
-from .config.yamlconfig import YamlConfig
+import yaml
+
+from .config.yamlconfig import YamlConfig, WeboobDumper, Loader
 
 
 class IStorage(object):
@@ -81,3 +86,122 @@ class StandardStorage(IStorage):
 
     def get(self, what, name, *args, **kwargs):
         return self.config.get(what, name, *args, **kwargs)
+
+
+class SQLiteStorage(IStorage):
+    """
+    Storage which keeps each (what, name) entry in its own sqlite row.
+
+    Entries are read on first access, and :meth:`save` only writes the
+    saved entry, and only if it has changed since it was read. Several
+    processes can share the same file: sqlite locks it during writes.
+
+    If *yaml_path* is given and the database does not exist yet, entries
+    of this :class:`StandardStorage` file are imported in the database.
+    The YAML file is left as is.
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'storage.sqlite')
+    >>> storage = SQLiteStorage(path)
+    >>> storage.load('backends', 'foo', {'seen': []})
+    >>> storage.set('backends', 'foo', 'seen', [1, 2])
+    >>> storage.save('backends', 'foo')
+    >>> SQLiteStorage(path).get('backends', 'foo', 'seen')
+    [1, 2]
+    """
+
+    def __init__(self, path, yaml_path=None):
+        self.path = path
+        self.lock = Lock()
+        self.cache = YamlConfig(None)
+        # serialized data of entries as they are in the database
+        self.stored = {}
+
+        exists = os.path.exists(path)
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.db.isolation_level = None
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS storage (what TEXT, name TEXT, data TEXT, PRIMARY KEY (what, name))')
+
+        if not exists and yaml_path is not None and os.path.exists(yaml_path):
+            self.import_yaml(yaml_path)
+
+    def import_yaml(self, yaml_path):
+        """
+        Import entries of a :class:`StandardStorage` file.
+        """
+        config = YamlConfig(yaml_path)
+        config.load()
+        rows = []
+        for what, entries in config.values.items():
+            for name, value in (entries or {}).items():
+                rows.append((what, name, self.dump(value)))
+
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                self.db.executemany('INSERT OR REPLACE INTO storage (what, name, data) VALUES (?, ?, ?)', rows)
+            except:
+                self.db.execute('ROLLBACK')
+                raise
+            self.db.execute('COMMIT')
+
+    @staticmethod
+    def dump(value):
+        return yaml.dump(value, Dumper=WeboobDumper, default_flow_style=False)
+
+    def _fetch(self, what, name):
+        if (what, name) in self.stored:
+            return
+
+        with self.lock:
+            if (what, name) in self.stored:
+                return
+
+            row = self.db.execute('SELECT data FROM storage WHERE what = ? AND name = ?', (what, name)).fetchone()
+            if row is None:
+                self.stored[(what, name)] = None
+            else:
+                self.cache.set(what, name, yaml.load(row[0], Loader=Loader))
+                self.stored[(what, name)] = row[0]
+
+    def load(self, what, name, default={}):
+        self._fetch(what, name)
+        d = self.cache.get(what, name, default={}) or {}
+        self.cache.set(what, name, deepcopy(default))
+        self.cache.values[what][name].update(d)
+
+    def save(self, what, name):
+        self._fetch(what, name)
+        try:
+            value = self.cache.values[what][name]
+        except KeyError:
+            data = None
+        else:
+            data = self.dump(value)
+
+        if data == self.stored[(what, name)]:
+            return
+
+        with self.lock:
+            if data is None:
+                self.db.execute('DELETE FROM storage WHERE what = ? AND name = ?', (what, name))
+            else:
+                self.db.execute('INSERT OR REPLACE INTO storage (what, name, data) VALUES (?, ?, ?)', (what, name, data))
+        self.stored[(what, name)] = data
+
+    def set(self, what, name, *args):
+        self._fetch(what, name)
+        self.cache.set(what, name, *args)
+
+    def delete(self, what, name, *args):
+        self._fetch(what, name)
+        self.cache.delete(what, name, *args)
+
+    def get(self, what, name, *args, **kwargs):
+        self._fetch(what, name)
+        return self.cache.get(what, name, *args, **kwargs)
+
+    def close(self):
+        with self.lock:
+            self.db.close()